@@ -9,7 +9,7 @@ import os
 import sys
 import traceback
 from promptgen.utils.domain_evaluator import evaluate_prompt_with_domain
-from promptgen.templates.loader import TemplateLibrary, PromptGenerator
+from promptgen.core.engine import get_engine
 from promptgen.utils.prompt_helper import extract_context_from_description
 
 def main():
@@ -20,20 +20,20 @@ def main():
         layout="wide"
     )
     
-    # Initialize template library and prompt generator
-    templates_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), "templates", "examples")
+    # Use the process-wide engine so templates are loaded once, not on every rerun
+    engine = get_engine()
+    templates_dir = engine.templates_dir
     st.session_state.debug_info = f"Loading templates from: {templates_dir}"
     
     # Check if template directory exists
     if not os.path.exists(templates_dir):
         st.error(f"Template directory not found: {templates_dir}")
-        template_library = TemplateLibrary()
     else:
-        template_library = TemplateLibrary(templates_dir)
         # List all templates for debugging
-        st.session_state.templates = template_library.list_templates()
+        st.session_state.templates = engine.template_library.list_templates()
     
-    prompt_generator = PromptGenerator(template_library)
+    template_library = engine.template_library
+    prompt_generator = engine.template_generator
     
     # Initialize session state variables if they don't exist
     if 'evaluate_prompt' not in st.session_state:
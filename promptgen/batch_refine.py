@@ -0,0 +1,334 @@
+"""
+Batch prompt refinement from the command line.
+
+Reads prompts as a stream from a JSONL or text file, refines them with
+``PromptRefiner.refine`` (optionally across a process pool) and writes one
+JSONL result per prompt, in input order, as results become available.
+
+Usage:
+    python -m promptgen.batch_refine prompts.jsonl -o refined.jsonl -w 8 --checkpoint refined.ckpt --resume
+"""
+
+import argparse
+import itertools
+import json
+import logging
+import os
+import sys
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, BinaryIO, Dict, Iterable, Iterator, List, Optional, TextIO, Tuple
+
+from promptgen.core.refiner import PromptRefiner
+
+# Setup logger
+logger = logging.getLogger(__name__)
+
+# Records sent to a worker per task
+DEFAULT_CHUNKSIZE = 64
+
+# Chunks in flight per worker; bounds memory use independently of the input size
+PENDING_CHUNKS_PER_WORKER = 2
+
+
+def iter_records(stream: TextIO, input_format: str = "jsonl") -> Iterator[Dict[str, Any]]:
+    """
+    Read refinement requests from a stream, one per line.
+
+    In ``jsonl`` format each line is either a JSON string (the prompt) or an
+    object with a ``prompt`` key and optional ``id``, ``objective`` and
+    ``desired_improvements`` keys. In ``text`` format each non-empty line is
+    a prompt. Malformed lines are yielded as records with an ``error`` key so
+    they keep their place in the output.
+
+    Args:
+        stream: Input text stream
+        input_format: ``jsonl`` or ``text``
+
+    Yields:
+        Request dictionaries
+    """
+    for line in stream:
+        line = line.rstrip("\n")
+        if not line.strip():
+            continue
+
+        if input_format == "text":
+            yield {"prompt": line}
+            continue
+
+        try:
+            data = json.loads(line)
+        except ValueError as e:
+            yield {"error": f"Invalid JSON: {e}"}
+            continue
+
+        if isinstance(data, str):
+            yield {"prompt": data}
+        elif isinstance(data, dict) and isinstance(data.get("prompt"), str):
+            yield data
+        else:
+            yield {"error": "Record has no 'prompt' string"}
+
+
+def refine_record(refiner: PromptRefiner, record: Dict[str, Any], full: bool = False) -> Dict[str, Any]:
+    """
+    Refine a single request, capturing errors in the result.
+
+    Args:
+        refiner: PromptRefiner to use
+        record: Request dictionary from ``iter_records``
+        full: Whether to include the complete ``refine`` result
+
+    Returns:
+        Result dictionary
+    """
+    result = {"id": record["id"]} if "id" in record else {}
+    if "error" in record:
+        result["error"] = record["error"]
+        return result
+
+    try:
+        refinement = refiner.refine(
+            record["prompt"],
+            objective=record.get("objective"),
+            desired_improvements=record.get("desired_improvements")
+        )
+    except Exception as e:
+        result["error"] = f"{type(e).__name__}: {e}"
+        return result
+
+    if full:
+        result.update(refinement)
+    else:
+        result.update({
+            "refined_prompt": refinement["refined_prompt"],
+            "original_quality": refinement["original_analysis"]["quality_score"],
+            "refined_quality": refinement["refined_analysis"]["quality_score"],
+            "improvement_score": refinement["improvement_score"],
+            "improvements": [improvement["type"] for improvement in refinement["improvements"]],
+        })
+    return result
+
+
+# Refiner owned by a batch worker process
+_worker_refiner: Optional[PromptRefiner] = None
+
+
+def _init_refine_worker() -> None:
+    """Build the refiner of a batch worker process once."""
+    global _worker_refiner
+    _worker_refiner = PromptRefiner()
+    logging.getLogger("promptgen").setLevel(logging.WARNING)
+
+
+def _refine_chunk(records: List[Dict[str, Any]], full: bool = False,
+                  refiner: PromptRefiner = None) -> List[Dict[str, Any]]:
+    """Refine a chunk of requests."""
+    refiner = refiner or _worker_refiner
+    return [refine_record(refiner, record, full) for record in records]
+
+
+def _chunks(records: Iterable[Dict[str, Any]], size: int) -> Iterator[List[Dict[str, Any]]]:
+    """Group a record stream into lists of at most ``size`` records."""
+    iterator = iter(records)
+    while True:
+        chunk = list(itertools.islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def refine_stream(records: Iterable[Dict[str, Any]], workers: int = 1,
+                  chunksize: int = DEFAULT_CHUNKSIZE, full: bool = False) -> Iterator[List[Dict[str, Any]]]:
+    """
+    Refine a stream of requests, yielding results chunk by chunk in input order.
+
+    Input is read lazily and at most ``PENDING_CHUNKS_PER_WORKER`` chunks per
+    worker are in flight, so memory stays bounded for any input size.
+
+    Args:
+        records: Request dictionaries
+        workers: Number of worker processes (1 refines in this process)
+        chunksize: Records per chunk
+        full: Whether results include the complete ``refine`` result
+
+    Yields:
+        Lists of result dictionaries, one list per input chunk
+    """
+    chunks = _chunks(records, chunksize)
+
+    if workers <= 1:
+        refiner = PromptRefiner()
+        for chunk in chunks:
+            yield _refine_chunk(chunk, full, refiner)
+        return
+
+    max_pending = workers * PENDING_CHUNKS_PER_WORKER
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_refine_worker) as executor:
+        pending = deque()
+        for chunk in chunks:
+            pending.append(executor.submit(_refine_chunk, chunk, full))
+            if len(pending) >= max_pending:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+
+def read_checkpoint_state(path: str) -> Tuple[int, Optional[int]]:
+    """
+    Read a checkpoint file.
+    
+    Args:
+        path: Checkpoint file
+        
+    Returns:
+        Tuple of (records already written, byte size of the output when they
+        were), with (0, None) if the file is missing and None as the size for
+        checkpoints without one
+    """
+    try:
+        with open(path) as f:
+            state = json.load(f)
+    except FileNotFoundError:
+        return 0, None
+    output_bytes = state.get("output_bytes")
+    return int(state["offset"]), None if output_bytes is None else int(output_bytes)
+
+
+def read_checkpoint(path: str) -> int:
+    """Read the number of records already written from a checkpoint file (0 if missing)."""
+    return read_checkpoint_state(path)[0]
+
+
+def write_checkpoint(path: str, offset: int, output_bytes: int = None) -> None:
+    """Atomically record the number of records written so far and the output size after them."""
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump({"offset": offset, "output_bytes": output_bytes}, f)
+    os.replace(tmp_path, path)
+
+
+def _open_output(output_path: str, append: bool, output_bytes: Optional[int]) -> BinaryIO:
+    """
+    Open the output file for writing.
+    
+    When appending from a checkpoint, lines written after it (including a
+    torn final line from an interrupted run) are truncated away first.
+    """
+    if not append:
+        return open(output_path, "wb")
+    if output_bytes is None or not os.path.exists(output_path):
+        return open(output_path, "ab")
+    
+    out_stream = open(output_path, "r+b")
+    size = out_stream.seek(0, os.SEEK_END)
+    if size < output_bytes:
+        out_stream.close()
+        raise ValueError(f"Output {output_path} has {size} bytes, fewer than the "
+                         f"{output_bytes} recorded in the checkpoint")
+    out_stream.truncate(output_bytes)
+    out_stream.seek(output_bytes)
+    return out_stream
+
+
+def run(input_path: str, output_path: str = None, input_format: str = None,
+        workers: int = 1, chunksize: int = DEFAULT_CHUNKSIZE, start: int = 0,
+        checkpoint: str = None, full: bool = False, append: bool = False,
+        output_bytes: int = None) -> Tuple[int, int]:
+    """
+    Refine every prompt in a file, writing JSONL results.
+    
+    Results carry their input ``index``. Records before ``start`` are
+    skipped. After each chunk the output is flushed and the checkpoint (if
+    any) updated to the next offset and the output size, so an interrupted
+    run can be resumed by passing them as ``start`` and ``output_bytes``
+    with ``append=True``.
+    
+    Args:
+        input_path: JSONL or text input file ('-' for stdin)
+        output_path: JSONL output file ('-' or None for stdout)
+        input_format: 'jsonl' or 'text' (inferred from the extension if None)
+        workers: Number of worker processes
+        chunksize: Records per chunk
+        start: Number of input records to skip
+        checkpoint: Optional checkpoint file updated as results are written
+        full: Whether to write the complete refine result
+        append: Whether to append to the output file instead of replacing it
+        output_bytes: When appending, size to truncate the output file to first
+                      (drops lines written after the checkpoint)
+        
+    Returns:
+        Tuple of (records written, records that failed)
+    """
+    if input_format is None:
+        input_format = "jsonl" if input_path.endswith((".jsonl", ".json")) else "text"
+    
+    to_stdout = output_path in (None, "-")
+    out_stream = sys.stdout if to_stdout else _open_output(output_path, append, output_bytes)
+    in_stream = sys.stdin if input_path == "-" else open(input_path, encoding="utf-8")
+    
+    written = failed = 0
+    index = start
+    try:
+        records = itertools.islice(iter_records(in_stream, input_format), start, None)
+        for results in refine_stream(records, workers, chunksize, full):
+            for result in results:
+                line = json.dumps({"index": index, **result}, ensure_ascii=False) + "\n"
+                out_stream.write(line if to_stdout else line.encode("utf-8"))
+                index += 1
+                written += 1
+                failed += "error" in result
+            out_stream.flush()
+            if checkpoint:
+                write_checkpoint(checkpoint, index, None if to_stdout else out_stream.tell())
+    finally:
+        if in_stream is not sys.stdin:
+            in_stream.close()
+        if not to_stdout:
+            out_stream.close()
+    
+    return written, failed
+
+
+def main(argv: List[str] = None) -> int:
+    """Command-line entry point."""
+    parser = argparse.ArgumentParser(description="Refine a file of prompts and write JSONL results.")
+    parser.add_argument("input", help="JSONL or text file of prompts ('-' for stdin)")
+    parser.add_argument("-o", "--output", default="-", help="JSONL output file (default: stdout)")
+    parser.add_argument("--format", choices=["jsonl", "text"], help="Input format (default: from extension)")
+    parser.add_argument("-w", "--workers", type=int, default=os.cpu_count() or 1,
+                        help="Worker processes (default: CPU count)")
+    parser.add_argument("--chunksize", type=int, default=DEFAULT_CHUNKSIZE, help="Prompts per worker task")
+    parser.add_argument("--start", type=int, default=0, help="Number of input records to skip")
+    parser.add_argument("--checkpoint", help="File recording the number of records written")
+    parser.add_argument("--resume", action="store_true", help="Start from the offset in --checkpoint")
+    parser.add_argument("--full", action="store_true", help="Write the complete refine result per prompt")
+    parser.add_argument("-v", "--verbose", action="store_true", help="Log progress")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO if args.verbose else logging.WARNING)
+    if not args.verbose:
+        logging.getLogger("promptgen").setLevel(logging.WARNING)
+
+    start, output_bytes, append = args.start, None, False
+    if args.resume:
+        if not args.checkpoint:
+            parser.error("--resume requires --checkpoint")
+        # Without a checkpoint nothing was recorded, so the output starts over
+        append = os.path.exists(args.checkpoint)
+        offset, output_bytes = read_checkpoint_state(args.checkpoint)
+        start = max(start, offset)
+    if start:
+        logger.info(f"Starting at record {start}")
+
+    written, failed = run(
+        args.input, args.output, args.format, args.workers, args.chunksize,
+        start, args.checkpoint, args.full, append=append, output_bytes=output_bytes
+    )
+    logger.info(f"Refined {written} prompts ({failed} failed)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -182,8 +182,9 @@ class ComplexityAnalyzer:
             'analytics'  # Add analytics as both singular and plural form
         }
         
-        # Get all terms for the domain
-        domain_terms = self.technical_terms[domain].union(common_terms)
+        # Get all terms for the domain (domains without a term list, such as
+        # 'general', use the common terms only)
+        domain_terms = self.technical_terms.get(domain, set()).union(common_terms)
         
         # Sort terms by length (longest first) to handle multi-word terms
         sorted_terms = sorted(domain_terms, key=len, reverse=True)
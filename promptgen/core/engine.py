@@ -0,0 +1,229 @@
+"""
+Shared prompt generation engine for the AI Prompt Generator.
+
+The engine owns the template and technique catalogs, the classifiers, the
+domain service and the template selection caches, and exposes both prompt
+generation APIs on top of them. It is meant to be built once per process
+(see ``get_engine``), warmed explicitly and shared by the Streamlit apps
+and batch jobs. Generating a prompt never modifies the shared templates,
+so concurrent sessions can use one engine.
+"""
+
+import os
+import threading
+import time
+import logging
+from typing import Dict, List, Tuple, Any, Optional, Iterator
+from ..templates.loader import (
+    TemplateLibrary, PromptTemplate, PromptGenerator as TemplateGenerator,
+    compile_content_template
+)
+from ..techniques.library import default_library as default_technique_library
+from ..domains.domain_service import default_service
+from .classifier import default_classifier
+from .complexity import default_analyzer
+from .generator import PromptGenerator, TemplateFactory
+from .technique_selector import TechniqueSelector
+
+# Setup logger
+logger = logging.getLogger(__name__)
+
+# Templates bundled with the package
+DEFAULT_TEMPLATES_DIR = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "templates", "examples"
+)
+
+
+class PromptEngine:
+    """
+    Owns the catalogs and caches used for prompt generation.
+
+    Both generators share the engine's template library and technique
+    library, so templates are parsed once and template selection caches are
+    shared by every caller.
+    """
+
+    def __init__(self,
+                 templates_dir: str = DEFAULT_TEMPLATES_DIR,
+                 lazy: bool = False,
+                 max_loaded: int = None,
+                 workers: int = 1,
+                 technique_library=None,
+                 classifier=None,
+                 complexity_analyzer=None,
+                 domain_service=None):
+        """
+        Initialize the engine and load its template catalog.
+
+        Args:
+            templates_dir: Directory containing template YAML files
+            lazy: Whether template bodies are loaded on first use
+            max_loaded: In lazy mode, maximum number of template bodies kept in memory
+            workers: Number of processes used to parse template files
+            technique_library: Library of prompting techniques (uses default if None)
+            classifier: Domain classifier (uses default if None)
+            complexity_analyzer: Complexity analyzer (uses default if None)
+            domain_service: Domain service (uses default if None)
+        """
+        self.templates_dir = templates_dir
+        self.template_library = TemplateLibrary(templates_dir, lazy=lazy, max_loaded=max_loaded, workers=workers)
+        self.technique_library = technique_library or default_technique_library
+        self.classifier = classifier or default_classifier
+        self.complexity_analyzer = complexity_analyzer or default_analyzer
+        self.domain_service = domain_service or default_service
+
+        self.template_factory = TemplateFactory(self.template_library)
+        self.technique_selector = TechniqueSelector(self.technique_library)
+
+        # Objective-driven generation (domain and complexity detected when missing)
+        self.generator = PromptGenerator(
+            template_factory=self.template_factory,
+            technique_library=self.technique_library,
+            classifier=self.classifier,
+            complexity_analyzer=self.complexity_analyzer
+        )
+        # Template-driven generation returning (prompt, template)
+        self.template_generator = TemplateGenerator(self.template_library, self.technique_library)
+
+        self.warm_time: Optional[float] = None
+
+    @property
+    def is_warm(self) -> bool:
+        """Whether ``warm`` has run."""
+        return self.warm_time is not None
+
+    def warm(self) -> 'PromptEngine':
+        """
+        Do the one-off startup work up front instead of on the first request.
+
+        Loads template bodies and compiles their section content templates,
+        scores every template and runs the classifiers once. A lazy library
+        with ``max_loaded`` set only has that many bodies loaded.
+
+        Returns:
+            The engine, for chaining
+        """
+        start = time.perf_counter()
+
+        library = self.template_library
+        names = library.list_templates()
+        # Bodies past the budget would just evict the ones loaded before them
+        body_budget = len(names)
+        if getattr(library, 'lazy', False) and library.max_loaded is not None:
+            body_budget = max(1, library.max_loaded)
+
+        for i, name in enumerate(names):
+            template = library.get(name)
+            if i < body_budget:
+                for section in template.definition().get('sections', []):
+                    if section.get('content_template'):
+                        compile_content_template(section['content_template'])
+            self.template_factory.score_template(template, template.domain, template.complexity_range[0])
+
+        domain, _ = self.classifier.classify_domain("Warm up the prompt engine")
+        self.complexity_analyzer.analyze_complexity("Warm up the prompt engine", domain)
+
+        self.warm_time = time.perf_counter() - start
+        logger.info(f"Prompt engine warmed in {self.warm_time:.3f}s "
+                    f"({len(self.template_library.list_templates())} templates)")
+        return self
+
+    def generate_prompt(self,
+                        objective: str,
+                        domain: str = None,
+                        complexity: int = None,
+                        components: List[str] = None,
+                        context: Dict[str, Any] = None,
+                        techniques: List[Tuple[str, Dict[str, Any]]] = None) -> str:
+        """
+        Generate a prompt from an objective, detecting domain and complexity when missing.
+
+        See ``core.generator.PromptGenerator.generate_prompt``.
+        """
+        return self.generator.generate_prompt(
+            objective=objective,
+            domain=domain,
+            complexity=complexity,
+            components=components,
+            context=context,
+            techniques=techniques
+        )
+
+    async def agenerate_prompt(self,
+                               objective: str,
+                               domain: str = None,
+                               complexity: int = None,
+                               components: List[str] = None,
+                               context: Dict[str, Any] = None,
+                               techniques: List[Tuple[str, Dict[str, Any]]] = None) -> str:
+        """
+        Generate a prompt without blocking the event loop.
+
+        See ``core.generator.PromptGenerator.agenerate_prompt``.
+        """
+        return await self.generator.agenerate_prompt(
+            objective=objective,
+            domain=domain,
+            complexity=complexity,
+            components=components,
+            context=context,
+            techniques=techniques
+        )
+
+    def generate_from_template(self,
+                               objective: str,
+                               domain: str,
+                               task: str,
+                               complexity: int,
+                               context: Dict[str, Any] = None,
+                               techniques: List[Tuple[str, Dict[str, Any]]] = None,
+                               template_name: str = None) -> Tuple[str, Optional[PromptTemplate]]:
+        """
+        Generate a prompt from the best matching (or named) template.
+
+        See ``templates.loader.PromptGenerator.generate_prompt``.
+
+        Returns:
+            Tuple of (generated prompt, template used), or (error message, None)
+        """
+        return self.template_generator.generate_prompt(
+            objective=objective,
+            domain=domain,
+            task=task,
+            complexity=complexity,
+            context=context,
+            techniques=techniques,
+            template_name=template_name
+        )
+
+    def stream_prompt(self, *args, **kwargs) -> Iterator[str]:
+        """Stream a template-driven prompt; see ``templates.loader.PromptGenerator.stream_prompt``."""
+        return self.template_generator.stream_prompt(*args, **kwargs)
+
+    def generate_many(self, requests: List[Dict[str, Any]], workers: int = 1,
+                      chunksize: int = None) -> List[Dict[str, Any]]:
+        """Generate template-driven prompts in bulk; see ``templates.loader.PromptGenerator.generate_many``."""
+        return self.template_generator.generate_many(requests, workers=workers, chunksize=chunksize)
+
+
+_engine: Optional[PromptEngine] = None
+_engine_lock = threading.Lock()
+
+
+def get_engine(warm: bool = True) -> PromptEngine:
+    """
+    Get the process-wide engine, building it on first use.
+
+    Args:
+        warm: Whether to warm the engine if it has not been warmed yet
+
+    Returns:
+        The shared PromptEngine instance
+    """
+    global _engine
+    with _engine_lock:
+        if _engine is None:
+            _engine = PromptEngine()
+        if warm and not _engine.is_warm:
+            _engine.warm()
+    return _engine
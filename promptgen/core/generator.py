@@ -5,12 +5,23 @@ This module provides the core functionality for generating structured prompts
 based on user objectives, domains, and templates.
 """
 
-from typing import Dict, List, Tuple, Any, Optional
+from typing import Dict, List, Tuple, Any, Optional, FrozenSet, Callable
+from collections import OrderedDict
+from weakref import WeakKeyDictionary
+from dataclasses import dataclass, field
+import heapq
+import itertools
 import logging
-from ..templates.loader import PromptTemplate, TemplateLibrary
+import time
+from concurrent.futures import Executor
+from ..templates.loader import (
+    PromptTemplate, TemplateLibrary, fill_placeholders,
+    apply_technique_sequence, split_technique_sequence
+)
 from ..techniques.library import PromptTechnique, get_technique
-from .classifier import classify_domain
-from .complexity import analyze_complexity
+from .classifier import default_classifier
+from .complexity import default_analyzer
+from ..utils.concurrency import run_cpu_bound
 
 # Setup logger
 logger = logging.getLogger(__name__)
@@ -24,12 +35,13 @@ class TemplateFactory:
     based on domain type, complexity, and other factors.
     """
     
-    def __init__(self, template_library=None):
+    def __init__(self, template_library=None, memo_size: int = 1024):
         """
         Initialize the factory with a template library.
         
         Args:
             template_library: Library containing available templates
+            memo_size: Maximum number of selection queries to keep cached
         """
         from ..templates.loader import default_library
         self.template_library = template_library or default_library
@@ -42,6 +54,48 @@ class TemplateFactory:
             'component_match': 0.6,  # Required components present
             'tag_match': 0.3,  # Matching tags
         }
+        
+        # Per-template section/tag sets, kept while their template is alive,
+        # and memoized selections, both valid for one catalog version
+        self.memo_size = memo_size
+        self._catalog_version = None
+        self._section_sets: 'WeakKeyDictionary[PromptTemplate, Tuple[Any, int, FrozenSet[str]]]' = WeakKeyDictionary()
+        self._tag_sets: 'WeakKeyDictionary[PromptTemplate, FrozenSet[str]]' = WeakKeyDictionary()
+        self._selections: 'OrderedDict[Tuple, PromptTemplate]' = OrderedDict()
+    
+    def _check_catalog_version(self) -> Optional[int]:
+        """Drop cached data if the library changed; return its version (None if untracked)."""
+        version = getattr(self.template_library, 'version', None)
+        if not isinstance(version, int):
+            # Without a version only per-template data can be cached safely
+            return None
+        if version != self._catalog_version:
+            self._section_sets.clear()
+            self._tag_sets.clear()
+            self._selections.clear()
+            self._catalog_version = version
+        return version
+    
+    def _section_set(self, template: PromptTemplate) -> FrozenSet[str]:
+        """Get the names of a template's required and optional sections, computed once per section list."""
+        cached = self._section_sets.get(template)
+        if cached is not None and not getattr(template, 'is_loaded', True):
+            # An unloaded lazy template reloads the same sections; don't load it just to check
+            return cached[2]
+        
+        # Section lists are replaced (conditional sections) or extended in place
+        current = getattr(template, 'sections', None)
+        if cached is None or cached[0] is not current or cached[1] != len(current or ()):
+            names = frozenset(template.get_required_sections()) | frozenset(template.get_optional_sections())
+            cached = self._section_sets[template] = (current, len(current or ()), names)
+        return cached[2]
+    
+    def _tag_set(self, template: PromptTemplate) -> FrozenSet[str]:
+        """Get a template's tags as a set, computed once."""
+        tags = self._tag_sets.get(template)
+        if tags is None:
+            tags = self._tag_sets[template] = frozenset(template.tags or ())
+        return tags
     
     def score_template(self, template: PromptTemplate, domain: str, complexity: int, 
                       components: List[str] = None, tags: List[str] = None) -> float:
@@ -77,25 +131,61 @@ class TemplateFactory:
             
         # Component match
         if components:
-            required = set(template.get_required_sections())
-            optional = set(template.get_optional_sections())
-            all_sections = required.union(optional)
+            all_sections = self._section_set(template)
             match_ratio = sum(1 for c in components if c in all_sections) / len(components)
             score += weights['component_match'] * match_ratio
             
         # Tag match
         if tags and template.tags:
-            tag_matches = sum(1 for tag in tags if tag in template.tags)
+            template_tags = self._tag_set(template)
+            tag_matches = sum(1 for tag in tags if tag in template_tags)
             tag_ratio = tag_matches / len(tags)
             score += weights['tag_match'] * tag_ratio
             
         return max(0.0, min(1.0, score))
     
+    def rank_templates(self, domain_type: str, complexity: int,
+                       components: List[str] = None, tags: List[str] = None,
+                       k: int = 1) -> List[Tuple[float, PromptTemplate]]:
+        """
+        Get the k best-scoring templates for the requirements.
+        
+        Domain-specific templates are scored as-is and general templates with
+        a small penalty. Ties keep catalog order.
+        
+        Args:
+            domain_type: The domain of the prompt (e.g., 'software', 'content')
+            complexity: The complexity level of the task (1-5)
+            components: Optional list of required components/sections
+            tags: Optional list of desired tags
+            k: Number of templates to return
+            
+        Returns:
+            List of (score, template) tuples, best first
+        """
+        self._check_catalog_version()
+        
+        # Get all potentially suitable templates
+        templates = self.template_library.find_templates(domain_type, complexity)
+        general_templates = self.template_library.find_templates("general", complexity)
+        
+        scored_templates = itertools.chain(
+            ((self.score_template(template, domain_type, complexity, components, tags), template)
+             for template in templates),
+            # Score general templates with a small penalty
+            ((self.score_template(template, domain_type, complexity, components, tags) * 0.9, template)
+             for template in general_templates)
+        )
+        return heapq.nlargest(k, scored_templates, key=lambda x: x[0])
+    
     def create_template(self, domain_type: str, complexity: int, 
                        components: List[str] = None, tags: List[str] = None) -> PromptTemplate:
         """
         Create a template based on domain type, complexity, and required components.
         
+        Selections are memoized per (domain, complexity, components, tags)
+        query until the template library changes.
+        
         Args:
             domain_type: The domain of the prompt (e.g., 'software', 'content')
             complexity: The complexity level of the task (1-5)
@@ -108,57 +198,218 @@ class TemplateFactory:
         Raises:
             ValueError: If no suitable template is found
         """
-        # Get all potentially suitable templates
-        templates = self.template_library.find_templates(domain_type, complexity)
-        general_templates = self.template_library.find_templates("general", complexity)
+        version = self._check_catalog_version()
+        key = (domain_type, complexity,
+               tuple(components) if components else None,
+               tuple(tags) if tags else None)
+        if version is not None and key in self._selections:
+            self._selections.move_to_end(key)
+            return self._selections[key]
         
-        # Score all templates
-        scored_templates = []
-        
-        # Score domain-specific templates
-        for template in templates:
-            score = self.score_template(template, domain_type, complexity, components, tags)
-            scored_templates.append((score, template))
-            
-        # Score general templates with a small penalty
-        for template in general_templates:
-            score = self.score_template(template, domain_type, complexity, components, tags) * 0.9
-            scored_templates.append((score, template))
-            
-        if not scored_templates:
+        best = self.rank_templates(domain_type, complexity, components, tags, k=1)
+        if not best:
             raise ValueError(f"No templates available for domain '{domain_type}' with complexity {complexity}")
             
-        # Sort by score and return the best match
-        scored_templates.sort(reverse=True, key=lambda x: x[0])
-        best_score, best_template = scored_templates[0]
-        
+        best_score, best_template = best[0]
         logger.info(f"Selected template '{best_template.name}' with score {best_score:.2f}")
+        
+        if version is not None:
+            self._selections[key] = best_template
+            if len(self._selections) > self.memo_size:
+                self._selections.popitem(last=False)
         return best_template
 
 
+@dataclass
+class GenerationState:
+    """
+    Intermediate results of the prompt generation pipeline.
+    
+    Every stage fills in one output field. A stage is skipped when its output
+    is already set, so callers can supply known values up front or rerun the
+    pipeline on a state from an earlier run to reuse its stage outputs.
+    """
+    objective: str
+    context: Dict[str, Any] = field(default_factory=dict)
+    techniques: List[Tuple[str, Dict[str, Any]]] = field(default_factory=list)
+    
+    # Stage outputs
+    domain: Optional[str] = None
+    domain_confidence: Optional[float] = None
+    complexity: Optional[int] = None
+    complexity_analysis: Optional[Dict[str, Any]] = None
+    components: Optional[List[str]] = None
+    template: Optional[PromptTemplate] = None
+    sections: Optional[List[Tuple[str, str]]] = None
+    technique_wrapping: Optional[Tuple[str, str]] = None
+    prompt: Optional[str] = None
+    
+    # Bookkeeping
+    timings: Dict[str, float] = field(default_factory=dict)
+    skipped: List[str] = field(default_factory=list)
+
+
+def populate_section(section: Dict[str, Any], context: Dict[str, Any]) -> str:
+    """
+    Populate a template section with context variables.
+    
+    Args:
+        section: Section definition
+        context: Context variables for substitution
+        
+    Returns:
+        Populated section content (unknown placeholders become ``[name]``)
+    """
+    template_str = section.get('content_template', '')
+    if not template_str:
+        return ''
+    return fill_placeholders(template_str, context)
+
+
 class PromptGenerator:
     """
     Main class for generating prompts based on user objectives.
+    
+    Generation runs as a pipeline of stages: classify the domain, analyze
+    complexity, select a template, populate its sections, apply techniques
+    and render the prompt. Each stage reads and writes a ``GenerationState``.
     """
     
-    def __init__(self, template_factory=None, technique_library=None):
+    # (stage name, method name, output field) in execution order
+    STAGES = (
+        ("classify", "_classify", "domain"),
+        ("analyze", "_analyze", "complexity"),
+        ("select", "_select_template", "template"),
+        ("populate", "_populate", "sections"),
+        ("techniques", "_apply_techniques", "technique_wrapping"),
+        ("render", "_render", "prompt"),
+    )
+    
+    def __init__(self, template_factory=None, technique_library=None,
+                 populator: Callable[[Dict[str, Any], Dict[str, Any]], str] = None,
+                 classifier=None, complexity_analyzer=None):
         """
         Initialize the prompt generator with a template factory.
         
         Args:
             template_factory: Factory for creating templates
             technique_library: Library of prompting techniques
+            populator: Optional callable returning the content for a
+                (section definition, context) pair
+            classifier: Domain classifier (uses the default if None)
+            complexity_analyzer: Complexity analyzer (uses the default if None)
         """
         self.template_factory = template_factory or TemplateFactory()
         from ..techniques.library import default_library
         self.technique_library = technique_library or default_library
+        self.populator = populator or populate_section
+        self.classifier = classifier or default_classifier
+        self.complexity_analyzer = complexity_analyzer or default_analyzer
+    
+    def run_pipeline(self, state: GenerationState) -> GenerationState:
+        """
+        Run every pipeline stage whose output is not yet in the state.
+        
+        Stage timings (in seconds) are recorded in ``state.timings`` and the
+        names of skipped stages in ``state.skipped``.
+        
+        Args:
+            state: Generation state, possibly with some stage outputs supplied
+            
+        Returns:
+            The same state with all stage outputs filled in
+        """
+        for stage, method_name, output in self.STAGES:
+            if getattr(state, output) is not None:
+                state.skipped.append(stage)
+                continue
+            
+            start = time.perf_counter()
+            getattr(self, method_name)(state)
+            state.timings[stage] = time.perf_counter() - start
+        
+        logger.debug("Prompt pipeline timings: %s (skipped: %s)", state.timings, state.skipped)
+        return state
+    
+    def _classify(self, state: GenerationState) -> None:
+        """Classify the objective's domain."""
+        state.domain, state.domain_confidence = self.classifier.classify_domain(state.objective)
+    
+    def _analyze(self, state: GenerationState) -> None:
+        """Estimate complexity and identify components."""
+        state.complexity, state.complexity_analysis = self.complexity_analyzer.analyze_complexity(
+            state.objective, state.domain
+        )
+        
+        # If components not provided, use identified ones from analysis
+        if not state.components and "components" in state.complexity_analysis:
+            state.components = state.complexity_analysis["components"]
+    
+    def _select_template(self, state: GenerationState) -> None:
+        """Select the template for the domain, complexity and components."""
+        state.template = self.template_factory.create_template(
+            domain_type=state.domain,
+            complexity=state.complexity,
+            components=state.components
+        )
+    
+    def _populate(self, state: GenerationState) -> None:
+        """Populate the sections that apply for the context."""
+        context = self._template_context(state)
+        sections = []
+        # resolve_sections leaves the (possibly shared) template untouched
+        for section in state.template.resolve_sections(context):
+            content = self.populator(section, context)
+            if content:
+                sections.append((section['name'], content))
+        state.sections = sections
+    
+    def _apply_techniques(self, state: GenerationState) -> None:
+        """Reduce the techniques to the text they add around the prompt."""
+        if not state.techniques:
+            state.technique_wrapping = ("", "")
+        else:
+            # Stays None when a technique rewrites the prompt or adds text depending on it;
+            # _render then applies the techniques to the whole prompt
+            state.technique_wrapping = split_technique_sequence(self.technique_library, state.techniques)
+    
+    def _render(self, state: GenerationState) -> None:
+        """Join the populated sections, technique text and best practices."""
+        body = "\n\n".join(f"# {name}\n{content}" for name, content in state.sections)
+        if state.technique_wrapping is None:
+            prompt = apply_technique_sequence(self.technique_library, body, state.techniques)
+        else:
+            prefix, suffix = state.technique_wrapping
+            prompt = prefix + body + suffix
+        
+        if state.template.best_practices:
+            prompt += "\n\n# Best Practices\n" + "\n".join(
+                f"- {practice}" for practice in state.template.best_practices
+            )
+        state.prompt = prompt
+    
+    @staticmethod
+    def _template_context(state: GenerationState) -> Dict[str, Any]:
+        """Build the context the template is populated with."""
+        context = dict(state.context)
+        context["objective"] = state.objective
+        context["domain"] = state.domain
+        context["complexity"] = state.complexity
+        if state.domain_confidence is not None:
+            context["domain_confidence"] = state.domain_confidence
+        if state.complexity_analysis is not None:
+            context["complexity_analysis"] = state.complexity_analysis
+        if state.components:
+            context["components"] = state.components
+        return context
     
     def generate_prompt(self, 
                        objective: str, 
                        domain: str = None, 
                        complexity: int = None,
                        components: List[str] = None,
-                       context: Dict[str, Any] = None) -> str:
+                       context: Dict[str, Any] = None,
+                       techniques: List[Tuple[str, Dict[str, Any]]] = None) -> str:
         """
         Generate a prompt based on the user objective.
         
@@ -168,42 +419,57 @@ class PromptGenerator:
             complexity: The complexity level (if known, otherwise will be estimated)
             components: Optional list of required components/sections
             context: Additional context for prompt generation
+            techniques: Optional list of (technique_name, context) tuples
             
         Returns:
             Generated prompt text
         """
-        context = context or {}
-        context["objective"] = objective
-        
-        # If domain not provided, classify it
-        if not domain:
-            domain, confidence = classify_domain(objective)
-            context["domain_confidence"] = confidence
+        state = GenerationState(
+            objective=objective,
+            context=context or {},
+            techniques=techniques or [],
+            domain=domain or None,
+            complexity=complexity or None,
+            components=components or None
+        )
+        return self.run_pipeline(state).prompt
+    
+    async def agenerate_prompt(self, 
+                               objective: str, 
+                               domain: str = None, 
+                               complexity: int = None,
+                               components: List[str] = None,
+                               context: Dict[str, Any] = None,
+                               techniques: List[Tuple[str, Dict[str, Any]]] = None,
+                               executor: Executor = None) -> str:
+        """
+        Generate a prompt without blocking the event loop.
         
-        context["domain"] = domain
+        The pipeline is CPU-bound, so it runs on a bounded executor shared by
+        all async callers.
         
-        # If complexity not provided, analyze it
-        if not complexity:
-            complexity, analysis = analyze_complexity(objective, domain)
-            context["complexity_analysis"] = analysis
+        Args:
+            objective: The user objective
+            domain: The domain (if known, otherwise will be classified)
+            complexity: The complexity level (if known, otherwise will be estimated)
+            components: Optional list of required components/sections
+            context: Additional context for prompt generation
+            techniques: Optional list of (technique_name, context) tuples
+            executor: Executor to run the pipeline on (defaults to the shared one)
             
-            # If components not provided, use identified ones from analysis
-            if not components and "components" in analysis:
-                components = analysis["components"]
-        
-        context["complexity"] = complexity
-        if components:
-            context["components"] = components
-        
-        # Get appropriate template
-        template = self.template_factory.create_template(
-            domain_type=domain,
+        Returns:
+            Generated prompt text
+        """
+        return await run_cpu_bound(
+            self.generate_prompt,
+            objective=objective,
+            domain=domain,
             complexity=complexity,
-            components=components
+            components=components,
+            context=context,
+            techniques=techniques,
+            executor=executor
         )
-        
-        # Generate the prompt using the template
-        return template.generate(context)
 
 
 # Default instance for convenience
@@ -234,4 +500,31 @@ def generate_prompt(objective: str,
         complexity=complexity,
         components=components,
         context=context
-    ) 
\ No newline at end of file
+    )
+
+
+async def agenerate_prompt(objective: str, 
+                           domain: str = None, 
+                           complexity: int = None,
+                           components: List[str] = None,
+                           context: Dict[str, Any] = None) -> str:
+    """
+    Convenience coroutine to generate a prompt using the default generator.
+    
+    Args:
+        objective: The user objective
+        domain: Optional domain classification
+        complexity: Optional complexity level
+        components: Optional required components
+        context: Additional context for generation
+        
+    Returns:
+        Generated prompt text
+    """
+    return await default_generator.agenerate_prompt(
+        objective=objective,
+        domain=domain,
+        complexity=complexity,
+        components=components,
+        context=context
+    )
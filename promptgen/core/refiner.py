@@ -5,14 +5,200 @@ This module provides the core functionality for analyzing existing prompts
 and generating targeted enhancements to improve their effectiveness.
 """
 
-from typing import Dict, List, Tuple, Any, Optional
+from typing import Dict, List, Tuple, Any, Optional, Pattern, Sequence, Callable, Iterator
+from collections.abc import Mapping
+from contextlib import contextmanager
+from functools import lru_cache
+import hashlib
+import inspect
+import itertools
+import mmap
+import os
 import re
+import time
 import logging
+import numpy as np
 
 # Setup logger
 logger = logging.getLogger(__name__)
 
 
+# Bytes copied at a time when counting over a memory-mapped buffer
+BUFFER_CHUNK_SIZE = 1 << 20
+
+# Batch detection stops counting past the largest word and section counts
+# the issue detectors and quality score distinguish
+BATCH_WORD_LIMIT = 501
+BATCH_SECTION_LIMIT = 3
+
+
+@lru_cache(maxsize=8)
+def _compile_header_scanner(patterns: Tuple[str, ...], binary: bool = False) -> Pattern:
+    """
+    Combine section header patterns into a single multiline scanner.
+    
+    Each pattern becomes one alternative anchored at a line start, tried in
+    list order, so a line is attributed to the first pattern that matches
+    anywhere in it, as when the patterns are searched one by one. The first
+    capturing group of each pattern becomes the named group ``name<i>``.
+    Consecutive patterns that start with ``#`` share a lookahead, so lines
+    without a ``#`` skip them in one check.
+    
+    Args:
+        patterns: Header patterns that each match within a single line
+        binary: Whether to compile the scanner for bytes-like buffers
+        
+    Returns:
+        Compiled pattern whose matches start at header lines
+    """
+    alternatives = []
+    hash_run = []
+    
+    def close_hash_run():
+        if hash_run:
+            alternatives.append('(?=[^\\n]*#)(?:' + '|'.join(hash_run) + ')')
+            hash_run.clear()
+    
+    for i, pattern in enumerate(patterns):
+        pattern = re.sub(r'(?<!\\)\((?!\?)', f'(?P<name{i}>', pattern, count=1)
+        if pattern.startswith('^'):
+            close_hash_run()
+            alternatives.append(f'(?:{pattern[1:]})')
+        elif pattern.startswith('#'):
+            hash_run.append(f'(?:[^\\n]*?{pattern})')
+        else:
+            close_hash_run()
+            alternatives.append(f'(?:[^\\n]*?{pattern})')
+    close_hash_run()
+    scanner = '^(?:' + '|'.join(alternatives) + ')'
+    return re.compile(scanner.encode('utf-8') if binary else scanner, re.MULTILINE)
+
+
+@lru_cache(maxsize=64)
+def _binary_pattern(pattern: str, flags: int) -> Pattern:
+    """Compile a text pattern for bytes-like buffers (character classes become ASCII-only)."""
+    return re.compile(pattern.encode('utf-8'), flags & ~re.UNICODE)
+
+
+def _count_in_buffer(buffer: Any, sub: bytes, start: int = 0, end: int = None) -> int:
+    """Count occurrences of a single byte in a buffer slice, copying one chunk at a time."""
+    end = len(buffer) if end is None else end
+    return sum(
+        buffer[position:min(position + BUFFER_CHUNK_SIZE, end)].count(sub)
+        for position in range(start, end, BUFFER_CHUNK_SIZE)
+    )
+
+
+def _count_words_in_buffer(buffer: Any) -> int:
+    """Count whitespace-separated words in a buffer, copying one chunk at a time."""
+    count = 0
+    previous_ends_in_word = False
+    for position in range(0, len(buffer), BUFFER_CHUNK_SIZE):
+        chunk = buffer[position:position + BUFFER_CHUNK_SIZE]
+        count += len(chunk.split())
+        # A word split across the chunk boundary was counted twice
+        if previous_ends_in_word and not chunk[:1].isspace():
+            count -= 1
+        previous_ends_in_word = not chunk[-1:].isspace()
+    return count
+
+
+class SectionSpan(Mapping):
+    """
+    A section of a buffer-backed prompt, recorded as byte offsets.
+    
+    Behaves like the section dictionaries of ``PromptAnalyzer.analyze`` but
+    only decodes its content from the buffer when ``content`` is read.
+    """
+    
+    __slots__ = ("name", "start", "end", "line_start", "line_end", "_buffer", "_encoding", "_content")
+    _KEYS = ("name", "content", "line_start", "line_end")
+    
+    def __init__(self, name: str, buffer: Any, start: int, end: int,
+                 line_start: int, line_end: int, encoding: str = 'utf-8'):
+        """
+        Initialize a section span.
+        
+        Args:
+            name: Section name
+            buffer: Bytes-like buffer holding the prompt
+            start: Offset where the section content starts
+            end: Offset where the section content ends (exclusive)
+            line_start: First content line
+            line_end: Last content line
+            encoding: Encoding of the buffer
+        """
+        self.name = name
+        self.start = start
+        self.end = end
+        self.line_start = line_start
+        self.line_end = line_end
+        self._buffer = buffer
+        self._encoding = encoding
+        self._content = None
+    
+    @property
+    def content(self) -> str:
+        """The stripped section content, decoded from the buffer."""
+        if self._content is not None:
+            return self._content
+        return self._buffer[self.start:self.end].decode(self._encoding, errors='replace').strip()
+    
+    def detach(self) -> None:
+        """Decode the content now and drop the reference to the buffer, so it can be closed."""
+        self._content = self.content
+        self._buffer = None
+    
+    def __getitem__(self, key: str) -> Any:
+        if key not in self._KEYS:
+            raise KeyError(key)
+        return getattr(self, key)
+    
+    def __iter__(self):
+        return iter(self._KEYS)
+    
+    def __len__(self) -> int:
+        return len(self._KEYS)
+    
+    def __repr__(self) -> str:
+        return (f"SectionSpan(name={self.name!r}, start={self.start}, end={self.end}, "
+                f"line_start={self.line_start}, line_end={self.line_end})")
+
+
+def issue_detector(detect: Callable[[str, Dict[str, Any]], bool],
+                   detect_batch: Callable[[Dict[str, Any]], np.ndarray] = None) -> Callable:
+    """
+    Pair an issue detector with its vectorized form for ``detect_issues_batch``.
+    
+    Args:
+        detect: Callable taking (prompt, features) and returning whether the issue is present
+        detect_batch: Callable taking the arrays of ``detect_issues_batch`` and
+                      returning a boolean array with one entry per prompt
+        
+    Returns:
+        ``detect``, with ``detect_batch`` stored as its ``batch`` attribute
+    """
+    detect.batch = detect_batch
+    return detect
+
+
+@lru_cache(maxsize=256)
+def _takes_features(detector: Callable) -> bool:
+    """Whether an issue detector takes (prompt, features) rather than just the prompt."""
+    try:
+        parameters = inspect.signature(detector).parameters.values()
+    except (TypeError, ValueError):
+        return False
+    positional = [p for p in parameters
+                  if p.kind in (inspect.Parameter.POSITIONAL_ONLY, inspect.Parameter.POSITIONAL_OR_KEYWORD)]
+    return len(positional) >= 2 or any(p.kind == inspect.Parameter.VAR_POSITIONAL for p in parameters)
+
+
+def _detect(detector: Callable, prompt: str, features: Dict[str, Any]) -> bool:
+    """Run an issue detector with the arguments it takes."""
+    return detector(prompt, features) if _takes_features(detector) else detector(prompt)
+
+
 class PromptAnalyzer:
     """
     Analyzer class for existing prompts to identify structure and potential improvements.
@@ -20,37 +206,69 @@ class PromptAnalyzer:
     
     def __init__(self):
         """Initialize the prompt analyzer."""
-        # Patterns for identifying sections in prompts
+        # Patterns for identifying sections in prompts. Each pattern matches
+        # within a single line ([^\S\n] is whitespace other than a newline), so
+        # they can be combined into one scanner over the whole prompt.
         self.section_patterns = [
             # Common section headings (with variations in formatting)
-            r'#+\s*(Context|Background|Introduction|Overview)',
-            r'#+\s*(Instructions|Requirements|Specifications|Guidelines)',
-            r'#+\s*(Format|Structure|Organization|Layout)',
-            r'#+\s*(Constraints|Limitations|Restrictions)',
-            r'#+\s*(Examples?|Samples?|Reference|Demo)',
-            r'#+\s*(Output|Deliverables|Results|Expectations)',
+            r'#+[^\S\n]*(Context|Background|Introduction|Overview)',
+            r'#+[^\S\n]*(Instructions|Requirements|Specifications|Guidelines)',
+            r'#+[^\S\n]*(Format|Structure|Organization|Layout)',
+            r'#+[^\S\n]*(Constraints|Limitations|Restrictions)',
+            r'#+[^\S\n]*(Examples?|Samples?|Reference|Demo)',
+            r'#+[^\S\n]*(Output|Deliverables|Results|Expectations)',
             
             # Sections often found in programming prompts
-            r'#+\s*(Code\s*Structure|Technical\s*Requirements|Architecture)',
-            r'#+\s*(Testing|Validation|Quality\s*Assurance)',
-            r'#+\s*(Best\s*Practices|Guidelines|Standards)',
+            r'#+[^\S\n]*(Code[^\S\n]*Structure|Technical[^\S\n]*Requirements|Architecture)',
+            r'#+[^\S\n]*(Testing|Validation|Quality[^\S\n]*Assurance)',
+            r'#+[^\S\n]*(Best[^\S\n]*Practices|Guidelines|Standards)',
             
             # Sections for content prompts
-            r'#+\s*(Tone|Voice|Style|Audience)',
-            r'#+\s*(Key\s*Points|Messages|Talking\s*Points)',
+            r'#+[^\S\n]*(Tone|Voice|Style|Audience)',
+            r'#+[^\S\n]*(Key[^\S\n]*Points|Messages|Talking[^\S\n]*Points)',
             
             # Other common patterns
-            r'#+\s*[A-Z][A-Za-z\s]+:',  # Any capitalized heading with colon
-            r'^[A-Z][A-Za-z\s]+:',      # Line starting with capitalized word and colon
+            r'#+[^\S\n]*[A-Z](?:[A-Za-z]|[^\S\n])+:',  # Any capitalized heading with colon
+            r'^[A-Z](?:[A-Za-z]|[^\S\n])+:',            # Line starting with capitalized word and colon
         ]
         
-        # Common issues in prompts
+        # Keyword groups counted once per prompt and shared by the issue detectors
+        self.keyword_patterns = {
+            "context": re.compile(r'context|background|overview', re.I),
+            "examples": re.compile(r'example|sample|for instance', re.I),
+            "output_format": re.compile(r'format|structure|organization|output', re.I),
+        }
+        
+        # Keywords used to infer the prompt domain
+        self.domain_patterns = {
+            "software": re.compile(r'\b(code|program|function|algorithm|software|development|api|database)\b', re.I),
+            "content": re.compile(r'\b(write|article|content|blog|story|marketing|creative)\b', re.I),
+            "business": re.compile(r'\b(business|strategy|market|analysis|customer|product|service)\b', re.I),
+            "data_analysis": re.compile(r'\b(data|analysis|statistics|visualization|pattern|dashboard|report)\b', re.I),
+            "technical_documentation": re.compile(r'\b(documentation|guide|manual|reference|tutorial|api|specification)\b', re.I)
+        }
+        
+        # Common issues in prompts. A detector taking one argument gets the
+        # prompt text; one taking two gets (prompt, features of _extract_features).
+        # The vectorized form in a detector's ``batch`` attribute (see
+        # issue_detector) is used by detect_issues_batch; detectors without one
+        # are run prompt by prompt there.
         self.issue_detectors = {
-            "missing_context": lambda p: len(re.findall(r'context|background|overview', p, re.I)) == 0,
-            "vague_instructions": lambda p: len(p.split()) < 50,  # Very simple heuristic
-            "missing_examples": lambda p: len(re.findall(r'example|sample|for instance', p, re.I)) == 0,
-            "missing_output_format": lambda p: len(re.findall(r'format|structure|organization|output', p, re.I)) == 0,
-            "no_sections": lambda p: len(self._extract_sections(p)) <= 1,
+            "missing_context": issue_detector(
+                lambda prompt, f: f["keyword_hits"]["context"] == 0,
+                lambda b: ~b["keyword_present"]["context"]),
+            "vague_instructions": issue_detector(
+                lambda prompt, f: f["word_count"] < 50,  # Very simple heuristic
+                lambda b: b["word_counts"] < 50),
+            "missing_examples": issue_detector(
+                lambda prompt, f: f["keyword_hits"]["examples"] == 0,
+                lambda b: ~b["keyword_present"]["examples"]),
+            "missing_output_format": issue_detector(
+                lambda prompt, f: f["keyword_hits"]["output_format"] == 0,
+                lambda b: ~b["keyword_present"]["output_format"]),
+            "no_sections": issue_detector(
+                lambda prompt, f: len(f["sections"]) <= 1,
+                lambda b: b["section_counts"] <= 1),
         }
     
     def analyze(self, prompt: str) -> Dict[str, Any]:
@@ -63,19 +281,401 @@ class PromptAnalyzer:
         Returns:
             Dictionary with analysis results
         """
+        return self.analyze_with_features(prompt)[0]
+    
+    def analyze_with_features(self, prompt: str) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+        """
+        Analyze a prompt and also return the features the analysis was derived from.
+        
+        The features can be passed to ``analyze_extension`` to analyze the
+        prompt with text appended to it without rescanning the prompt.
+        
+        Args:
+            prompt: The existing prompt text
+            
+        Returns:
+            Tuple of (analysis results, features)
+        """
         logger.info("Analyzing prompt structure and quality")
         
+        features = self._extract_features(prompt)
+        return self._analysis_from_features(prompt, features), features
+    
+    def detect_issues_batch(self, prompts: Sequence[str]) -> Dict[str, Any]:
+        """
+        Detect the issues of many prompts at once.
+        
+        Each prompt gets one pass per compiled keyword pattern (stopping at the
+        first hit), a header scan that stops at the third header and a word
+        split that stops past 500 words, which is all the issue detectors and
+        the quality score depend on. Detectors with a vectorized form then run
+        once per issue type over the whole batch; others run prompt by prompt.
+        
+        Args:
+            prompts: Prompt texts
+            
+        Returns:
+            Dictionary with 'issue_types' (column names), 'issues' (boolean
+            matrix of prompts x issue types), 'word_counts' (capped at
+            BATCH_WORD_LIMIT + 1), 'section_counts' (capped at
+            BATCH_SECTION_LIMIT) and 'keyword_present' (boolean array per
+            keyword group)
+        """
+        count = len(prompts)
+        scanner = _compile_header_scanner(tuple(self.section_patterns))
+        
+        word_counts = np.empty(count, dtype=np.int64)
+        section_counts = np.empty(count, dtype=np.int64)
+        keyword_present = {name: np.empty(count, dtype=bool) for name in self.keyword_patterns}
+        
+        for i, prompt in enumerate(prompts):
+            word_counts[i] = len(prompt.split(None, BATCH_WORD_LIMIT))
+            headers = sum(1 for _ in itertools.islice(scanner.finditer(prompt), BATCH_SECTION_LIMIT))
+            # A prompt without headers is one unstructured section
+            section_counts[i] = max(headers, 1)
+            for name, pattern in self.keyword_patterns.items():
+                keyword_present[name][i] = pattern.search(prompt) is not None
+        
+        batch = {
+            "word_counts": word_counts,
+            "section_counts": section_counts,
+            "keyword_present": keyword_present,
+        }
+        issue_types = list(self.issue_detectors)
+        issues = np.empty((count, len(issue_types)), dtype=bool)
+        features = [None] * count
+        for column, issue_type in enumerate(issue_types):
+            detector = self.issue_detectors[issue_type]
+            detect_batch = getattr(detector, "batch", None)
+            if detect_batch is not None:
+                issues[:, column] = detect_batch(batch)
+                continue
+            
+            # Detectors without a vectorized form see the full features of each prompt
+            for i, prompt in enumerate(prompts):
+                if features[i] is None and _takes_features(detector):
+                    features[i] = self._extract_features(prompt)
+                issues[i, column] = _detect(detector, prompt, features[i])
+        
+        batch["issue_types"] = issue_types
+        batch["issues"] = issues
+        return batch
+    
+    def analyze_batch(self, prompts: Sequence[str]) -> Dict[str, Any]:
+        """
+        Detect issues and compute quality scores for many prompts at once.
+        
+        Scores equal the ``quality_score`` of ``analyze`` for each prompt.
+        
+        Args:
+            prompts: Prompt texts
+            
+        Returns:
+            Dictionary from ``detect_issues_batch`` plus 'quality_scores'
+        """
+        batch = self.detect_issues_batch(prompts)
+        batch["quality_scores"] = self._calculate_quality_scores(batch)
+        return batch
+    
+    def _calculate_quality_scores(self, batch: Dict[str, Any]) -> np.ndarray:
+        """
+        Calculate the quality scores of a batch, as ``_calculate_quality_score`` does for one prompt.
+        
+        Args:
+            batch: Result of ``detect_issues_batch``
+            
+        Returns:
+            Array of quality scores between 0 and 1
+        """
+        word_counts = batch["word_counts"]
+        section_counts = batch["section_counts"]
+        
+        # Each issue reduces score by 0.1
+        scores = 1.0 - batch["issues"].sum(axis=1) * 0.1
+        scores = scores - np.select(
+            [word_counts < 50, word_counts < 100, word_counts > 500], [0.2, 0.1, 0.1], 0.0
+        )
+        scores = scores - np.select([section_counts == 1, section_counts < 3], [0.2, 0.1], 0.0)
+        
+        return np.clip(scores, 0.0, 1.0)
+    
+    def analyze_buffer(self, buffer: Any, encoding: str = 'utf-8') -> Dict[str, Any]:
+        """
+        Analyze a prompt held in a bytes-like buffer, such as a memory map.
+        
+        The buffer is scanned in place and sections are returned as
+        ``SectionSpan`` offsets whose content is decoded only when read, so
+        peak memory stays close to the size of the input. Words and keyword
+        case are matched with ASCII rules, which can differ from ``analyze``
+        for text using non-ASCII whitespace or case variants.
+        
+        Args:
+            buffer: Bytes-like object (bytes, bytearray, mmap) holding the prompt
+            encoding: Encoding of the buffer (must be ASCII-compatible)
+            
+        Returns:
+            Dictionary with analysis results
+        """
+        logger.info("Analyzing buffered prompt structure and quality")
+        
+        features = {
+            "sections": self._scan_buffer_sections(buffer, encoding),
+            "word_count": _count_words_in_buffer(buffer),
+            "keyword_hits": {
+                name: sum(1 for _ in _binary_pattern(pattern.pattern, pattern.flags).finditer(buffer))
+                for name, pattern in self.keyword_patterns.items()
+            },
+            "domain_hits": {
+                domain: sum(1 for _ in _binary_pattern(pattern.pattern, pattern.flags).finditer(buffer))
+                for domain, pattern in self.domain_patterns.items()
+            },
+        }
+        # Detectors taking only the prompt need its text
+        prompt = None
+        if not all(_takes_features(detector) for detector in self.issue_detectors.values()):
+            prompt = str(buffer[:], encoding)
+        return self._analysis_from_features(prompt, features)
+    
+    @contextmanager
+    def open_file(self, path: str, encoding: str = 'utf-8') -> Iterator[Dict[str, Any]]:
+        """
+        Analyze a prompt file through a read-only memory map, closing it on exit.
+        
+        Sections decode their content from the map when it is read, so it
+        must be read inside the ``with`` block (or the sections detached
+        there with ``SectionSpan.detach``).
+        
+        Args:
+            path: Path to the prompt file
+            encoding: Encoding of the file (must be ASCII-compatible)
+            
+        Yields:
+            Dictionary with analysis results, as from ``analyze_buffer``
+        """
+        with open(path, 'rb') as f:
+            if os.fstat(f.fileno()).st_size == 0:
+                yield self.analyze_buffer(b'', encoding)
+                return
+            buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            yield self.analyze_buffer(buffer, encoding)
+        finally:
+            buffer.close()
+    
+    def analyze_file(self, path: str, encoding: str = 'utf-8') -> Dict[str, Any]:
+        """
+        Analyze a prompt file through a read-only memory map.
+        
+        The file is scanned in place and the map is closed before returning,
+        with each section's content decoded; use ``open_file`` to read section
+        content from the map on demand instead.
+        
+        Args:
+            path: Path to the prompt file
+            encoding: Encoding of the file (must be ASCII-compatible)
+            
+        Returns:
+            Dictionary with analysis results, as from ``analyze_buffer``
+        """
+        with self.open_file(path, encoding) as analysis:
+            for section in analysis["sections"]:
+                section.detach()
+        return analysis
+    
+    def _scan_buffer_sections(self, buffer: Any, encoding: str = 'utf-8') -> List[SectionSpan]:
+        """
+        Find the sections of a buffered prompt as byte offsets, like ``_extract_sections``.
+        
+        Args:
+            buffer: Bytes-like object holding the prompt
+            encoding: Encoding of the buffer
+            
+        Returns:
+            List of section spans
+        """
+        sections = []
+        scanner = _compile_header_scanner(tuple(self.section_patterns), binary=True)
+        
+        current_section = None
+        content_start = 0
+        content_line = 0
+        line_number = 0
+        position = 0
+        
+        for match in scanner.finditer(buffer):
+            header_start = match.start()
+            line_number += _count_in_buffer(buffer, b'\n', position, header_start)
+            position = header_start
+            
+            if current_section:
+                sections.append(SectionSpan(current_section, buffer, content_start, header_start,
+                                            content_line, line_number - 1, encoding))
+            
+            header_end = buffer.find(b'\n', header_start)
+            if header_end == -1:
+                header_end = len(buffer)
+            name = next((name for name in match.groups() if name is not None), None)
+            if name is None:
+                name = buffer[header_start:header_end].strip(b'# :')
+            current_section = name.decode(encoding, errors='replace')
+            content_start = header_end + 1
+            content_line = line_number + 1
+        
+        last_line = line_number + _count_in_buffer(buffer, b'\n', position)
+        
+        if current_section:
+            sections.append(SectionSpan(current_section, buffer, content_start, len(buffer),
+                                        content_line, last_line, encoding))
+        else:
+            # If no sections were found, treat the whole prompt as one section
+            sections.append(SectionSpan("Unstructured Content", buffer, 0, len(buffer),
+                                        0, last_line, encoding))
+        
+        return sections
+    
+    def analyze_extension(self, prompt: str, features: Dict[str, Any],
+                          addition: str) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+        """
+        Analyze a prompt extended with added text, reusing the features of the prompt.
+        
+        Only ``addition`` is scanned; its sections and counts are merged into
+        the prompt's features. The addition must start on a new line, which
+        holds for sections appended by ``PromptEnhancer``.
+        
+        Args:
+            prompt: The prompt text that ``features`` were computed for
+            features: Features of ``prompt`` from ``_extract_features``
+            addition: Text appended to the prompt, starting with a newline
+            
+        Returns:
+            Tuple of (analysis results, features) for ``prompt + addition``
+        """
+        logger.debug("Analyzing %d added characters incrementally", len(addition))
+        
+        extended = prompt + addition
+        merged = self._merge_features(prompt, features, addition, self._extract_features(addition))
+        return self._analysis_from_features(extended, merged), merged
+    
+    def _analysis_from_features(self, prompt: str, features: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Derive the analysis results from the features of a prompt.
+        
+        Args:
+            prompt: The prompt text
+            features: Features of the prompt from ``_extract_features``
+            
+        Returns:
+            Dictionary with analysis results
+        """
+        issues = self._identify_issues(prompt, features)
+        
         results = {
-            "sections": self._extract_sections(prompt),
-            "issues": self._identify_issues(prompt),
-            "quality_score": self._calculate_quality_score(prompt),
-            "complexity": self._estimate_complexity(prompt),
-            "word_count": len(prompt.split()),
-            "domain": self._infer_domain(prompt),
+            "sections": features["sections"],
+            "issues": issues,
+            "quality_score": self._calculate_quality_score(prompt, features, issues),
+            "complexity": self._estimate_complexity(prompt, features),
+            "word_count": features["word_count"],
+            "domain": self._infer_domain(prompt, features),
         }
         
         return results
     
+    def _extract_features(self, prompt: str) -> Dict[str, Any]:
+        """
+        Compute the intermediate results shared by the analysis steps.
+        
+        Args:
+            prompt: The prompt text
+            
+        Returns:
+            Dictionary with sections, word count, keyword hits and domain hits,
+            plus the section scan state used to merge features
+        """
+        scan = self._scan_sections(prompt)
+        return {
+            "sections": self._sections_from_scan(prompt, scan),
+            "word_count": len(prompt.split()),
+            "keyword_hits": {
+                name: len(pattern.findall(prompt)) for name, pattern in self.keyword_patterns.items()
+            },
+            "domain_hits": {
+                domain: len(pattern.findall(prompt)) for domain, pattern in self.domain_patterns.items()
+            },
+            "scan": scan,
+        }
+    
+    def _merge_features(self, prompt: str, features: Dict[str, Any],
+                        addition: str, added: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Combine the features of a prompt and of text appended to it.
+        
+        Counts add up because the addition starts on a new line, so no word
+        or single-line pattern match spans the boundary. Sections are merged
+        by continuing the prompt's last section up to the first added header.
+        
+        Args:
+            prompt: The prompt text
+            features: Features of the prompt
+            addition: Text appended to the prompt, starting with a newline
+            added: Features of the addition
+            
+        Returns:
+            Features of ``prompt + addition``
+        """
+        line_offset = features["scan"]["newlines"]
+        added_scan = added["scan"]
+        
+        sections = [dict(section) for section in features["scan"]["sections"]]
+        if sections:
+            # The prompt's last section continues into the addition
+            open_end = added_scan["first_header"] if added_scan["first_header"] is not None else len(addition)
+            last = sections[-1]
+            last["content"] = (prompt[features["scan"]["tail_start"]:] + addition[:open_end]).strip()
+            last["line_end"] = line_offset + (
+                added_scan["first_header_line"] - 1 if added_scan["first_header"] is not None
+                else added_scan["newlines"]
+            )
+        
+        for section in added_scan["sections"]:
+            section = dict(section)
+            section["line_start"] += line_offset
+            section["line_end"] += line_offset
+            sections.append(section)
+        
+        if added_scan["sections"]:
+            tail_start = len(prompt) + added_scan["tail_start"]
+        else:
+            tail_start = features["scan"]["tail_start"]
+        
+        if features["scan"]["sections"]:
+            first_header = features["scan"]["first_header"]
+            first_header_line = features["scan"]["first_header_line"]
+        elif added_scan["sections"]:
+            first_header = len(prompt) + added_scan["first_header"]
+            first_header_line = line_offset + added_scan["first_header_line"]
+        else:
+            first_header = first_header_line = None
+        
+        scan = {
+            "sections": sections,
+            "first_header": first_header,
+            "first_header_line": first_header_line,
+            "tail_start": tail_start,
+            "newlines": line_offset + added_scan["newlines"],
+        }
+        
+        return {
+            "sections": sections or self._sections_from_scan(prompt + addition, scan),
+            "word_count": features["word_count"] + added["word_count"],
+            "keyword_hits": {
+                name: hits + added["keyword_hits"][name] for name, hits in features["keyword_hits"].items()
+            },
+            "domain_hits": {
+                domain: hits + added["domain_hits"][domain] for domain, hits in features["domain_hits"].items()
+            },
+            "scan": scan,
+        }
+    
     def _extract_sections(self, prompt: str) -> List[Dict[str, Any]]:
         """
         Extract section information from the prompt.
@@ -86,75 +686,106 @@ class PromptAnalyzer:
         Returns:
             List of identified sections
         """
+        return self._sections_from_scan(prompt, self._scan_sections(prompt))
+    
+    def _sections_from_scan(self, prompt: str, scan: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """Get the headed sections of a scan, or the whole prompt as one section if there are none."""
+        if scan["sections"]:
+            return scan["sections"]
+        
+        # If no sections were found, treat the whole prompt as one section
+        return [{
+            "name": "Unstructured Content",
+            "content": prompt.strip(),
+            "line_start": 0,
+            "line_end": scan["newlines"]
+        }]
+    
+    def _scan_sections(self, prompt: str) -> Dict[str, Any]:
+        """
+        Find the headed sections of the prompt in one scan.
+        
+        Args:
+            prompt: The prompt text
+            
+        Returns:
+            Dictionary with the headed sections, the offset and line of the
+            first header, the offset where the last section's content starts
+            and the number of newlines in the prompt
+        """
         sections = []
-        lines = prompt.split('\n')
+        scanner = _compile_header_scanner(tuple(self.section_patterns))
         
         current_section = None
-        current_content = []
-        
-        for i, line in enumerate(lines):
-            # Check if line is a section header
-            is_header = False
-            header_match = None
-            
-            for pattern in self.section_patterns:
-                match = re.search(pattern, line)
-                if match:
-                    is_header = True
-                    header_match = match
-                    break
+        first_header = first_header_line = None
+        content_start = 0
+        content_line = 0
+        line_number = 0
+        position = 0
+        
+        # One scan over the whole prompt; each match starts at a header line
+        for match in scanner.finditer(prompt):
+            header_start = match.start()
+            line_number += prompt.count('\n', position, header_start)
+            position = header_start
             
-            if is_header:
-                # If we were already processing a section, add it
-                if current_section:
-                    sections.append({
-                        "name": current_section,
-                        "content": '\n'.join(current_content).strip(),
-                        "line_start": i - len(current_content),
-                        "line_end": i - 1
-                    })
-                
-                # Start new section
-                # Extract section name - this is simplified and might need refinement
-                section_name = header_match.group(1) if header_match and header_match.groups() else line.strip('# :')
-                current_section = section_name
-                current_content = []
-            elif current_section:
-                current_content.append(line)
+            # If we were already processing a section, add it
+            if current_section:
+                sections.append({
+                    "name": current_section,
+                    "content": prompt[content_start:header_start].strip(),
+                    "line_start": content_line,
+                    "line_end": line_number - 1
+                })
+            else:
+                first_header, first_header_line = header_start, line_number
             
+            # Start new section, named by the pattern's group or the header line itself
+            header_end = prompt.find('\n', header_start)
+            if header_end == -1:
+                header_end = len(prompt)
+            current_section = next(
+                (name for name in match.groups() if name is not None),
+                None
+            ) or prompt[header_start:header_end].strip('# :')
+            content_start = header_end + 1
+            content_line = line_number + 1
+        
+        last_line = line_number + prompt.count('\n', position)
+        
         # Add the last section if there is one
         if current_section:
             sections.append({
                 "name": current_section,
-                "content": '\n'.join(current_content).strip(),
-                "line_start": len(lines) - len(current_content),
-                "line_end": len(lines) - 1
-            })
-        elif not sections:
-            # If no sections were found, treat the whole prompt as one section
-            sections.append({
-                "name": "Unstructured Content",
-                "content": prompt.strip(),
-                "line_start": 0,
-                "line_end": len(lines) - 1
+                "content": prompt[content_start:].strip(),
+                "line_start": content_line,
+                "line_end": last_line
             })
         
-        return sections
+        return {
+            "sections": sections,
+            "first_header": first_header,
+            "first_header_line": first_header_line,
+            "tail_start": content_start if current_section else None,
+            "newlines": last_line,
+        }
     
-    def _identify_issues(self, prompt: str) -> List[Dict[str, str]]:
+    def _identify_issues(self, prompt: str, features: Dict[str, Any] = None) -> List[Dict[str, str]]:
         """
         Identify potential issues in the prompt.
         
         Args:
             prompt: The prompt text
+            features: Precomputed features of the prompt (computed if None)
             
         Returns:
             List of identified issues
         """
+        features = features or self._extract_features(prompt)
         issues = []
         
         for issue_name, detector in self.issue_detectors.items():
-            if detector(prompt):
+            if _detect(detector, prompt, features):
                 issue_description = self._get_issue_description(issue_name)
                 issues.append({
                     "type": issue_name,
@@ -174,26 +805,32 @@ class PromptAnalyzer:
         }
         return descriptions.get(issue_name, "Unspecified issue")
     
-    def _calculate_quality_score(self, prompt: str) -> float:
+    def _calculate_quality_score(self, prompt: str, features: Dict[str, Any] = None,
+                                 issues: List[Dict[str, str]] = None) -> float:
         """
         Calculate a quality score for the prompt.
         
         Args:
             prompt: The prompt text
+            features: Precomputed features of the prompt (computed if None)
+            issues: Precomputed issues of the prompt (identified if None)
             
         Returns:
             Quality score between 0 and 1
         """
+        features = features or self._extract_features(prompt)
+        if issues is None:
+            issues = self._identify_issues(prompt, features)
+        
         # Start with a perfect score
         score = 1.0
         
         # For each issue found, reduce the score
-        issues = self._identify_issues(prompt)
         if issues:
             score -= len(issues) * 0.1  # Each issue reduces score by 0.1
         
         # Consider prompt length (very simple heuristic)
-        word_count = len(prompt.split())
+        word_count = features["word_count"]
         if word_count < 50:
             score -= 0.2
         elif word_count < 100:
@@ -202,7 +839,7 @@ class PromptAnalyzer:
             score -= 0.1  # Too long can also be an issue
         
         # Consider section organization
-        sections = self._extract_sections(prompt)
+        sections = features["sections"]
         if len(sections) == 1:
             score -= 0.2
         elif len(sections) < 3:
@@ -211,18 +848,20 @@ class PromptAnalyzer:
         # Ensure score stays in valid range
         return max(0.0, min(1.0, score))
     
-    def _estimate_complexity(self, prompt: str) -> int:
+    def _estimate_complexity(self, prompt: str, features: Dict[str, Any] = None) -> int:
         """
         Estimate the complexity level of the prompt.
         
         Args:
             prompt: The prompt text
+            features: Precomputed features of the prompt (computed if None)
             
         Returns:
             Complexity level between 1 and 5
         """
-        word_count = len(prompt.split())
-        section_count = len(self._extract_sections(prompt))
+        features = features or self._extract_features(prompt)
+        word_count = features["word_count"]
+        section_count = len(features["sections"])
         
         # Very simple complexity calculation
         if word_count < 50 and section_count <= 1:
@@ -236,30 +875,21 @@ class PromptAnalyzer:
         else:
             return 5
     
-    def _infer_domain(self, prompt: str) -> str:
+    def _infer_domain(self, prompt: str, features: Dict[str, Any] = None) -> str:
         """
         Infer the domain of the prompt.
         
         Args:
             prompt: The prompt text
+            features: Precomputed features of the prompt (computed if None)
             
         Returns:
             Inferred domain
         """
         # Simplified domain inference based on keyword presence
         # In a real implementation, we'd use the classifier from the classifier module
-        keyword_patterns = {
-            "software": r'\b(code|program|function|algorithm|software|development|api|database)\b',
-            "content": r'\b(write|article|content|blog|story|marketing|creative)\b',
-            "business": r'\b(business|strategy|market|analysis|customer|product|service)\b',
-            "data_analysis": r'\b(data|analysis|statistics|visualization|pattern|dashboard|report)\b',
-            "technical_documentation": r'\b(documentation|guide|manual|reference|tutorial|api|specification)\b'
-        }
-        
-        domain_scores = {}
-        for domain, pattern in keyword_patterns.items():
-            matches = len(re.findall(pattern, prompt, re.I))
-            domain_scores[domain] = matches
+        features = features or self._extract_features(prompt)
+        domain_scores = features["domain_hits"]
         
         max_domain = max(domain_scores.items(), key=lambda x: x[1])
         
@@ -270,6 +900,84 @@ class PromptAnalyzer:
         return max_domain[0]
 
 
+class AnalysisCache:
+    """
+    Analyses of prompt texts keyed by content hash.
+    
+    One cache is passed along a call chain (refine -> enhance -> ...), so each
+    distinct text is analyzed once however many entry points look at it.
+    """
+    
+    def __init__(self, analyzer: PromptAnalyzer = None):
+        """
+        Initialize an empty analysis cache.
+        
+        Args:
+            analyzer: PromptAnalyzer used for cache misses (will create new one if None)
+        """
+        self.analyzer = analyzer or PromptAnalyzer()
+        self._entries: Dict[Tuple[int, bytes], Tuple[Dict[str, Any], Dict[str, Any]]] = {}
+    
+    @staticmethod
+    def key(prompt: str) -> Tuple[int, bytes]:
+        """Get the cache key for a prompt: its length and a digest of its content."""
+        return len(prompt), hashlib.blake2b(prompt.encode('utf-8', 'surrogatepass'), digest_size=16).digest()
+    
+    def __contains__(self, prompt: str) -> bool:
+        return self.key(prompt) in self._entries
+    
+    def __len__(self) -> int:
+        return len(self._entries)
+    
+    def get(self, prompt: str) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+        """
+        Get the analysis of a prompt, analyzing it on first use.
+        
+        Args:
+            prompt: The prompt text
+            
+        Returns:
+            Tuple of (analysis results, features)
+        """
+        key = self.key(prompt)
+        entry = self._entries.get(key)
+        if entry is None:
+            entry = self._entries[key] = self.analyzer.analyze_with_features(prompt)
+        return entry
+    
+    def analysis(self, prompt: str) -> Dict[str, Any]:
+        """Get the analysis results of a prompt, analyzing it on first use."""
+        return self.get(prompt)[0]
+    
+    def get_derived(self, prompt: str, derived: str) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+        """
+        Get the analysis of a prompt derived from another one, such as a refinement.
+        
+        When ``derived`` is ``prompt`` with text appended on a new line, only
+        the appended text is analyzed and merged with the analysis of
+        ``prompt``. Otherwise ``derived`` is analyzed in full.
+        
+        Args:
+            prompt: The prompt ``derived`` was made from
+            derived: The derived prompt text
+            
+        Returns:
+            Tuple of (analysis results, features) for ``derived``
+        """
+        key = self.key(derived)
+        entry = self._entries.get(key)
+        if entry is not None:
+            return entry
+        
+        addition = derived[len(prompt):]
+        if addition.startswith('\n') and derived.startswith(prompt):
+            _, features = self.get(prompt)
+            entry = self._entries[key] = self.analyzer.analyze_extension(prompt, features, addition)
+            return entry
+        
+        return self.get(derived)
+
+
 class PromptEnhancer:
     """
     Enhancer class for generating improvements to existing prompts.
@@ -293,7 +1001,8 @@ class PromptEnhancer:
             "no_sections": "Restructure the prompt into sections: '{structured_content}'"
         }
     
-    def enhance(self, prompt: str, objective: str = None, desired_improvements: List[str] = None) -> Dict[str, Any]:
+    def enhance(self, prompt: str, objective: str = None, desired_improvements: List[str] = None,
+                analyses: AnalysisCache = None) -> Dict[str, Any]:
         """
         Generate enhancements for a prompt.
         
@@ -301,12 +1010,16 @@ class PromptEnhancer:
             prompt: The original prompt text
             objective: Optional new objective for refinement
             desired_improvements: Specific improvement types desired
+            analyses: Optional analysis cache shared with the caller
             
         Returns:
             Dictionary with enhancement results
         """
+        if analyses is None:
+            analyses = AnalysisCache(self.analyzer)
+        
         # Analyze the prompt
-        analysis = self.analyzer.analyze(prompt)
+        analysis = analyses.analysis(prompt)
         
         # Generate enhancements based on analysis and desired improvements
         enhancements = self._generate_enhancements(
@@ -316,8 +1029,9 @@ class PromptEnhancer:
             desired_improvements
         )
         
-        # Apply enhancements to create refined prompt
+        # Apply enhancements to create refined prompt; only appended sections are re-analyzed
         refined_prompt = self._apply_enhancements(prompt, enhancements)
+        refined_analysis = analyses.get_derived(prompt, refined_prompt)[0]
         
         # Return the results
         return {
@@ -325,7 +1039,7 @@ class PromptEnhancer:
             "refined_prompt": refined_prompt,
             "analysis": analysis,
             "enhancements": enhancements,
-            "improvement_score": self._calculate_improvement_score(analysis, self.analyzer.analyze(refined_prompt))
+            "improvement_score": self._calculate_improvement_score(analysis, refined_analysis)
         }
     
     def _generate_enhancements(self, 
@@ -546,20 +1260,28 @@ class PromptRefiner:
         self.analyzer = PromptAnalyzer()
         self.enhancer = PromptEnhancer(analyzer=self.analyzer)
     
-    def analyze(self, prompt: str) -> Dict[str, Any]:
+    def analyze(self, prompt: str, analyses: AnalysisCache = None) -> Dict[str, Any]:
         """
         Analyze an existing prompt.
         
         Args:
             prompt: The prompt text to analyze
+            analyses: Optional analysis cache shared with the caller
             
         Returns:
             Analysis results dictionary
         """
+        if analyses is not None:
+            return analyses.analysis(prompt)
         return self.analyzer.analyze(prompt)
     
+    def new_analysis_cache(self) -> AnalysisCache:
+        """Create an analysis cache to share between calls on related prompts."""
+        return AnalysisCache(self.analyzer)
+    
     def refine(self, prompt: str, objective: str = None, 
-              desired_improvements: List[str] = None) -> Dict[str, Any]:
+              desired_improvements: List[str] = None,
+              analyses: AnalysisCache = None) -> Dict[str, Any]:
         """
         Analyze and refine an existing prompt.
         
@@ -567,40 +1289,137 @@ class PromptRefiner:
             prompt: The original prompt text
             objective: Optional clarifying objective for the prompt
             desired_improvements: Optional list of specific improvements to focus on
+            analyses: Optional analysis cache shared with the caller
             
         Returns:
             Dictionary with refined prompt and analysis information
         """
+        # Each distinct text is analyzed once across refine and enhance
+        if analyses is None:
+            analyses = self.new_analysis_cache()
+        
         # First analyze the prompt
-        analysis = self.analyzer.analyze(prompt)
+        analysis = analyses.analysis(prompt)
         
         # Then enhance it
         enhancement_result = self.enhancer.enhance(
             prompt=prompt,
             objective=objective,
-            desired_improvements=desired_improvements
+            desired_improvements=desired_improvements,
+            analyses=analyses
         )
         
         return {
             "original_prompt": prompt,
             "refined_prompt": enhancement_result["refined_prompt"],
             "original_analysis": analysis,
-            "refined_analysis": self.analyzer.analyze(enhancement_result["refined_prompt"]),
+            "refined_analysis": analyses.analysis(enhancement_result["refined_prompt"]),
             "improvements": enhancement_result["enhancements"],
             "improvement_score": enhancement_result["improvement_score"]
         }
     
-    def suggest_improvements(self, prompt: str) -> List[str]:
+    def refine_until(self, prompt: str, objective: str = None,
+                     desired_improvements: List[str] = None,
+                     target_score: float = 1.0,
+                     max_iterations: int = 5,
+                     time_budget: float = None,
+                     min_improvement: float = 1e-6,
+                     analyses: AnalysisCache = None) -> Dict[str, Any]:
+        """
+        Refine a prompt repeatedly until it stops improving or a budget runs out.
+        
+        Each pass enhances the current prompt and analyzes the result. Passes
+        share one analysis cache, so sections appended by a pass are the only
+        new text analyzed. The loop stops when the quality score reaches
+        ``target_score``, a pass improves it by less than ``min_improvement``
+        (that pass is discarded), ``max_iterations`` passes have run or
+        ``time_budget`` seconds have elapsed. When an objective is given, the
+        first pass applies it and is kept before any of these are checked.
+        
+        Args:
+            prompt: The original prompt text
+            objective: Optional clarifying objective, applied in the first pass
+            desired_improvements: Optional list of specific improvements to focus on
+            target_score: Quality score at which to stop
+            max_iterations: Maximum number of enhancement passes
+            time_budget: Optional maximum run time in seconds
+            min_improvement: Smallest quality gain for a pass to count as progress
+            analyses: Optional analysis cache shared with the caller
+            
+        Returns:
+            Dictionary with the same keys as ``refine`` plus 'iterations',
+            'score_history' (quality after each accepted pass, starting with
+            the original) and 'stop_reason' ('target_reached', 'converged',
+            'max_iterations' or 'time_budget')
+        """
+        if analyses is None:
+            analyses = self.new_analysis_cache()
+        start_time = time.perf_counter()
+        
+        original_analysis = analyses.analysis(prompt)
+        current_prompt, current_analysis = prompt, original_analysis
+        score_history = [original_analysis["quality_score"]]
+        improvements = []
+        iterations = 0
+        
+        while True:
+            # A pass applying the objective always runs and is always kept
+            objective_pass = iterations == 0 and bool(objective)
+            if not objective_pass:
+                if current_analysis["quality_score"] >= target_score:
+                    stop_reason = "target_reached"
+                    break
+                if iterations >= max_iterations:
+                    stop_reason = "max_iterations"
+                    break
+                if time_budget is not None and time.perf_counter() - start_time >= time_budget:
+                    stop_reason = "time_budget"
+                    break
+            
+            enhancement_result = self.enhancer.enhance(
+                prompt=current_prompt,
+                objective=objective if objective_pass else None,
+                desired_improvements=desired_improvements,
+                analyses=analyses
+            )
+            iterations += 1
+            refined_analysis = analyses.analysis(enhancement_result["refined_prompt"])
+            
+            if (not objective_pass and
+                    refined_analysis["quality_score"] - current_analysis["quality_score"] < min_improvement):
+                stop_reason = "converged"
+                break
+            
+            current_prompt, current_analysis = enhancement_result["refined_prompt"], refined_analysis
+            improvements.extend(enhancement_result["enhancements"])
+            score_history.append(current_analysis["quality_score"])
+        
+        logger.info(f"Refinement stopped after {iterations} passes ({stop_reason})")
+        
+        return {
+            "original_prompt": prompt,
+            "refined_prompt": current_prompt,
+            "original_analysis": original_analysis,
+            "refined_analysis": current_analysis,
+            "improvements": improvements,
+            "improvement_score": self.enhancer._calculate_improvement_score(original_analysis, current_analysis),
+            "iterations": iterations,
+            "score_history": score_history,
+            "stop_reason": stop_reason
+        }
+    
+    def suggest_improvements(self, prompt: str, analyses: AnalysisCache = None) -> List[str]:
         """
         Suggest potential improvements for a prompt without making changes.
         
         Args:
             prompt: The prompt text to analyze
+            analyses: Optional analysis cache shared with the caller
             
         Returns:
             List of suggested improvement descriptions
         """
-        analysis = self.analyzer.analyze(prompt)
+        analysis = self.analyze(prompt, analyses)
         suggestions = []
         
         # Convert issues to suggestions
@@ -151,6 +151,9 @@ class PrefillResponseTechnique(PromptTechnique):
     a template or beginning that it should continue.
     """
     
+    # The default response template is chosen from keywords in the prompt
+    content_dependent = True
+    
     def apply(self, prompt_content: str, context: Dict[str, Any] = None) -> str:
         """Apply prefill response technique to the prompt."""
         context = context or {}
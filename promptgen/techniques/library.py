@@ -17,6 +17,10 @@ class PromptTechnique:
     A prompting technique represents a specific approach to structuring
     or formatting a prompt to improve LLM responses.
     """
+    
+    # Whether the text added around the prompt depends on the prompt text;
+    # such techniques are always applied to the fully rendered prompt
+    content_dependent = False
 
     def __init__(self, 
                  name: str, 
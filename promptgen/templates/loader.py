@@ -8,8 +8,350 @@ and apply selected techniques to them.
 import os
 import yaml
 import re
-from typing import Dict, List, Any, Optional, Tuple, Union
-from promptgen.techniques.library import PromptTechnique, default_library
+import heapq
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Dict, List, Any, Optional, Tuple, Union, Callable, Iterator
+from concurrent.futures import ProcessPoolExecutor
+from promptgen.techniques.library import PromptTechnique, default_library as default_technique_library
+
+# Below this many files a process pool costs more than it saves
+PARALLEL_LOAD_MIN_FILES = 16
+
+def _section_position(section: Dict[str, Any]) -> Any:
+    """Sort key placing sections without a position at the end."""
+    return section.get('position', 999)
+
+
+# Single-brace placeholder in section content templates, e.g. {objective}
+_PLACEHOLDER_RE = re.compile(r'\{([^{}]+)\}')
+
+# Stand-in prompts used to find the text a technique adds around its content;
+# techniques adding different text around the two do not simply wrap the prompt
+_CONTENT_MARKER = "\x00promptgen-content\x00"
+_ALT_CONTENT_MARKER = "\x00promptgen-alternate-content\x00\n\n"
+
+
+# Top-level template fields indexed by lazy libraries (plus inheritance)
+_HEADER_FIELDS = frozenset(['name', 'domain', 'description', 'complexity_range', 'tags', 'extends'])
+
+
+def _parse_yaml_text(item: Tuple[str, bytes]) -> Tuple[str, Any, Optional[str]]:
+    """Parse one file's contents, returning (path, data, error message)."""
+    file_path, raw = item
+    try:
+        return file_path, yaml.safe_load(raw), None
+    except Exception as e:
+        return file_path, None, str(e)
+
+
+def _parse_yaml_headers(item: Tuple[str, bytes]) -> Tuple[str, Any, Optional[str]]:
+    """
+    Parse one file's template headers, returning (path, (headers, spans), error message).
+    
+    The file is composed once but only header fields are constructed, so
+    ``headers`` has the document's shape with body fields left out (None for
+    pattern catalogs). For multi-template files ``spans`` holds, per entry,
+    the (start, end, column) of its text and the length of the file text,
+    letting its body be parsed on its own later; otherwise it is None.
+    """
+    file_path, raw = item
+    try:
+        text = raw.decode('utf-8')
+    except UnicodeDecodeError:
+        # Other encodings are detected by the YAML reader; bodies then parse the whole file
+        text = None
+    
+    loader = yaml.SafeLoader(raw if text is None else text)
+    try:
+        root = loader.get_single_node()
+        
+        def header(node: yaml.Node) -> Any:
+            if not isinstance(node, yaml.MappingNode):
+                return loader.construct_object(node, deep=True)
+            loader.flatten_mapping(node)
+            data = {}
+            for key_node, value_node in node.value:
+                key = loader.construct_object(key_node, deep=True)
+                if key in _HEADER_FIELDS:
+                    data[key] = loader.construct_object(value_node, deep=True)
+            return data
+        
+        if isinstance(root, yaml.SequenceNode):
+            headers = [header(node) for node in root.value]
+            spans = None if text is None else [
+                (node.start_mark.index, node.end_mark.index, node.start_mark.column, len(text))
+                for node in root.value
+            ]
+            return file_path, (headers, spans), None
+        if isinstance(root, yaml.MappingNode):
+            keys = {key_node.value for key_node, _ in root.value if isinstance(key_node, yaml.ScalarNode)}
+            templates = next((value for key_node, value in root.value if key_node.value == 'templates'), None)
+            if isinstance(templates, yaml.SequenceNode) and 'sections' not in keys:
+                # Pattern catalogs are served by templates.patterns.PatternCatalog
+                return file_path, (None, None), None
+        return file_path, (None if root is None else header(root), None), None
+    except Exception as e:
+        return file_path, None, str(e)
+    finally:
+        loader.dispose()
+
+
+@lru_cache(maxsize=4096)
+def compile_content_template(template_str: str) -> Tuple[Tuple[bool, str], ...]:
+    """
+    Split a section content template into (is_placeholder, text) segments.
+    
+    The result is cached by template text, so sections sharing a body across
+    templates also share its compiled form.
+    """
+    parts = _PLACEHOLDER_RE.split(template_str)
+    return tuple((i % 2 == 1, part) for i, part in enumerate(parts) if part or i % 2 == 1)
+
+
+def fill_placeholders(template_str: str, context: Dict[str, Any]) -> str:
+    """
+    Substitute ``{placeholder}`` values from a context into a content template.
+    
+    Placeholders missing from the context become ``[placeholder]``, except
+    ``{content}``, which is left for techniques to fill. Values are inserted
+    verbatim in a single pass over the compiled template.
+    
+    Args:
+        template_str: Section content template
+        context: Context variables for substitution
+        
+    Returns:
+        Populated content
+    """
+    parts = []
+    for is_placeholder, text in compile_content_template(template_str):
+        if not is_placeholder:
+            parts.append(text)
+        elif text in context:
+            parts.append(str(context[text]))
+        elif text == 'content':  # Skip {content} as it's special
+            parts.append('{content}')
+        else:
+            parts.append(f"[{text}]")
+    return "".join(parts)
+
+
+def apply_technique_sequence(technique_library: Any, prompt: str,
+                             techniques: List[Tuple[str, Dict[str, Any]]]) -> str:
+    """
+    Apply a sequence of prompting techniques to a prompt.
+    
+    Args:
+        technique_library: Library to look the techniques up in
+        prompt: Base prompt to enhance
+        techniques: List of (technique_name, context) tuples
+        
+    Returns:
+        Enhanced prompt
+    """
+    result = prompt
+    
+    for technique_name, context in techniques:
+        technique = technique_library.get(technique_name, context)
+        if technique:
+            result = technique.apply(result, context)
+    
+    return result
+
+
+def split_technique_sequence(technique_library: Any,
+                             techniques: List[Tuple[str, Dict[str, Any]]]) -> Optional[Tuple[str, str]]:
+    """
+    Reduce a sequence of techniques to the text they add around a prompt.
+    
+    Techniques marked ``content_dependent`` are never reduced, and the
+    sequence is applied to two different stand-in prompts to catch other
+    techniques whose added text depends on the prompt.
+    
+    Args:
+        technique_library: Library to look the techniques up in
+        techniques: List of (technique_name, context) tuples
+        
+    Returns:
+        Tuple of (prefix, suffix), or None if a technique rewrites the
+        prompt itself or adds text that depends on it
+    """
+    for technique_name, _ in techniques:
+        if getattr(technique_library.get(technique_name), 'content_dependent', False):
+            return None
+    
+    wrappings = []
+    for marker in (_CONTENT_MARKER, _ALT_CONTENT_MARKER):
+        wrapped = apply_technique_sequence(technique_library, marker, techniques)
+        if wrapped.count(marker) != 1:
+            return None
+        wrappings.append(tuple(wrapped.split(marker)))
+    
+    if wrappings[0] != wrappings[1]:
+        return None
+    return wrappings[0]
+
+
+def _freeze(value: Any) -> Any:
+    """Build a hashable key that distinguishes equal values of different types."""
+    if isinstance(value, dict):
+        return ('dict', tuple(sorted((k, _freeze(v)) for k, v in value.items())))
+    if isinstance(value, list):
+        return ('list', tuple(_freeze(v) for v in value))
+    hash(value)
+    return (type(value).__name__, value)
+
+
+class FragmentPool:
+    """
+    Pool of template fragments shared between templates.
+    
+    Identical section definitions, best-practice strings, technique entries
+    and conditional sections are stored once; templates built from interned
+    data hold references to the pooled objects. Each fragment gets a stable
+    integer id.
+    """
+    
+    def __init__(self):
+        """Initialize an empty fragment pool."""
+        self.fragments: List[Any] = []
+        self._by_key: Dict[Any, Any] = {}
+        self._ids: Dict[int, int] = {}
+    
+    def __len__(self) -> int:
+        return len(self.fragments)
+    
+    def intern(self, value: Any) -> Any:
+        """
+        Get the pooled instance of a fragment, adding it if it is new.
+        
+        Args:
+            value: Fragment (section dictionary, string, ...)
+            
+        Returns:
+            The shared instance equal to ``value`` (``value`` itself if it cannot be pooled)
+        """
+        try:
+            key = _freeze(value)
+        except TypeError:
+            return value
+        
+        canonical = self._by_key.get(key)
+        if canonical is None:
+            canonical = value
+            self._by_key[key] = canonical
+            self._ids[id(canonical)] = len(self.fragments)
+            self.fragments.append(canonical)
+        return canonical
+    
+    def fragment_id(self, fragment: Any) -> Optional[int]:
+        """Get the id of a pooled fragment instance, or None if it is not pooled."""
+        return self._ids.get(id(fragment))
+    
+    def get(self, fragment_id: int) -> Any:
+        """Get a pooled fragment by id."""
+        return self.fragments[fragment_id]
+    
+    def intern_template_data(self, data: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Intern the body fragments of a template dictionary.
+        
+        Args:
+            data: Dictionary representation of a template
+            
+        Returns:
+            Shallow copy of ``data`` whose fragment lists reference pooled instances
+        """
+        interned = dict(data)
+        for field_name in ('sections', 'best_practices', 'prompt_techniques', 'conditional_sections'):
+            items = data.get(field_name)
+            if isinstance(items, list):
+                interned[field_name] = [self.intern(item) for item in items]
+        return interned
+
+
+def merge_template_data(parent: Dict[str, Any], child: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Merge a child template definition onto its parent.
+    
+    Top-level fields set by the child replace the parent's. Sections are
+    merged by name: a child section with a parent's name overrides only the
+    keys it sets, other child sections are added, and sections listed in the
+    child's ``remove_sections`` are dropped. Unchanged parent sections are
+    reused as-is, so they stay shared fragments.
+    
+    Args:
+        parent: Flattened parent definition
+        child: Child definition (its ``extends`` key is ignored)
+        
+    Returns:
+        Flattened child definition
+    """
+    merged = dict(parent)
+    for key, value in child.items():
+        if key not in ('extends', 'sections', 'remove_sections'):
+            merged[key] = value
+    merged['name'] = child.get('name', 'Unnamed Template')
+    
+    removed = set(child.get('remove_sections', []))
+    sections = [section for section in parent.get('sections', []) if section.get('name') not in removed]
+    positions = {section.get('name'): i for i, section in enumerate(sections)}
+    for section in child.get('sections', []):
+        name = section.get('name')
+        if name in positions:
+            sections[positions[name]] = {**sections[positions[name]], **section}
+        else:
+            positions[name] = len(sections)
+            sections.append(section)
+    merged['sections'] = sections
+    return merged
+
+
+def is_pattern_catalog(data: Any) -> bool:
+    """Check whether parsed YAML data is a pattern catalog (see templates.patterns) rather than a template."""
+    return isinstance(data, dict) and isinstance(data.get('templates'), list) and 'sections' not in data
+
+
+def parse_yaml_files(file_paths: List[str], workers: int = 1,
+                     headers_only: bool = False) -> List[Tuple[str, Any, Optional[str]]]:
+    """
+    Read and parse YAML files, optionally in a process pool.
+    
+    All files are read in one pass before parsing starts. Results are returned
+    in the order of ``file_paths``; failures are reported per file as an error
+    message instead of raising.
+    
+    Args:
+        file_paths: Paths of the YAML files to load
+        workers: Number of parser processes (1 parses in the current process)
+        headers_only: Construct only template header fields; parsed data is
+                      then a (headers, spans) tuple (see ``_parse_yaml_headers``)
+        
+    Returns:
+        List of (file path, parsed data, error message or None) tuples
+    """
+    parse = _parse_yaml_headers if headers_only else _parse_yaml_text
+    items = []
+    results = {}
+    for file_path in file_paths:
+        try:
+            with open(file_path, 'rb') as f:
+                items.append((file_path, f.read()))
+        except OSError as e:
+            results[file_path] = (file_path, None, str(e))
+    
+    workers = workers or os.cpu_count() or 1
+    if workers > 1 and len(items) >= PARALLEL_LOAD_MIN_FILES:
+        chunksize = max(1, len(items) // (workers * 4))
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            parsed = list(executor.map(parse, items, chunksize=chunksize))
+    else:
+        parsed = [parse(item) for item in items]
+    
+    for result in parsed:
+        results[result[0]] = result
+    return [results[file_path] for file_path in file_paths]
 
 
 class PromptTemplate:
@@ -58,6 +400,50 @@ class PromptTemplate:
                 'content': '',
                 'populated': False
             }
+        
+        # Resolve section order and conditional sections once, up front
+        self._defined_sections = self.sections
+        self._sorted_sections = sorted(self.sections, key=_section_position)
+        self._active_sections = None
+        self._condition_index, self._unhashable_conditions = self._build_condition_index()
+        self._trigger_keys = {key for key, _ in self._condition_index}
+    
+    def _build_condition_index(self) -> Tuple[Dict[Tuple[str, Any], List[Tuple[int, List[Dict[str, Any]]]]],
+                                              List[Tuple[str, Any, int, List[Dict[str, Any]]]]]:
+        """
+        Index the conditional sections by their (trigger key, value) pair.
+        
+        Each entry holds (definition order, sections added by the trigger), with
+        the sections already sorted by position. Triggers whose value cannot be
+        hashed are kept in a separate list and matched by equality.
+        
+        Returns:
+            Tuple of (index, unhashable triggers as (key, value, order, sections) tuples)
+        """
+        index = {}
+        unhashable = []
+        for order, condition in enumerate(self.conditional_sections):
+            trigger = condition.get('trigger', {})
+            key = trigger.get('key', '')
+            value = trigger.get('value', None)
+            
+            sections = [
+                {
+                    'name': section_def.get('name', ''),
+                    'position': section_def.get('position', 999),  # Default to end
+                    'required': False,
+                    'description': section_def.get('description', ''),
+                    'content_template': section_def.get('content_template', '')
+                }
+                for section_def in condition.get('add_sections', [])
+            ]
+            sections.sort(key=_section_position)
+            
+            try:
+                index.setdefault((key, value), []).append((order, sections))
+            except TypeError:
+                unhashable.append((key, value, order, sections))
+        return index, unhashable
     
     def is_suitable(self, domain: str, complexity: int) -> bool:
         """
@@ -116,44 +502,60 @@ class PromptTemplate:
             return self.section_content[name]['content']
         return None
     
+    def resolve_sections(self, context: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """
+        Get the sections that apply for a context, in position order.
+        
+        These are the template's own sections plus those added by every
+        trigger matching the context. The template itself is not modified.
+        
+        Args:
+            context: Context dictionary with condition variables
+            
+        Returns:
+            Section definitions sorted by position (the list must not be modified)
+        """
+        added = []
+        for key in self._trigger_keys:
+            if key in context:
+                try:
+                    added.extend(self._condition_index.get((key, context[key]), ()))
+                except TypeError:
+                    continue
+        for key, value, order, sections in self._unhashable_conditions:
+            if key in context and context[key] == value:
+                added.append((order, sections))
+        
+        if not added:
+            return self._sorted_sections
+        
+        # Matched triggers apply in definition order so equal positions keep their order
+        added.sort(key=lambda entry: entry[0])
+        
+        # Merge the pre-sorted sequences; ties keep base sections first
+        return list(heapq.merge(
+            self._sorted_sections, *(sections for _, sections in added), key=_section_position
+        ))
+    
     def apply_conditional_sections(self, context: Dict[str, Any]) -> None:
         """
         Apply conditional sections based on context.
         
+        The active sections are the template's own sections plus those added
+        by every trigger matching the context; sections from earlier calls are
+        not carried over.
+        
         Args:
             context: Context dictionary with condition variables
         """
-        for condition in self.conditional_sections:
-            trigger = condition.get('trigger', {})
-            key = trigger.get('key', '')
-            value = trigger.get('value', None)
-            
-            # Check if condition is met
-            if key in context and context[key] == value:
-                # Add conditional sections
-                for section_def in condition.get('add_sections', []):
-                    section_name = section_def.get('name', '')
-                    position = section_def.get('position', 999)  # Default to end
-                    content_template = section_def.get('content_template', '')
-                    
-                    # Create and add the section
-                    new_section = {
-                        'name': section_name,
-                        'position': position,
-                        'required': False,
-                        'description': section_def.get('description', ''),
-                        'content_template': content_template
-                    }
-                    
-                    # Add to sections list and initialize content
-                    self.sections.append(new_section)
-                    self.section_content[section_name] = {
-                        'content': '',
-                        'populated': False
-                    }
-        
-        # Sort sections by position after adding conditionals
-        self.sections.sort(key=lambda x: x.get('position', 999))
+        self.sections = self._active_sections = self.resolve_sections(context)
+        
+        for section in self.sections:
+            if section['name'] not in self.section_content:
+                self.section_content[section['name']] = {
+                    'content': '',
+                    'populated': False
+                }
     
     def render(self, include_empty: bool = False) -> str:
         """
@@ -165,20 +567,68 @@ class PromptTemplate:
         Returns:
             Rendered prompt text
         """
-        # Sort sections by position
-        sorted_sections = sorted(self.sections, key=lambda x: x.get('position', 999))
+        return "".join(self.iter_render(include_empty))
+    
+    def iter_render(self, include_empty: bool = False,
+                    populate: Callable[[Dict[str, Any]], str] = None) -> Iterator[str]:
+        """
+        Render the prompt section by section.
         
-        result = []
+        Joining the yielded chunks gives the same text as ``render``. When
+        ``populate`` is given, each section is populated with it just before
+        it is yielded, so the first section is available without waiting for
+        the rest of the template.
+        
+        Args:
+            include_empty: Whether to include unpopulated sections
+            populate: Optional callable returning the content for a section definition
+            
+        Yields:
+            Rendered section chunks, including the separator before each section
+        """
+        # Sections set by apply_conditional_sections are already in order
+        if self.sections is self._active_sections:
+            sorted_sections = self.sections
+        else:
+            sorted_sections = sorted(self.sections, key=_section_position)
+        
+        separator = ""
         for section in sorted_sections:
             name = section['name']
+            if populate is not None:
+                self.set_section_content(name, populate(section))
+            
             if name in self.section_content:
                 content = self.section_content[name]['content']
                 is_populated = self.section_content[name]['populated']
                 
                 if content and (is_populated or include_empty):
-                    result.append(f"# {name}\n{content}")
+                    yield f"{separator}# {name}\n{content}"
+                    separator = "\n\n"
+    
+    def iter_render_context(self, context: Dict[str, Any],
+                            populate: Callable[[Dict[str, Any]], str]) -> Iterator[str]:
+        """
+        Render the sections that apply for a context, section by section.
+        
+        Unlike ``apply_conditional_sections`` followed by ``iter_render``,
+        this leaves the template untouched: section content is held only for
+        the duration of the render, so a template shared between threads can
+        be rendered concurrently.
         
-        return "\n\n".join(result)
+        Args:
+            context: Context dictionary with condition variables
+            populate: Callable returning the content for a section definition
+            
+        Yields:
+            Rendered section chunks, including the separator before each section
+        """
+        separator = ""
+        for section in self.resolve_sections(context):
+            content = populate(section)
+            if content:
+                yield f"{separator}# {section['name']}\n{content}"
+                separator = "\n\n"
     
     @classmethod
     def from_dict(cls, data: Dict[str, Any]) -> 'PromptTemplate':
@@ -191,17 +641,22 @@ class PromptTemplate:
         Returns:
             PromptTemplate instance
         """
-        return cls(
-            name=data.get('name', 'Unnamed Template'),
-            domain=data.get('domain', 'general'),
-            description=data.get('description', ''),
-            complexity_range=tuple(data.get('complexity_range', [1, 5])),
-            tags=data.get('tags', []),
-            sections=data.get('sections', []),
-            best_practices=data.get('best_practices', []),
-            prompt_techniques=data.get('prompt_techniques', []),
-            conditional_sections=data.get('conditional_sections', [])
-        )
+        return cls(**cls._kwargs_from_dict(data))
+    
+    @staticmethod
+    def _kwargs_from_dict(data: Dict[str, Any]) -> Dict[str, Any]:
+        """Map a template dictionary onto constructor keyword arguments."""
+        return {
+            'name': data.get('name', 'Unnamed Template'),
+            'domain': data.get('domain', 'general'),
+            'description': data.get('description', ''),
+            'complexity_range': tuple(data.get('complexity_range', [1, 5])),
+            'tags': data.get('tags', []),
+            'sections': data.get('sections', []),
+            'best_practices': data.get('best_practices', []),
+            'prompt_techniques': data.get('prompt_techniques', []),
+            'conditional_sections': data.get('conditional_sections', [])
+        }
     
     def to_dict(self) -> Dict[str, Any]:
         """Convert the template to a dictionary."""
@@ -216,6 +671,99 @@ class PromptTemplate:
             'prompt_techniques': self.prompt_techniques,
             'conditional_sections': self.conditional_sections
         }
+    
+    def definition(self) -> Dict[str, Any]:
+        """Convert the template to a dictionary as defined, without applied conditional sections."""
+        data = self.to_dict()
+        data['sections'] = self._defined_sections
+        return data
+
+
+class LazyPromptTemplate(PromptTemplate):
+    """
+    A prompt template that only keeps its header fields in memory.
+
+    The header (name, domain, description, complexity range and tags) is enough
+    for catalog lookups. Section bodies, best practices, techniques and
+    conditional sections are fetched through ``loader`` the first time one of
+    them is accessed, and can be dropped again with ``unload``.
+    """
+
+    _BODY_FIELDS = frozenset([
+        'sections', 'best_practices', 'prompt_techniques',
+        'conditional_sections', 'section_content', '_defined_sections', '_sorted_sections',
+        '_active_sections', '_condition_index', '_unhashable_conditions', '_trigger_keys'
+    ])
+
+    def __init__(self,
+                 name: str,
+                 domain: str,
+                 description: str = "",
+                 complexity_range: Tuple[int, int] = (1, 5),
+                 tags: List[str] = None,
+                 loader: Callable[['LazyPromptTemplate'], Dict[str, Any]] = None):
+        """
+        Initialize a header-only template.
+
+        Args:
+            name: Name of the template
+            domain: Domain the template is for
+            description: Description of the template
+            complexity_range: Min and max complexity this template supports
+            tags: List of tags for categorization
+            loader: Callable returning the full template dictionary for this template
+        """
+        self.name = name
+        self.domain = domain
+        self.description = description
+        self.complexity_range = complexity_range
+        self.tags = tags or []
+        self._loader = loader
+
+    def __getattr__(self, item: str) -> Any:
+        # Only called when normal lookup fails, i.e. when the body is not loaded
+        if item in LazyPromptTemplate._BODY_FIELDS and self.__dict__.get('_loader'):
+            self._load_body()
+            return self.__dict__[item]
+        raise AttributeError(f"'{type(self).__name__}' object has no attribute '{item}'")
+
+    @property
+    def is_loaded(self) -> bool:
+        """Whether the section bodies are currently in memory."""
+        return 'sections' in self.__dict__
+
+    def _load_body(self) -> None:
+        """Fetch the full definition and initialize the body fields."""
+        data = self._loader(self)
+        kwargs = PromptTemplate._kwargs_from_dict(data)
+        PromptTemplate.__init__(self, **kwargs)
+
+    def unload(self) -> None:
+        """Drop the body fields; they are reloaded on next access."""
+        for field_name in LazyPromptTemplate._BODY_FIELDS:
+            self.__dict__.pop(field_name, None)
+
+    @classmethod
+    def from_header(cls, data: Dict[str, Any],
+                    loader: Callable[['LazyPromptTemplate'], Dict[str, Any]]) -> 'LazyPromptTemplate':
+        """
+        Create a header-only template from a dictionary.
+
+        Args:
+            data: Dictionary representation of a template (body fields are ignored)
+            loader: Callable returning the full template dictionary
+
+        Returns:
+            LazyPromptTemplate instance
+        """
+        return cls(
+            name=data.get('name', 'Unnamed Template'),
+            domain=data.get('domain', 'general'),
+            description=data.get('description', ''),
+            complexity_range=tuple(data.get('complexity_range', [1, 5])),
+            tags=data.get('tags', []),
+            loader=loader
+        )
 
 
 class TemplateLibrary:
@@ -223,19 +771,38 @@ class TemplateLibrary:
     Library of prompt templates with loading and management capabilities.
     """
     
-    def __init__(self, templates_dir: str = None):
+    def __init__(self, templates_dir: str = None, lazy: bool = False, max_loaded: int = None,
+                 workers: int = 1, fragments: FragmentPool = None):
         """
         Initialize a template library.
         
         Args:
             templates_dir: Directory containing template YAML files
+            lazy: Construct only template headers and load section bodies on first use
+            max_loaded: In lazy mode, maximum number of templates kept with their
+                        bodies in memory (least recently used are evicted; None for no limit)
+            workers: Number of processes used to parse template files
+            fragments: Pool of shared template fragments (a new pool if None)
         """
         self.templates: Dict[str, PromptTemplate] = {}
         self.templates_dir = templates_dir
+        self.lazy = lazy
+        self.max_loaded = max_loaded
+        self.workers = workers
+        self.fragments = fragments if fragments is not None else FragmentPool()
+        
+        # Incremented whenever the catalog changes, so dependents can drop caches
+        self.version = 0
+        
+        # Lazy templates whose bodies are in memory, least recently used first
+        self._loaded: 'OrderedDict[str, LazyPromptTemplate]' = OrderedDict()
         
         # Load templates from directory if provided
         if templates_dir and os.path.exists(templates_dir):
             self.load_templates(templates_dir)
+        
+        # Templates as loaded from templates_dir, to tell them from later registrations
+        self._directory_templates: Dict[str, PromptTemplate] = dict(self.templates)
     
     def register(self, template: PromptTemplate) -> None:
         """
@@ -244,7 +811,10 @@ class TemplateLibrary:
         Args:
             template: PromptTemplate instance to register
         """
+        if self._loaded.get(template.name) is not template:
+            self._loaded.pop(template.name, None)
         self.templates[template.name] = template
+        self.version += 1
     
     def get(self, template_name: str) -> Optional[PromptTemplate]:
         """
@@ -256,40 +826,186 @@ class TemplateLibrary:
         Returns:
             PromptTemplate instance or None if not found
         """
-        return self.templates.get(template_name)
+        template = self.templates.get(template_name)
+        if isinstance(template, LazyPromptTemplate) and template.is_loaded:
+            self._touch(template)
+        return template
     
     def list_templates(self) -> List[str]:
         """Get a list of all registered template names."""
         return list(self.templates.keys())
     
-    def load_templates(self, directory: str) -> None:
+    def load_templates(self, directory: str, workers: int = None) -> List[Tuple[str, str]]:
         """
         Load template definitions from YAML files in the specified directory.
         
+        Files are read up front and parsed either serially or, with ``workers``
+        greater than 1, in a process pool. Results are merged in directory
+        listing order, so duplicate template names resolve exactly as in a
+        serial load (the last file wins). Lazy libraries still parse every
+        file but construct only the template headers.
+        
         Args:
             directory: Directory containing template YAML files
+            workers: Number of parser processes (defaults to the library setting)
+            
+        Returns:
+            List of (file path, error message) tuples for files that failed to load
         """
         if not os.path.exists(directory):
             print(f"Warning: Templates directory {directory} does not exist")
-            return
-            
-        for filename in os.listdir(directory):
-            if not filename.endswith(('.yaml', '.yml')):
+            return []
+        
+        file_paths = [
+            os.path.join(directory, filename)
+            for filename in os.listdir(directory)
+            if filename.endswith(('.yaml', '.yml'))
+        ]
+        
+        errors = []
+        entries = []
+        parsed = parse_yaml_files(file_paths, workers or self.workers, headers_only=self.lazy)
+        for file_path, template_data, error in parsed:
+            spans = None
+            if error is None and self.lazy:
+                template_data, spans = template_data
+            if error is not None:
+                errors.append((file_path, error))
+            elif isinstance(template_data, list):
+                entries.extend(
+                    (t_data, file_path, index, spans[index] if spans else None)
+                    for index, t_data in enumerate(template_data)
+                )
+            elif is_pattern_catalog(template_data):
+                # Pattern catalogs are served by templates.patterns.PatternCatalog
                 continue
-                
-            file_path = os.path.join(directory, filename)
+            elif isinstance(template_data, dict):
+                entries.append((template_data, file_path, None, None))
+        
+        # Parents may be defined in any file of the batch, so index them all first
+        definitions = {
+            t_data.get('name', 'Unnamed Template'): t_data
+            for t_data, _, _, _ in entries if isinstance(t_data, dict)
+        }
+        flattened = {}
+        
+        for t_data, file_path, index, span in entries:
             try:
-                with open(file_path, 'r') as f:
-                    template_data = yaml.safe_load(f)
-                    
-                if isinstance(template_data, list):
-                    for t_data in template_data:
-                        self.register(PromptTemplate.from_dict(t_data))
-                elif isinstance(template_data, dict):
-                    self.register(PromptTemplate.from_dict(template_data))
-                    
+                if 'extends' in t_data:
+                    t_data = self._flatten(t_data, definitions, flattened)
+                self.register(self._build_template(t_data, file_path, index, span))
             except Exception as e:
-                print(f"Error loading template from {file_path}: {str(e)}")
+                errors.append((file_path, str(e)))
+        
+        if errors:
+            print(f"Errors loading {len(errors)} template file(s) from {directory}:\n" +
+                  "\n".join(f"  {path}: {message}" for path, message in errors))
+        return errors
+    
+    def _flatten(self, data: Dict[str, Any],
+                 definitions: Dict[str, Dict[str, Any]] = None,
+                 flattened: Dict[str, Dict[str, Any]] = None,
+                 chain: Tuple[str, ...] = ()) -> Dict[str, Any]:
+        """
+        Resolve a template's ``extends`` chain into a standalone definition.
+        
+        Parents are looked up first among ``definitions`` (the raw definitions
+        being loaded) and then among registered templates. Flattened parents
+        are memoized in ``flattened`` so shared parents are resolved once.
+        
+        Args:
+            data: Template definition with an ``extends`` key
+            definitions: Raw template definitions by name
+            flattened: Memo of flattened definitions by name
+            chain: Names already being resolved, for cycle detection
+            
+        Returns:
+            Template definition without ``extends``
+            
+        Raises:
+            ValueError: If the parent is unknown or the chain has a cycle
+        """
+        definitions = definitions or {}
+        flattened = flattened if flattened is not None else {}
+        name = data.get('name', 'Unnamed Template')
+        parent_name = data['extends']
+        chain = chain + (name,)
+        
+        if parent_name in chain:
+            raise ValueError(f"Template inheritance cycle: {' -> '.join(chain + (parent_name,))}")
+        
+        if parent_name in flattened:
+            parent = flattened[parent_name]
+        elif parent_name in definitions:
+            parent = definitions[parent_name]
+            if 'extends' in parent:
+                parent = self._flatten(parent, definitions, flattened, chain)
+            flattened[parent_name] = parent
+        elif parent_name in self.templates:
+            parent = self.templates[parent_name].definition()
+        else:
+            raise ValueError(f"Template '{name}' extends unknown template '{parent_name}'")
+        
+        return merge_template_data(parent, data)
+    
+    def _build_template(self, data: Dict[str, Any], file_path: str,
+                        index: Optional[int], span: Tuple[int, int, int, int] = None) -> PromptTemplate:
+        """
+        Build a template from parsed YAML data.
+        
+        In lazy mode only the header is kept; the body is re-read from
+        ``file_path`` (entry ``index`` for multi-template files, found at
+        ``span``) when needed.
+        """
+        if not self.lazy:
+            return PromptTemplate.from_dict(self.fragments.intern_template_data(data))
+        
+        def loader(template: LazyPromptTemplate) -> Dict[str, Any]:
+            return self._load_body(template, file_path, index, span)
+        
+        return LazyPromptTemplate.from_header(data, loader)
+    
+    def _load_body(self, template: LazyPromptTemplate, file_path: str,
+                   index: Optional[int], span: Tuple[int, int, int, int] = None) -> Dict[str, Any]:
+        """Read a lazy template's full definition and account for it in the LRU."""
+        with open(file_path, 'rb') as f:
+            raw = f.read()
+        
+        template_data = None
+        if span is not None:
+            # Parse only this entry, indented as in the file, unless the file changed
+            start, end, column, length = span
+            try:
+                text = raw.decode('utf-8')
+                if len(text) == length:
+                    template_data = yaml.safe_load(' ' * column + text[start:end])
+            except (UnicodeDecodeError, yaml.YAMLError):
+                # e.g. aliases of anchors defined in other entries
+                template_data = None
+        if not isinstance(template_data, dict):
+            template_data = yaml.safe_load(raw)
+            if index is not None:
+                template_data = template_data[index]
+        if 'extends' in template_data:
+            template_data = self._flatten(template_data)
+        
+        self._touch(template)
+        return self.fragments.intern_template_data(template_data)
+    
+    def _touch(self, template: LazyPromptTemplate) -> None:
+        """Mark a lazy template as most recently used and evict over budget."""
+        self._loaded[template.name] = template
+        self._loaded.move_to_end(template.name)
+        
+        if self.max_loaded is None:
+            return
+        while len(self._loaded) > max(1, self.max_loaded):
+            _, evicted = self._loaded.popitem(last=False)
+            evicted.unload()
+    
+    def loaded_templates(self) -> List[str]:
+        """Get names of lazy templates whose bodies are in memory, least recently used first."""
+        return list(self._loaded.keys())
     
     def find_templates(self, domain: str, complexity: int) -> List[PromptTemplate]:
         """
@@ -322,7 +1038,7 @@ class PromptGenerator:
             technique_library: Library of prompting techniques (uses default if None)
         """
         self.template_library = template_library or TemplateLibrary()
-        self.technique_library = technique_library or default_library
+        self.technique_library = technique_library or default_technique_library
     
     def populate_section(self, section: Dict[str, Any], context: Dict[str, Any]) -> str:
         """
@@ -339,22 +1055,8 @@ class PromptGenerator:
         if not template_str:
             return ''
             
-        # Basic template substitution
         try:
-            # Replace placeholders that have corresponding values in context
-            for key, value in context.items():
-                placeholder = '{' + key + '}'
-                if placeholder in template_str:
-                    template_str = template_str.replace(placeholder, str(value))
-            
-            # Find any remaining placeholders
-            placeholders = re.findall(r'\{([^{}]+)\}', template_str)
-            for placeholder in placeholders:
-                # Replace with empty string if not in context
-                if placeholder != 'content' and placeholder not in context:  # Skip {content} as it's special
-                    template_str = template_str.replace('{' + placeholder + '}', f"[{placeholder}]")
-            
-            return template_str
+            return fill_placeholders(template_str, context)
         except Exception as e:
             print(f"Error populating section: {str(e)}")
             return template_str
@@ -370,14 +1072,98 @@ class PromptGenerator:
         Returns:
             Enhanced prompt
         """
-        result = prompt
+        return apply_technique_sequence(self.technique_library, prompt, techniques)
+    
+    def split_techniques(self, techniques: List[Tuple[str, Dict[str, Any]]]) -> Optional[Tuple[str, str]]:
+        """
+        Reduce a sequence of techniques to the text they add around a prompt.
+        
+        Args:
+            techniques: List of (technique_name, context) tuples
+            
+        Returns:
+            Tuple of (prefix, suffix), or None if a technique rewrites the
+            prompt itself or adds text that depends on it
+        """
+        return split_technique_sequence(self.technique_library, techniques)
+    
+    def _select_template(self, domain: str, complexity: int,
+                         template_name: str = None) -> Optional[PromptTemplate]:
+        """Pick the named template, or the first suitable one for the domain and complexity."""
+        template = None
+        if template_name:
+            template = self.template_library.get(template_name)
         
-        for technique_name, context in techniques:
-            technique = self.technique_library.get(technique_name, context)
-            if technique:
-                result = technique.apply(result, context)
+        if not template:
+            # Find templates suitable for this domain and complexity
+            candidates = self.template_library.find_templates(domain, complexity)
+            if candidates:
+                # Select the first suitable template (could be enhanced with better selection logic)
+                template = candidates[0]
+        return template
+    
+    def _iter_prompt(self, template: PromptTemplate, context: Dict[str, Any],
+                     techniques: List[Tuple[str, Dict[str, Any]]] = None) -> Iterator[str]:
+        """Populate and render a template, yielding the prompt in order."""
+        def populate(section: Dict[str, Any]) -> str:
+            return self.populate_section(section, context)
+        
+        # Conditional sections and content stay local, so shared templates are not modified
+        wrapping = self.split_techniques(techniques) if techniques else ("", "")
+        if wrapping is None:
+            # A technique rewrites the whole prompt, so it has to be rendered up front
+            prompt = "".join(template.iter_render_context(context, populate))
+            yield self.apply_techniques(prompt, techniques)
+        else:
+            prefix, suffix = wrapping
+            if prefix:
+                yield prefix
+            yield from template.iter_render_context(context, populate)
+            if suffix:
+                yield suffix
         
-        return result
+        # Add best practices if available
+        if template.best_practices:
+            yield "\n\n# Best Practices\n" + "\n".join(f"- {practice}" for practice in template.best_practices)
+    
+    def stream_prompt(self,
+                      objective: str,
+                      domain: str,
+                      task: str,
+                      complexity: int,
+                      context: Dict[str, Any] = None,
+                      techniques: List[Tuple[str, Dict[str, Any]]] = None,
+                      template_name: str = None) -> Iterator[str]:
+        """
+        Generate a prompt as a stream of chunks.
+        
+        Technique prefixes are yielded first, then each section as soon as it
+        is populated, then technique suffixes and best practices. Joining the
+        chunks gives the same text as ``generate_prompt``.
+        
+        Args:
+            objective: User-provided objective
+            domain: Task domain (e.g., 'software', 'content')
+            task: Specific task within the domain
+            complexity: Complexity level (1-5)
+            context: Additional context variables
+            techniques: Optional pre-selected techniques
+            template_name: Optional specific template to use
+            
+        Yields:
+            Prompt text chunks
+            
+        Raises:
+            ValueError: If no suitable template is found
+        """
+        context = dict(context or {})
+        context['objective'] = objective
+        
+        template = self._select_template(domain, complexity, template_name)
+        if not template:
+            raise ValueError(f"Could not find a suitable template for {domain} domain with complexity {complexity}.")
+        
+        yield from self._iter_prompt(template, context, techniques)
     
     def generate_prompt(self, 
                        objective: str, 
@@ -402,46 +1188,110 @@ class PromptGenerator:
         Returns:
             Tuple of (generated prompt, template used)
         """
-        context = context or {}
+        context = dict(context or {})
         context['objective'] = objective
         
         # Find a suitable template
-        template = None
-        if template_name:
-            template = self.template_library.get(template_name)
-        
+        template = self._select_template(domain, complexity, template_name)
         if not template:
-            # Find templates suitable for this domain and complexity
-            candidates = self.template_library.find_templates(domain, complexity)
-            if candidates:
-                # Select the first suitable template (could be enhanced with better selection logic)
-                template = candidates[0]
-            else:
-                # No suitable template found
-                return f"Could not find a suitable template for {domain} domain with complexity {complexity}.", None
+            # No suitable template found
+            return f"Could not find a suitable template for {domain} domain with complexity {complexity}.", None
         
-        # Apply conditional sections based on context
-        template.apply_conditional_sections(context)
+        prompt = "".join(self._iter_prompt(template, context, techniques))
+        return prompt, template
+    
+    def generate_many(self, requests: List[Dict[str, Any]], workers: int = 1,
+                      chunksize: int = None) -> List[Dict[str, Any]]:
+        """
+        Generate prompts for a batch of requests.
         
-        # Populate each section
-        for section in template.sections:
-            section_name = section['name']
-            section_content = self.populate_section(section, context)
-            template.set_section_content(section_name, section_content)
+        Each request is a dictionary of ``generate_prompt`` keyword arguments.
+        With ``workers`` greater than 1 the batch is split into chunks and
+        processed in a process pool; every worker builds its template and
+        technique catalogs once and reuses them for all its chunks. A failing
+        request is reported in its own result and does not stop the batch.
         
-        # Render the populated template
-        prompt = template.render()
+        Args:
+            requests: List of generate_prompt keyword argument dictionaries
+            workers: Number of worker processes (1 processes the batch in this process)
+            chunksize: Requests per chunk sent to a worker (derived from the batch size if None)
+            
+        Returns:
+            List of result dictionaries in input order, each with 'prompt',
+            'template' (name of the template used) and 'error' keys
+        """
+        requests = list(requests)
+        if workers <= 1 or len(requests) <= 1:
+            return _generate_chunk(requests, self)
         
-        # Apply any specified techniques
-        if techniques:
-            prompt = self.apply_techniques(prompt, techniques)
+        if not chunksize:
+            chunksize = max(1, len(requests) // (workers * 4))
+        chunks = [requests[i:i + chunksize] for i in range(0, len(requests), chunksize)]
         
-        # Add best practices if available
-        if template.best_practices:
-            best_practices = "\n\n# Best Practices\n" + "\n".join(f"- {practice}" for practice in template.best_practices)
-            prompt += best_practices
+        results = []
+        with ProcessPoolExecutor(max_workers=workers,
+                                 initializer=_init_generation_worker,
+                                 initargs=self._worker_state()) as executor:
+            for chunk_results in executor.map(_generate_chunk, chunks):
+                results.extend(chunk_results)
+        return results
+    
+    def _worker_state(self) -> Tuple[Optional[str], List[Dict[str, Any]], Dict[str, Any], Any]:
+        """
+        Describe the catalogs so a worker process can rebuild them once.
         
-        return prompt, template
+        Workers reload the templates directory themselves, keeping their
+        memory footprint independent of the catalog size, and receive only
+        the templates registered or replaced since it was loaded. Each worker
+        interns fragments in its own pool.
+        """
+        library = self.template_library
+        options = {'lazy': library.lazy, 'max_loaded': library.max_loaded}
+        if library.templates_dir and os.path.exists(library.templates_dir):
+            directory_templates = library._directory_templates
+            registered = [
+                template.to_dict() for name, template in library.templates.items()
+                if directory_templates.get(name) is not template
+            ]
+            return library.templates_dir, registered, options, self.technique_library
+        templates = [template.to_dict() for template in library.templates.values()]
+        return None, templates, options, self.technique_library
+
+
+# Generator owned by a generate_many worker process
+_worker_generator: Optional[PromptGenerator] = None
+
+
+def _init_generation_worker(templates_dir: Optional[str],
+                            template_dicts: List[Dict[str, Any]],
+                            library_options: Dict[str, Any],
+                            technique_library: Any) -> None:
+    """Build the catalogs of a generate_many worker process."""
+    global _worker_generator
+    library = TemplateLibrary(templates_dir, **library_options)
+    for data in template_dicts:
+        library.register(PromptTemplate.from_dict(library.fragments.intern_template_data(data)))
+    _worker_generator = PromptGenerator(library, technique_library)
+
+
+def _generate_chunk(requests: List[Dict[str, Any]],
+                    generator: PromptGenerator = None) -> List[Dict[str, Any]]:
+    """Generate prompts for a chunk of requests, capturing per-request errors."""
+    generator = generator or _worker_generator
+    results = []
+    for request in requests:
+        try:
+            request = dict(request)
+            if request.get('context') is not None:
+                request['context'] = dict(request['context'])
+            prompt, template = generator.generate_prompt(**request)
+            if template is None:
+                results.append({'prompt': None, 'template': None, 'error': prompt})
+            else:
+                results.append({'prompt': prompt, 'template': template.name, 'error': None})
+        except Exception as e:
+            results.append({'prompt': None, 'template': None, 'error': f"{type(e).__name__}: {e}"})
+    return results
 
 
 # Global instance for convenience
@@ -0,0 +1,276 @@
+"""
+Prompt pattern catalog for the AI Prompt Generator.
+
+This module loads reusable ``{{placeholder}}`` prompt patterns, such as those
+in ``examples/prompt_patterns.yaml``, indexes them by name and category and
+renders them from precompiled segments.
+"""
+
+import os
+import re
+from typing import Dict, List, Any, Optional, Tuple
+from promptgen.templates.loader import parse_yaml_files, is_pattern_catalog
+
+# Mustache-style variable, e.g. {{task_description}}
+PLACEHOLDER_PATTERN = re.compile(r'\{\{\s*([A-Za-z_][A-Za-z0-9_]*)\s*\}\}')
+
+
+class PromptPattern:
+    """
+    A reusable prompt pattern with ``{{variable}}`` placeholders.
+
+    The pattern text is split into literal and variable segments once, at
+    construction, so rendering is a single join over the segments.
+    """
+
+    def __init__(self,
+                 name: str,
+                 pattern: str,
+                 description: str = "",
+                 category: str = "general",
+                 examples: List[Dict[str, Any]] = None):
+        """
+        Initialize a prompt pattern.
+
+        Args:
+            name: Name of the pattern
+            pattern: Pattern text with {{variable}} placeholders
+            description: Description of the pattern
+            category: Category used to group patterns
+            examples: Example variable values for the pattern
+        """
+        self.name = name
+        self.pattern = pattern
+        self.description = description
+        self.category = category
+        self.examples = examples or []
+        self.segments, self.variables = self._compile(pattern)
+
+    @staticmethod
+    def _compile(pattern: str) -> Tuple[Tuple[Tuple[bool, str], ...], Tuple[str, ...]]:
+        """
+        Split a pattern into (is_variable, text) segments.
+
+        Returns:
+            Tuple of (segments, variable names in order of first appearance)
+        """
+        parts = PLACEHOLDER_PATTERN.split(pattern)
+        # re.split alternates literal text and captured variable names
+        segments = tuple(
+            (i % 2 == 1, part) for i, part in enumerate(parts) if part or i % 2 == 1
+        )
+        variables = tuple(dict.fromkeys(part for i, part in enumerate(parts) if i % 2 == 1))
+        return segments, variables
+
+    def render(self, values: Dict[str, Any] = None) -> str:
+        """
+        Render the pattern with the given variable values.
+
+        Variables without a value are rendered as ``[variable]``, matching how
+        template sections show unfilled placeholders.
+
+        Args:
+            values: Mapping of variable names to values
+
+        Returns:
+            Rendered prompt text
+        """
+        values = values or {}
+        return "".join(
+            (str(values[text]) if text in values else f"[{text}]") if is_variable else text
+            for is_variable, text in self.segments
+        )
+
+    def render_example(self, index: int = 0) -> str:
+        """Render the pattern with one of its bundled examples."""
+        example = self.examples[index] if index < len(self.examples) else {}
+        return self.render(example)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert the pattern to a dictionary."""
+        return {
+            'name': self.name,
+            'description': self.description,
+            'category': self.category,
+            'pattern': self.pattern,
+            'examples': self.examples
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any], category: str = "general") -> 'PromptPattern':
+        """
+        Create a pattern from a dictionary.
+
+        Args:
+            data: Dictionary representation of a pattern
+            category: Category to use when the pattern does not define one
+
+        Returns:
+            PromptPattern instance
+        """
+        return cls(
+            name=data.get('name', 'Unnamed Pattern'),
+            pattern=data.get('pattern', ''),
+            description=data.get('description', ''),
+            category=data.get('category', category),
+            examples=data.get('examples', [])
+        )
+
+
+class PatternCatalog:
+    """
+    Catalog of prompt patterns indexed by name and category.
+    """
+
+    def __init__(self, patterns_dir: str = None, workers: int = 1):
+        """
+        Initialize a pattern catalog.
+
+        Args:
+            patterns_dir: Directory containing pattern catalog YAML files
+            workers: Number of processes used to parse catalog files
+        """
+        self.patterns: Dict[str, PromptPattern] = {}
+        self.patterns_dir = patterns_dir
+        self.workers = workers
+
+        # Lookup indexes kept in sync by register()
+        self._by_key: Dict[str, PromptPattern] = {}
+        self._by_category: Dict[str, Dict[str, PromptPattern]] = {}
+
+        if patterns_dir and os.path.exists(patterns_dir):
+            self.load_patterns(patterns_dir)
+
+    def register(self, pattern: PromptPattern) -> None:
+        """
+        Register a pattern in the catalog, replacing any pattern with the same name.
+
+        Names are compared case-insensitively and ignoring surrounding
+        whitespace, as in ``get``.
+
+        Args:
+            pattern: PromptPattern instance to register
+        """
+        previous = self._by_key.get(self._key(pattern.name))
+        if previous is not None:
+            self._by_category.get(previous.category, {}).pop(previous.name, None)
+            if previous.name != pattern.name:
+                del self.patterns[previous.name]
+
+        self.patterns[pattern.name] = pattern
+        self._by_key[self._key(pattern.name)] = pattern
+        self._by_category.setdefault(pattern.category, {})[pattern.name] = pattern
+
+    @staticmethod
+    def _key(name: str) -> str:
+        """Normalize a pattern name for case-insensitive lookup."""
+        return name.strip().lower()
+
+    def get(self, pattern_name: str) -> Optional[PromptPattern]:
+        """
+        Get a pattern by name (case-insensitive).
+
+        Args:
+            pattern_name: Name of the pattern to retrieve
+
+        Returns:
+            PromptPattern instance or None if not found
+        """
+        return self.patterns.get(pattern_name) or self._by_key.get(self._key(pattern_name))
+
+    def list_patterns(self) -> List[str]:
+        """Get a list of all registered pattern names."""
+        return list(self.patterns.keys())
+
+    def list_categories(self) -> List[str]:
+        """Get a list of all categories that have patterns."""
+        return [category for category, patterns in self._by_category.items() if patterns]
+
+    def find_patterns(self, category: str) -> List[PromptPattern]:
+        """
+        Find the patterns in a category.
+
+        Args:
+            category: Category to match
+
+        Returns:
+            List of patterns in the category
+        """
+        return list(self._by_category.get(category, {}).values())
+
+    def render(self, pattern_name: str, values: Dict[str, Any] = None) -> Optional[str]:
+        """
+        Render a pattern by name.
+
+        Args:
+            pattern_name: Name of the pattern to render
+            values: Mapping of variable names to values
+
+        Returns:
+            Rendered prompt text or None if the pattern is not found
+        """
+        pattern = self.get(pattern_name)
+        if pattern is None:
+            return None
+        return pattern.render(values)
+
+    def load_patterns(self, path: str, workers: int = None) -> List[Tuple[str, str]]:
+        """
+        Load pattern catalogs from a YAML file or a directory of YAML files.
+
+        Files that are not pattern catalogs (i.e. regular templates) are skipped.
+
+        Args:
+            path: Catalog file or directory containing catalog files
+            workers: Number of parser processes (defaults to the catalog setting)
+
+        Returns:
+            List of (file path, error message) tuples for files that failed to load
+        """
+        if os.path.isdir(path):
+            file_paths = [
+                os.path.join(path, filename)
+                for filename in os.listdir(path)
+                if filename.endswith(('.yaml', '.yml'))
+            ]
+        elif os.path.exists(path):
+            file_paths = [path]
+        else:
+            print(f"Warning: Patterns path {path} does not exist")
+            return []
+
+        errors = []
+        for file_path, data, error in parse_yaml_files(file_paths, workers or self.workers):
+            if error is None and is_pattern_catalog(data):
+                try:
+                    category = data.get('category', 'general')
+                    for pattern_data in data['templates']:
+                        self.register(PromptPattern.from_dict(pattern_data, category))
+                except Exception as e:
+                    error = str(e)
+            if error is not None:
+                errors.append((file_path, error))
+
+        if errors:
+            print(f"Errors loading {len(errors)} pattern file(s) from {path}:\n" +
+                  "\n".join(f"  {file_path}: {message}" for file_path, message in errors))
+        return errors
+
+
+# Global instance for convenience
+default_catalog = PatternCatalog()
+
+
+def load_patterns(path: str) -> PatternCatalog:
+    """
+    Load a pattern catalog from a YAML file or directory.
+
+    Args:
+        path: Catalog file or directory containing catalog files
+
+    Returns:
+        PatternCatalog with the loaded patterns
+    """
+    catalog = PatternCatalog()
+    catalog.load_patterns(path)
+    return catalog
@@ -224,6 +224,18 @@ def test_no_domain_specified():
     assert "quality_score" in results
     assert "factor_scores" in results
 
+def test_compare_prompts_keeps_domain_metrics():
+    """Test that compare_prompts returns the same results as evaluate per prompt."""
+    evaluator = DomainSpecificEvaluator(domain="software")
+    prompts = [TEST_SOFTWARE_PROMPT, TEST_CONTENT_PROMPT, TEST_BUSINESS_PROMPT]
+    comparison = evaluator.compare_prompts(prompts)
+    
+    for eval_result in comparison["evaluations"]:
+        expected = evaluator.evaluate(prompts[eval_result.pop("prompt_index")])
+        eval_result.pop("prompt_text")
+        assert eval_result["domain"] == "software"
+        assert eval_result == expected
+
 def test_pandas_integration():
     """Test integration with pandas for UI visualization."""
     # Get evaluation results
@@ -0,0 +1,149 @@
+"""
+Async helpers for the AI Prompt Generator.
+
+CPU-bound work such as classification, template population and regex
+scoring runs on a small shared thread pool, so coroutines can await it
+without blocking the event loop. Blocking LLM calls run on a separate,
+larger pool so slow requests never hold up CPU-bound work.
+"""
+
+import asyncio
+import logging
+import os
+import threading
+from concurrent.futures import Executor, ThreadPoolExecutor
+from functools import partial
+from typing import Any, Awaitable, Callable, Coroutine, Optional
+
+# Setup logger
+logger = logging.getLogger(__name__)
+
+# Upper bound on CPU-bound work running concurrently for async callers
+DEFAULT_CPU_WORKERS = min(4, os.cpu_count() or 1)
+
+# Upper bound on blocking LLM calls running concurrently
+DEFAULT_IO_WORKERS = 16
+
+_cpu_executor: Optional[ThreadPoolExecutor] = None
+_cpu_executor_lock = threading.Lock()
+
+_io_executor: Optional[ThreadPoolExecutor] = None
+_io_executor_lock = threading.Lock()
+
+
+def get_cpu_executor() -> ThreadPoolExecutor:
+    """Get the shared executor for CPU-bound stages, creating it on first use."""
+    global _cpu_executor
+    if _cpu_executor is None:
+        with _cpu_executor_lock:
+            if _cpu_executor is None:
+                _cpu_executor = ThreadPoolExecutor(
+                    max_workers=DEFAULT_CPU_WORKERS,
+                    thread_name_prefix="promptgen-cpu"
+                )
+    return _cpu_executor
+
+
+def get_io_executor() -> ThreadPoolExecutor:
+    """Get the shared executor for blocking LLM calls, creating it on first use."""
+    global _io_executor
+    if _io_executor is None:
+        with _io_executor_lock:
+            if _io_executor is None:
+                _io_executor = ThreadPoolExecutor(
+                    max_workers=DEFAULT_IO_WORKERS,
+                    thread_name_prefix="promptgen-io"
+                )
+    return _io_executor
+
+
+async def run_cpu_bound(func: Callable[..., Any], *args: Any,
+                        executor: Executor = None, **kwargs: Any) -> Any:
+    """
+    Run a blocking callable on a bounded executor and await its result.
+
+    Args:
+        func: Callable to run
+        *args: Positional arguments for the callable
+        executor: Executor to use (defaults to the shared CPU executor)
+        **kwargs: Keyword arguments for the callable
+
+    Returns:
+        The callable's return value
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(executor or get_cpu_executor(), partial(func, *args, **kwargs))
+
+
+async def agenerate_response(llm_client: Any, prompt_text: str) -> str:
+    """
+    Get a response from an LLM client without blocking the event loop.
+
+    Clients that provide an ``agenerate`` coroutine are awaited directly;
+    synchronous clients are called in a worker thread.
+
+    Args:
+        llm_client: Client with a ``generate`` method and optionally ``agenerate``
+        prompt_text: Prompt to send
+
+    Returns:
+        Response text
+    """
+    agenerate = getattr(llm_client, "agenerate", None)
+    if agenerate is not None and asyncio.iscoroutinefunction(agenerate):
+        return await agenerate(prompt_text)
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(get_io_executor(), llm_client.generate, prompt_text)
+
+
+async def call_with_retries(func: Callable[[], Awaitable[Any]], timeout: Optional[float] = None,
+                            max_retries: int = 0, backoff: float = 0.5) -> Any:
+    """
+    Await a call with a per-attempt timeout, retrying failures with exponential backoff.
+
+    A timed-out synchronous call keeps running in its worker thread; only
+    the wait for it is abandoned.
+
+    Args:
+        func: Callable returning a new awaitable for each attempt
+        timeout: Seconds to wait for each attempt (None waits indefinitely)
+        max_retries: Number of retries after the first attempt
+        backoff: Delay before the first retry, doubled for each further retry
+
+    Returns:
+        The result of the first successful attempt
+
+    Raises:
+        Exception: The error of the last attempt when every attempt fails
+            (asyncio.TimeoutError for a timeout)
+    """
+    for attempt in range(max_retries + 1):
+        try:
+            return await asyncio.wait_for(func(), timeout)
+        except Exception as e:
+            if attempt == max_retries:
+                raise
+            delay = backoff * 2 ** attempt
+            logger.warning(f"Attempt {attempt + 1} failed ({type(e).__name__}: {e}); retrying in {delay:.2f}s")
+            await asyncio.sleep(delay)
+
+
+def run_sync(coro: Coroutine[Any, Any, Any]) -> Any:
+    """
+    Run a coroutine to completion from synchronous code.
+
+    Uses a new event loop in the calling thread, or in a helper thread when
+    the caller is already running inside an event loop.
+
+    Args:
+        coro: Coroutine to run
+
+    Returns:
+        The coroutine's result
+    """
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(coro)
+    with ThreadPoolExecutor(max_workers=1, thread_name_prefix="promptgen-sync") as executor:
+        return executor.submit(asyncio.run, coro).result()
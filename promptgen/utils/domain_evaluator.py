@@ -7,8 +7,10 @@ metrics tailored for different domains (software, content, business, etc.).
 
 import re
 from typing import Dict, List, Any, Optional
+from concurrent.futures import Executor
 import logging
 from .evaluator import PromptEvaluator
+from .concurrency import run_cpu_bound
 
 # Setup logger
 logger = logging.getLogger(__name__)
@@ -183,7 +185,37 @@ class DomainSpecificEvaluator(PromptEvaluator):
         """
         # Get base evaluation results
         results = super().evaluate(prompt)
+        return self._add_domain_metrics(results, prompt)
+    
+    async def aevaluate(self, prompt: str, executor: Executor = None) -> Dict[str, Any]:
+        """
+        Evaluate a prompt with domain-specific metrics without blocking the event loop.
+        
+        Args:
+            prompt: The prompt text to evaluate
+            executor: Executor for the CPU-bound scoring (defaults to the shared one)
+            
+        Returns:
+            Dictionary with standard and domain-specific evaluation metrics
+        """
+        results = await super().aevaluate(prompt, executor)
+        return await run_cpu_bound(self._add_domain_metrics, results, prompt, executor=executor)
+    
+    def _extend_evaluation(self, results: Dict[str, Any], prompt: str) -> Dict[str, Any]:
+        """Add the domain-specific metrics to batch-scored results; see ``_add_domain_metrics``."""
+        return self._add_domain_metrics(results, prompt)
+    
+    def _add_domain_metrics(self, results: Dict[str, Any], prompt: str) -> Dict[str, Any]:
+        """
+        Add domain-specific metrics to the standard evaluation results.
         
+        Args:
+            results: Standard evaluation results (updated in place)
+            prompt: The prompt text being evaluated
+            
+        Returns:
+            The updated results
+        """
         # If no domain is specified, return standard evaluation
         if not self.domain or self.domain not in self.domain_quality_factors:
             return results
@@ -6,15 +6,315 @@ and calculate various metrics to assess their effectiveness.
 """
 
 import re
-from typing import Dict, List, Any, Optional, Tuple
+from typing import Dict, List, Any, Optional, Tuple, Iterator, Sequence
+from concurrent.futures import Executor
+from collections import defaultdict
+from functools import lru_cache
+import asyncio
+import itertools
 import numpy as np
 import logging
 from tqdm import tqdm
 import time
+from ..config import AppConfig, get_config
+from .concurrency import run_cpu_bound, agenerate_response, call_with_retries, run_sync
+from .response_cache import ResponseCache, client_id, client_params
 
 # Setup logger
 logger = logging.getLogger(__name__)
 
+# Test requests sent to the LLM per evaluation
+DEFAULT_LLM_SAMPLES = 3
+
+# Seconds before the first retry of a failed test request (doubled per retry)
+RETRY_BACKOFF = 0.5
+
+
+# Leading global inline flags, as in "(?i)\b(context|background)\b"
+_INLINE_FLAGS = re.compile(r"\(\?([aiLmsux]+)\)")
+
+
+def _split_inline_flags(pattern: str) -> Tuple[str, str]:
+    """Split a pattern into its leading global inline flags and the rest."""
+    match = _INLINE_FLAGS.match(pattern)
+    if match:
+        return match.group(1), pattern[match.end():]
+    return "", pattern
+
+
+def _scoped(flags: str, body: str) -> str:
+    """Apply inline flags to a pattern body only, so it can be combined with other patterns."""
+    return f"(?{flags}:{body})" if flags else body
+
+
+# Maximal runs of word characters, the unit word-local patterns match within
+_WORD_RUN = re.compile(r"\w+")
+
+# Pattern sources known to be word-local: optional case/unicode inline flags, a
+# word boundary, a group of alternatives made only of word characters and
+# \w or \w+ (each alternative non-empty), and an optional closing boundary
+_WORD_ALTERNATIVE = r"(?:[0-9A-Za-z_]|\\w\+?)+"
+_WORD_LOCAL_PATTERN = re.compile(
+    rf"(?:\(\?[iu]+\))?\\b\((?:\?:)?{_WORD_ALTERNATIVE}(?:\|{_WORD_ALTERNATIVE})*\)(?:\\b)?"
+)
+
+
+def _is_word_local(pattern: str) -> bool:
+    """
+    Check whether a pattern only matches whole from the start of a run of word characters.
+    
+    True for patterns like ``\\b(maybe|might)`` or ``\\b(\\w+ly)\\b``: a leading
+    word boundary, then only word characters, then optionally a word
+    boundary. Such a pattern matches at most once per run of word
+    characters, and whether it does depends on the run alone. The check is
+    syntactic, so equivalent patterns written differently are not recognized
+    (they are then scanned over the text like any other pattern).
+    
+    Args:
+        pattern: Regular expression
+        
+    Returns:
+        Whether the pattern is word-local
+    """
+    return _WORD_LOCAL_PATTERN.fullmatch(pattern) is not None
+
+
+class _FactorScanner:
+    """
+    Counts the matches of the structural evaluation patterns.
+    
+    Text patterns that start at a word boundary (``\\b``) are combined into one
+    alternation scanned once over the text. The scan reports the first
+    pattern matching at each word start; later patterns are then tried at the
+    same position, so a word like "possibly" still counts for both clarity
+    and specificity. This matches scanning with each pattern separately as
+    long as word-start patterns match within a single word, which holds for
+    the keyword patterns used here. Other text patterns are scanned on their
+    own. The line patterns of the structure factor are combined into one
+    scanner matched once per line, each pattern in its own lookahead.
+    
+    Every pattern has a column, in the order the patterns are given, so
+    counts can be reported per pattern as well as per factor.
+    
+    For batches (``count_matrix``), word-local patterns (see ``_is_word_local``)
+    are matched once per distinct word of the batch instead of at every
+    position of every text; the other text patterns scan the batch joined into
+    one corpus.
+    """
+    
+    # Joins the texts of a batch into one corpus; the NUL character keeps
+    # matches from spanning texts, and the newlines keep line anchors and
+    # lookaheads at text ends behaving as at the end of a single text
+    CORPUS_SEPARATOR = "\n\0\n"
+    
+    def __init__(self, patterns: Tuple[Tuple[str, Tuple[str, ...]], ...]):
+        """
+        Compile the patterns.
+        
+        Args:
+            patterns: (factor, patterns) pairs; 'structure' patterns are matched per line
+        """
+        self.factors = [factor for factor, _ in patterns]
+        self.columns = []         # Factor of each pattern column
+        self.word_patterns = []   # (column, compiled pattern) in alternation order
+        self.other_patterns = []  # (column, compiled pattern)
+        self.line_columns = []    # Column of each line pattern
+        self.token_patterns = []  # (column, compiled pattern) matched per distinct word in batches
+        self.corpus_patterns = [] # (column, compiled pattern) scanned over the corpus in batches
+        alternatives = []
+        line_patterns = []
+        
+        for factor, factor_patterns in patterns:
+            for pattern in factor_patterns:
+                column = len(self.columns)
+                self.columns.append(factor)
+                if factor == "structure":
+                    line_patterns.append(pattern)
+                    self.line_columns.append(column)
+                    continue
+                flags, body = _split_inline_flags(pattern)
+                compiled = re.compile(pattern, re.MULTILINE)
+                if _is_word_local(pattern):
+                    self.token_patterns.append((column, compiled))
+                else:
+                    self.corpus_patterns.append((column, compiled))
+                if body.startswith(r"\b"):
+                    alternatives.append(f"(?P<w{len(self.word_patterns)}>{_scoped(flags, body[2:])})")
+                    self.word_patterns.append((column, compiled))
+                else:
+                    self.other_patterns.append((column, compiled))
+        
+        self.word_scanner = (
+            re.compile(r"\b(?:" + "|".join(alternatives) + ")", re.MULTILINE) if alternatives else None
+        )
+        
+        # Optional lookaheads record which patterns match at the line start; the
+        # nested conditionals fail the match when none of them did
+        self.line_scanner = None
+        if line_patterns:
+            lookaheads = "".join(
+                f"(?=(?P<line{i}>{_scoped(*_split_inline_flags(pattern))}))?"
+                for i, pattern in enumerate(line_patterns)
+            )
+            any_matched = "".join(f"(?(line{i})|" for i in range(len(line_patterns))) + "(?!)" + ")" * len(line_patterns)
+            self.line_scanner = re.compile(lookaheads + any_matched)
+        
+        # Pattern columns x factors, for summing pattern counts per factor
+        self.factor_matrix = np.zeros((len(self.columns), len(self.factors)), dtype=np.int64)
+        for column, factor in enumerate(self.columns):
+            self.factor_matrix[column, self.factors.index(factor)] = 1
+    
+    def _scan_text(self, text: str) -> Iterator[Tuple[int, int]]:
+        """Yield (position, column) for every text pattern match."""
+        if self.word_scanner is not None:
+            word_patterns = self.word_patterns
+            for match in self.word_scanner.finditer(text):
+                index = int(match.lastgroup[1:])
+                position = match.start()
+                yield position, word_patterns[index][0]
+                for column, pattern in word_patterns[index + 1:]:
+                    if pattern.match(text, position):
+                        yield position, column
+        
+        for column, pattern in self.other_patterns:
+            for match in pattern.finditer(text):
+                yield match.start(), column
+    
+    def _scan_lines(self, lines: List[str]) -> Iterator[Tuple[int, int]]:
+        """Yield (line index, column) for every line pattern matching at a line start."""
+        if self.line_scanner is None:
+            return
+        
+        line_columns = self.line_columns
+        scanner = self.line_scanner.match
+        for index, line in enumerate(lines):
+            match = scanner(line)
+            if match:
+                for name, value in match.groupdict().items():
+                    if value is not None:
+                        yield index, line_columns[int(name[4:])]
+    
+    def count_text(self, text: str) -> Dict[str, int]:
+        """
+        Count text pattern matches per factor.
+        
+        Args:
+            text: Text to scan
+            
+        Returns:
+            Dictionary mapping each factor to its number of matches
+        """
+        counts = dict.fromkeys(self.factors, 0)
+        columns = self.columns
+        for _, column in self._scan_text(text):
+            counts[columns[column]] += 1
+        return counts
+    
+    def count_lines(self, lines: List[str]) -> int:
+        """
+        Count the (line pattern, line) pairs where the pattern matches at the line start.
+        
+        Args:
+            lines: Lines of the text
+            
+        Returns:
+            Number of matches
+        """
+        return sum(1 for _ in self._scan_lines(lines))
+    
+    def count_matrix(self, texts: Sequence[str]) -> np.ndarray:
+        """
+        Count the matches of every pattern in every text.
+        
+        Word-local patterns are tried once per distinct word of the batch
+        and their hits summed per text. The other text patterns each scan
+        the texts joined into one corpus, with matches assigned to texts by
+        their offsets. Line patterns are matched once per line.
+        
+        Args:
+            texts: Texts to scan
+            
+        Returns:
+            Integer matrix of texts x pattern columns
+        """
+        counts = np.zeros((len(texts), len(self.columns)), dtype=np.int64)
+        if not texts:
+            return counts
+        
+        self._count_token_patterns(texts, counts)
+        
+        rows, columns = [], []
+        if any("\0" in text for text in texts):
+            # The separator could be part of a text; scan texts one by one
+            for row, text in enumerate(texts):
+                for column, pattern in self.corpus_patterns:
+                    matches = len(pattern.findall(text))
+                    rows.extend([row] * matches)
+                    columns.extend([column] * matches)
+        else:
+            separator_length = len(self.CORPUS_SEPARATOR)
+            starts = np.zeros(len(texts), dtype=np.int64)
+            np.cumsum([len(text) + separator_length for text in texts[:-1]], out=starts[1:])
+            corpus = self.CORPUS_SEPARATOR.join(texts)
+            positions = []
+            for column, pattern in self.corpus_patterns:
+                found = [match.start() for match in pattern.finditer(corpus)]
+                positions.extend(found)
+                columns.extend([column] * len(found))
+            rows = list(np.searchsorted(starts, np.asarray(positions, dtype=np.int64), side="right") - 1)
+        
+        if self.line_scanner is not None:
+            # Lines of all texts in order, with the text each belongs to
+            lines = "\n".join(texts).split("\n")
+            line_rows = np.repeat(np.arange(len(texts)), [text.count("\n") + 1 for text in texts])
+            line_matches = list(map(self.line_scanner.match, lines))
+            matched = np.flatnonzero(np.fromiter(map(bool, line_matches), dtype=bool, count=len(lines)))
+            line_columns = self.line_columns
+            for index in matched:
+                row = line_rows[index]
+                for name, value in line_matches[index].groupdict().items():
+                    if value is not None:
+                        rows.append(row)
+                        columns.append(line_columns[int(name[4:])])
+        
+        np.add.at(counts, (np.asarray(rows, dtype=np.int64), np.asarray(columns, dtype=np.int64)), 1)
+        return counts
+    
+    def _count_token_patterns(self, texts: Sequence[str], counts: np.ndarray) -> None:
+        """Add the matches of word-local patterns to the count matrix, matching each distinct word once."""
+        if not self.token_patterns:
+            return
+        
+        # Each new word gets the next id on first lookup
+        vocabulary: Dict[str, int] = defaultdict(itertools.count().__next__)
+        word_ids: List[int] = []
+        lengths = np.empty(len(texts), dtype=np.int64)
+        find_words = _WORD_RUN.findall
+        for row, text in enumerate(texts):
+            words = find_words(text)
+            lengths[row] = len(words)
+            word_ids.extend(map(vocabulary.__getitem__, words))
+        
+        # Words x word-local patterns
+        hits = np.array(
+            [[pattern.match(word) is not None for _, pattern in self.token_patterns] for word in vocabulary],
+            dtype=np.int64
+        ).reshape(len(vocabulary), len(self.token_patterns))
+        
+        word_ids = np.asarray(word_ids, dtype=np.int64)
+        rows = np.repeat(np.arange(len(texts)), lengths)
+        matched = hits.any(axis=1)[word_ids]
+        word_ids, rows = word_ids[matched], rows[matched]
+        for index, (column, _) in enumerate(self.token_patterns):
+            counts[:, column] += np.bincount(rows, weights=hits[word_ids, index], minlength=len(texts)).astype(np.int64)
+
+
+@lru_cache(maxsize=8)
+def _compile_factor_patterns(patterns: Tuple[Tuple[str, Tuple[str, ...]], ...]) -> _FactorScanner:
+    """Build the scanner for a set of evaluation patterns once and share it."""
+    return _FactorScanner(patterns)
+
+
 class PromptEvaluator:
     """
     Evaluates the quality and effectiveness of prompts.
@@ -22,15 +322,31 @@ class PromptEvaluator:
     Inspired by the betterprompt repository's evaluation approach.
     """
     
-    def __init__(self, llm_client=None):
+    def __init__(self, llm_client=None, config: AppConfig = None, num_samples: int = DEFAULT_LLM_SAMPLES,
+                 response_cache: ResponseCache = None):
         """
         Initialize a prompt evaluator.
         
         Args:
             llm_client: Client for making test requests to LLMs (if None, evaluation
                         is limited to structural metrics only)
+            config: Configuration providing the API timeout, retry limit and
+                    response caching settings (uses the global configuration if None)
+            num_samples: Number of test requests sent per evaluation
+            response_cache: Cache for test responses (if None, one under
+                            ``config.cache_dir`` is used when ``config.cache_responses`` is set)
         """
         self.llm_client = llm_client
+        self.config = config or get_config()
+        self.num_samples = num_samples
+        self.retry_backoff = RETRY_BACKOFF
+        
+        if response_cache is None and llm_client is not None and self.config.cache_responses:
+            try:
+                response_cache = ResponseCache(self.config.cache_dir)
+            except OSError as e:
+                logger.warning(f"Caching of LLM responses disabled: {e}")
+        self.response_cache = response_cache
         
         # Weighted quality factors
         self.quality_factors = {
@@ -72,6 +388,13 @@ class PromptEvaluator:
             ]
         }
     
+    @property
+    def _scanner(self) -> _FactorScanner:
+        """Scanner for the current ``patterns``, compiled once per pattern set and shared by every evaluator."""
+        return _compile_factor_patterns(
+            tuple((factor, tuple(patterns)) for factor, patterns in self.patterns.items())
+        )
+    
     def evaluate(self, prompt: str) -> Dict[str, Any]:
         """
         Evaluate the quality of a prompt.
@@ -84,6 +407,63 @@ class PromptEvaluator:
         """
         # Normalize the prompt text
         prompt_text = prompt.strip()
+        results = self._evaluate_offline(prompt_text)
+        self._add_llm_metrics(prompt_text, results)
+        return results
+    
+    def _add_llm_metrics(self, prompt_text: str, results: Dict[str, Any]) -> None:
+        """
+        Add response-based metrics to offline results, if an LLM client is available.
+        
+        Args:
+            prompt_text: The normalized prompt text
+            results: Offline evaluation results, updated in place
+        """
+        if self.llm_client and results["word_count"] > 10:
+            try:
+                response_metrics = self._evaluate_with_llm(prompt_text)
+                results.update(response_metrics)
+            except Exception as e:
+                logger.error(f"LLM evaluation failed: {str(e)}")
+                results["llm_evaluation_error"] = str(e)
+    
+    async def aevaluate(self, prompt: str, executor: Executor = None) -> Dict[str, Any]:
+        """
+        Evaluate the quality of a prompt without blocking the event loop.
+        
+        Structural scoring runs on a bounded executor and the LLM test
+        requests are awaited concurrently.
+        
+        Args:
+            prompt: The prompt text to evaluate
+            executor: Executor for the CPU-bound scoring (defaults to the shared one)
+            
+        Returns:
+            Dictionary with evaluation metrics, as returned by ``evaluate``
+        """
+        prompt_text = prompt.strip()
+        results = await run_cpu_bound(self._evaluate_offline, prompt_text, executor=executor)
+        
+        if self.llm_client and results["word_count"] > 10:
+            try:
+                response_metrics = await self._aevaluate_with_llm(prompt_text)
+                results.update(response_metrics)
+            except Exception as e:
+                logger.error(f"LLM evaluation failed: {str(e)}")
+                results["llm_evaluation_error"] = str(e)
+        
+        return results
+    
+    def _evaluate_offline(self, prompt_text: str) -> Dict[str, Any]:
+        """
+        Compute the metrics that do not need an LLM.
+        
+        Args:
+            prompt_text: The normalized prompt text
+            
+        Returns:
+            Dictionary with quality score, word count, factor scores and suggestions
+        """
         word_count = len(prompt_text.split())
         
         # Run the basic structural evaluation
@@ -95,23 +475,12 @@ class PromptEvaluator:
             for factor, weight in self.quality_factors.items()
         )
         
-        results = {
+        return {
             "quality_score": round(quality_score * 100) / 100,  # Scale 0-1, rounded to 2 decimals
             "word_count": word_count,
             "factor_scores": structure_scores,
             "suggestions": self._generate_suggestions(structure_scores, prompt_text)
         }
-        
-        # If LLM client is available, perform response-based evaluation
-        if self.llm_client and word_count > 10:
-            try:
-                response_metrics = self._evaluate_with_llm(prompt_text)
-                results.update(response_metrics)
-            except Exception as e:
-                logger.error(f"LLM evaluation failed: {str(e)}")
-                results["llm_evaluation_error"] = str(e)
-        
-        return results
     
     def _evaluate_structure(self, prompt_text: str) -> Dict[str, float]:
         """
@@ -134,48 +503,31 @@ class PromptEvaluator:
         # Initialize scores
         scores = {}
         
+        # Count the matches of every text pattern, then the structure patterns line by line
+        matches = self._scanner.count_text(prompt_text)
+        matches["structure"] = self._scanner.count_lines(lines)
+        
         # Clarity score (1 is most clear)
-        clarity_matches = sum(
-            1 for pattern in self.patterns["clarity"]
-            for match in re.finditer(pattern, prompt_text, re.MULTILINE)
-        )
-        clarity_penalty = min(1.0, clarity_matches / (total_words * 0.1))
+        clarity_penalty = min(1.0, matches["clarity"] / (total_words * 0.1))
         scores["clarity"] = 1 - clarity_penalty
         
         # Specificity score
-        specificity_matches = sum(
-            1 for pattern in self.patterns["specificity"]
-            for match in re.finditer(pattern, prompt_text, re.MULTILINE)
-        )
-        specificity_penalty = min(1.0, specificity_matches / (total_words * 0.1))
+        specificity_penalty = min(1.0, matches["specificity"] / (total_words * 0.1))
         
         # Adjust specificity based on length
         length_bonus = min(1.0, total_words / 100) * 0.3
         scores["specificity"] = (1 - specificity_penalty) * 0.7 + length_bonus
         
         # Structure score
-        structure_matches = sum(
-            1 for pattern in self.patterns["structure"]
-            for line in lines
-            if re.match(pattern, line)
-        )
-        structure_ratio = min(1.0, structure_matches / max(1, len(lines) * 0.25))
+        structure_ratio = min(1.0, matches["structure"] / max(1, len(lines) * 0.25))
         scores["structure"] = structure_ratio
         
         # Context score
-        context_matches = sum(
-            1 for pattern in self.patterns["context"]
-            for match in re.finditer(pattern, prompt_text, re.MULTILINE)
-        )
-        context_score = min(1.0, context_matches / max(5, total_words * 0.02))
+        context_score = min(1.0, matches["context"] / max(5, total_words * 0.02))
         scores["context"] = context_score
         
         # Actionability score
-        action_matches = sum(
-            1 for pattern in self.patterns["actionability"]
-            for match in re.finditer(pattern, prompt_text, re.MULTILINE)
-        )
-        action_score = min(1.0, action_matches / max(3, total_words * 0.05))
+        action_score = min(1.0, matches["actionability"] / max(3, total_words * 0.05))
         scores["actionability"] = action_score
         
         return scores
@@ -184,6 +536,8 @@ class PromptEvaluator:
         """
         Evaluate prompt by testing responses from an LLM.
         
+        The test requests are sent concurrently; see ``_aevaluate_with_llm``.
+        
         Args:
             prompt_text: The prompt to test
             
@@ -193,7 +547,96 @@ class PromptEvaluator:
         if not self.llm_client:
             return {}
         
-        # Sample different response variations
+        return run_sync(self._aevaluate_with_llm(prompt_text))
+    
+    async def _aevaluate_with_llm(self, prompt_text: str) -> Dict[str, Any]:
+        """
+        Evaluate prompt by testing responses from an LLM, awaiting the requests concurrently.
+        
+        Each request is limited to ``config.api_timeout`` seconds and retried
+        up to ``config.max_retries`` times with exponential backoff. Metrics
+        are computed from the requests that succeed; failed ones are listed
+        under 'sample_errors'. With a response cache, each sample index is
+        cached separately, so repeated evaluations reuse distinct samples and
+        consistency is still measured across them.
+        
+        Args:
+            prompt_text: The prompt to test
+            
+        Returns:
+            Dictionary with response-based metrics, or with 'llm_test_error'
+            if every request failed
+        """
+        if not self.llm_client:
+            return {}
+        
+        async def attempt() -> Tuple[str, float]:
+            start_time = time.time()
+            response = await agenerate_response(self.llm_client, prompt_text)
+            return response, time.time() - start_time
+        
+        cache = self.response_cache
+        if cache is not None:
+            client, params = client_id(self.llm_client), client_params(self.llm_client)
+        
+        async def sample(index: int) -> Tuple[Tuple[str, float], bool]:
+            key = None
+            if cache is not None:
+                key = cache.key(client, prompt_text, index, params)
+                try:
+                    cached = cache.get(key)
+                except OSError as e:
+                    logger.warning(f"Could not read cached LLM response: {e}")
+                    cached = None
+                if cached is not None:
+                    return cached, True
+            
+            response, response_time = await call_with_retries(
+                attempt,
+                timeout=self.config.api_timeout,
+                max_retries=self.config.max_retries,
+                backoff=self.retry_backoff
+            )
+            if key is not None:
+                # A response that could not be cached is still a successful sample
+                try:
+                    cache.put(key, response, response_time, client=client)
+                except Exception as e:
+                    logger.warning(f"Could not cache LLM response: {e}")
+            return (response, response_time), False
+        
+        outcomes = await asyncio.gather(*(sample(index) for index in range(self.num_samples)),
+                                        return_exceptions=True)
+        succeeded = [outcome for outcome in outcomes if not isinstance(outcome, BaseException)]
+        samples = [result for result, _ in succeeded]
+        errors = [
+            f"{type(outcome).__name__}: {outcome}" if str(outcome) else type(outcome).__name__
+            for outcome in outcomes if isinstance(outcome, BaseException)
+        ]
+        
+        if not samples:
+            logger.error(f"LLM testing failed: {errors[-1] if errors else 'no samples requested'}")
+            return {"llm_test_error": errors[-1] if errors else "No samples requested"}
+        
+        response_metrics = self._summarize_responses(samples)
+        cached_samples = sum(1 for _, from_cache in succeeded if from_cache)
+        if cached_samples:
+            response_metrics["cached_samples"] = cached_samples
+        if errors:
+            logger.warning(f"{len(errors)} of {len(outcomes)} LLM test requests failed")
+            response_metrics["sample_errors"] = errors
+        return response_metrics
+    
+    def _summarize_responses(self, samples: List[Tuple[str, float]]) -> Dict[str, Any]:
+        """
+        Compute response-based metrics from LLM test responses.
+        
+        Args:
+            samples: List of (response text, response time in seconds) tuples
+            
+        Returns:
+            Dictionary with response-based metrics
+        """
         response_metrics = {
             "response_consistency": 0,
             "response_length": 0,
@@ -201,64 +644,55 @@ class PromptEvaluator:
             "sample_responses": []
         }
         
-        try:
-            # Get multiple responses to assess consistency
-            responses = []
-            total_time = 0
-            total_length = 0
+        responses = []
+        total_time = 0
+        total_length = 0
+        
+        for response, response_time in samples:
+            total_time += response_time
             
-            # Make 3 test requests with the prompt
-            for _ in range(3):
-                start_time = time.time()
-                response = self.llm_client.generate(prompt_text)
-                end_time = time.time()
-                
-                response_time = end_time - start_time
-                total_time += response_time
-                
-                # Clean up response and store key metrics
-                cleaned_response = response.strip()
-                responses.append(cleaned_response)
-                
-                # Track response length
-                response_length = len(cleaned_response.split())
-                total_length += response_length
-                
-                # Add to samples (truncated if very long)
-                if len(cleaned_response) > 500:
-                    sample = cleaned_response[:497] + "..."
-                else:
-                    sample = cleaned_response
-                    
-                response_metrics["sample_responses"].append({
-                    "text": sample,
-                    "length": response_length,
-                    "time": round(response_time, 2)
-                })
+            # Clean up response and store key metrics
+            cleaned_response = response.strip()
+            responses.append(cleaned_response)
             
-            # Calculate average metrics
-            response_metrics["response_time"] = round(total_time / 3, 2)
-            response_metrics["response_length"] = round(total_length / 3)
+            # Track response length
+            response_length = len(cleaned_response.split())
+            total_length += response_length
             
-            # Calculate consistency (using simple similarity metric)
-            if len(responses) > 1:
-                similarity_sum = 0
-                comparisons = 0
-                
-                for i in range(len(responses)):
-                    for j in range(i+1, len(responses)):
-                        similarity = self._calculate_similarity(responses[i], responses[j])
-                        similarity_sum += similarity
-                        comparisons += 1
+            # Add to samples (truncated if very long)
+            if len(cleaned_response) > 500:
+                sample = cleaned_response[:497] + "..."
+            else:
+                sample = cleaned_response
                 
-                if comparisons > 0:
-                    response_metrics["response_consistency"] = round(similarity_sum / comparisons, 2)
-            
+            response_metrics["sample_responses"].append({
+                "text": sample,
+                "length": response_length,
+                "time": round(response_time, 2)
+            })
+        
+        if not samples:
             return response_metrics
+        
+        # Calculate average metrics
+        response_metrics["response_time"] = round(total_time / len(samples), 2)
+        response_metrics["response_length"] = round(total_length / len(samples))
+        
+        # Calculate consistency (using simple similarity metric)
+        if len(responses) > 1:
+            similarity_sum = 0
+            comparisons = 0
             
-        except Exception as e:
-            logger.error(f"LLM testing failed: {str(e)}")
-            return {"llm_test_error": str(e)}
+            for i in range(len(responses)):
+                for j in range(i+1, len(responses)):
+                    similarity = self._calculate_similarity(responses[i], responses[j])
+                    similarity_sum += similarity
+                    comparisons += 1
+            
+            if comparisons > 0:
+                response_metrics["response_consistency"] = round(similarity_sum / comparisons, 2)
+        
+        return response_metrics
     
     def _calculate_similarity(self, text1: str, text2: str) -> float:
         """
@@ -325,6 +759,67 @@ class PromptEvaluator:
         
         return suggestions
     
+    def evaluate_many(self, prompts: Sequence[str], suggestions_for: Sequence[int] = None) -> Dict[str, Any]:
+        """
+        Evaluate many prompts at once without an LLM.
+        
+        Pattern matches are counted into a prompts x patterns matrix in one
+        pass over the corpus, factor scores are normalized with array
+        operations and quality scores come from one dot product with the
+        factor weights. Scores equal those of ``evaluate`` without LLM testing.
+        
+        Args:
+            prompts: Prompt texts
+            suggestions_for: Indices of the prompts to generate suggestions for
+            
+        Returns:
+            Dictionary with 'factors' (factor names), 'factor_scores' (prompts x
+            factors), 'quality_scores', 'word_counts', 'ranking' (prompt indices
+            by descending quality, ties in input order), 'pattern_counts'
+            (prompts x patterns) and 'suggestions' (lists keyed by prompt index)
+        """
+        texts = [prompt.strip() for prompt in prompts]
+        scanner = self._scanner
+        
+        pattern_counts = scanner.count_matrix(texts)
+        factor_counts = pattern_counts @ scanner.factor_matrix
+        matches = {factor: factor_counts[:, i] for i, factor in enumerate(scanner.factors)}
+        
+        words = np.array([len(text.split()) for text in texts], dtype=np.int64)
+        lines = np.array([text.count("\n") + 1 for text in texts], dtype=np.int64)
+        
+        # Same normalization as _evaluate_structure; prompts without words score 0
+        with np.errstate(divide="ignore", invalid="ignore"):
+            scores = {
+                "clarity": 1 - np.minimum(1.0, matches["clarity"] / (words * 0.1)),
+                "specificity": (1 - np.minimum(1.0, matches["specificity"] / (words * 0.1))) * 0.7
+                               + np.minimum(1.0, words / 100) * 0.3,
+                "structure": np.minimum(1.0, matches["structure"] / np.maximum(1, lines * 0.25)),
+                "context": np.minimum(1.0, matches["context"] / np.maximum(5, words * 0.02)),
+                "actionability": np.minimum(1.0, matches["actionability"] / np.maximum(3, words * 0.05)),
+            }
+        factors = list(self.quality_factors)
+        factor_scores = np.column_stack([scores[factor] for factor in factors]) if texts else np.zeros((0, len(factors)))
+        factor_scores[words == 0] = 0.0
+        
+        weights = np.array([self.quality_factors[factor] for factor in factors])
+        quality_scores = np.round(factor_scores @ weights * 100) / 100
+        
+        suggestions = {
+            index: self._generate_suggestions(dict(zip(factors, factor_scores[index].tolist())), texts[index])
+            for index in (suggestions_for or [])
+        }
+        
+        return {
+            "factors": factors,
+            "factor_scores": factor_scores,
+            "quality_scores": quality_scores,
+            "word_counts": words,
+            "ranking": np.argsort(-quality_scores, kind="stable"),
+            "pattern_counts": pattern_counts,
+            "suggestions": suggestions,
+        }
+    
     def compare_prompts(self, prompts: List[str]) -> Dict[str, Any]:
         """
         Compare multiple prompts and identify the best option.
@@ -338,10 +833,8 @@ class PromptEvaluator:
         if not prompts:
             return {"error": "No prompts provided for comparison"}
         
-        # Evaluate each prompt
         evaluations = []
-        for i, prompt in enumerate(prompts):
-            eval_result = self.evaluate(prompt)
+        for i, (prompt, eval_result) in enumerate(zip(prompts, self._evaluate_for_comparison(prompts))):
             eval_result["prompt_index"] = i
             eval_result["prompt_text"] = prompt
             evaluations.append(eval_result)
@@ -355,6 +848,57 @@ class PromptEvaluator:
             "comparison_notes": self._generate_comparison_notes(sorted_evals)
         }
     
+    def _evaluate_for_comparison(self, prompts: List[str]) -> List[Dict[str, Any]]:
+        """
+        Evaluate prompts as ``evaluate`` would, scoring them in one batch when possible.
+        
+        Subclasses that change single-prompt evaluation without overriding
+        ``_extend_evaluation`` are evaluated prompt by prompt instead.
+        
+        Args:
+            prompts: List of prompt texts
+            
+        Returns:
+            Evaluation results in input order
+        """
+        cls = type(self)
+        overrides_evaluation = any(
+            getattr(cls, name) is not getattr(PromptEvaluator, name)
+            for name in ("evaluate", "_evaluate_offline", "_evaluate_structure")
+        )
+        if overrides_evaluation and cls._extend_evaluation is PromptEvaluator._extend_evaluation:
+            return [self.evaluate(prompt) for prompt in prompts]
+        
+        # Score all prompts in one batch, then add the per-prompt metrics
+        batch = self.evaluate_many(prompts, suggestions_for=range(len(prompts)))
+        evaluations = []
+        for i, prompt in enumerate(prompts):
+            eval_result = {
+                "quality_score": float(batch["quality_scores"][i]),
+                "word_count": int(batch["word_counts"][i]),
+                "factor_scores": dict(zip(batch["factors"], batch["factor_scores"][i].tolist())),
+                "suggestions": batch["suggestions"][i],
+            }
+            self._add_llm_metrics(prompt.strip(), eval_result)
+            evaluations.append(self._extend_evaluation(eval_result, prompt))
+        return evaluations
+    
+    def _extend_evaluation(self, results: Dict[str, Any], prompt: str) -> Dict[str, Any]:
+        """
+        Add subclass-specific metrics to batch-scored results in ``compare_prompts``.
+        
+        Subclasses whose ``evaluate`` adds metrics to the base results
+        override this to add the same metrics, keeping batch scoring.
+        
+        Args:
+            results: Base evaluation results (may be updated in place)
+            prompt: The prompt text being evaluated
+            
+        Returns:
+            The results as ``evaluate`` returns them
+        """
+        return results
+    
     def _generate_comparison_notes(self, evaluations: List[Dict[str, Any]]) -> List[str]:
         """
         Generate notes comparing the evaluated prompts.
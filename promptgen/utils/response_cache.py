@@ -0,0 +1,254 @@
+"""
+Disk-backed cache of LLM responses for the AI Prompt Generator.
+
+Each response is stored as a small JSON file under ``<cache_dir>/llm_responses``,
+keyed by the client and model, a hash of the prompt, the sample index and the
+generation parameters. Files are written atomically, so several worker
+processes can share one cache directory. Entries expire after a TTL and the
+least recently used entries are evicted when the cache grows past its limits.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import time
+from typing import Any, Dict, Optional, Tuple
+
+# Setup logger
+logger = logging.getLogger(__name__)
+
+# Subdirectory of the configured cache directory holding the responses
+CACHE_SUBDIR = "llm_responses"
+
+# Seconds a cached response stays valid
+DEFAULT_TTL = 7 * 24 * 3600
+
+# Limits above which least recently used entries are evicted
+DEFAULT_MAX_ENTRIES = 10000
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+
+# Writes between eviction passes over the cache directory
+EVICT_INTERVAL = 16
+
+# Prefix of partially written files
+_TMP_PREFIX = ".tmp-"
+
+# Seconds after which a partially written file is taken to be left by a crashed writer
+TMP_GRACE = 3600
+
+
+def client_id(llm_client: Any) -> str:
+    """
+    Identify an LLM client and its model for cache keys.
+
+    Args:
+        llm_client: Client object, optionally with a ``model`` or ``model_name`` attribute
+
+    Returns:
+        Identifier such as ``package.module.Client:model-name``
+    """
+    client_type = type(llm_client)
+    model = getattr(llm_client, "model", None) or getattr(llm_client, "model_name", None)
+    name = f"{client_type.__module__}.{client_type.__qualname__}"
+    return f"{name}:{model}" if model else name
+
+
+def client_params(llm_client: Any) -> Dict[str, Any]:
+    """Get the generation parameters of a client (its ``params`` attribute, if any)."""
+    params = getattr(llm_client, "params", None)
+    return dict(params) if isinstance(params, dict) else {}
+
+
+class ResponseCache:
+    """
+    Stores LLM responses on disk with a TTL and size-bounded LRU eviction.
+
+    Reading an entry refreshes its modification time, which serves as its
+    last-use time for eviction; the creation time stored in the entry is used
+    for the TTL.
+    """
+
+    def __init__(self,
+                 cache_dir: str,
+                 ttl: Optional[float] = DEFAULT_TTL,
+                 max_entries: Optional[int] = DEFAULT_MAX_ENTRIES,
+                 max_bytes: Optional[int] = DEFAULT_MAX_BYTES):
+        """
+        Initialize the cache.
+
+        Args:
+            cache_dir: Application cache directory (responses go in a subdirectory)
+            ttl: Seconds an entry stays valid (None for no expiry)
+            max_entries: Maximum number of entries (None for no limit)
+            max_bytes: Maximum total size of the entries in bytes (None for no limit)
+        """
+        self.directory = os.path.join(cache_dir, CACHE_SUBDIR)
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._writes_since_evict = EVICT_INTERVAL  # Evict on the first write
+        os.makedirs(self.directory, exist_ok=True)
+
+    @staticmethod
+    def key(client: str, prompt: str, sample_index: int = 0, params: Dict[str, Any] = None) -> str:
+        """
+        Build the cache key of a response.
+
+        Args:
+            client: Client and model identifier (see ``client_id``)
+            prompt: Prompt text
+            sample_index: Index of the sample among the requests for the prompt
+            params: Generation parameters
+
+        Returns:
+            Hex digest identifying the response
+        """
+        prompt_hash = hashlib.sha256(prompt.encode("utf-8")).hexdigest()
+        material = json.dumps([client, prompt_hash, sample_index, params or {}], sort_keys=True, default=str)
+        return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+    def _path(self, key: str) -> str:
+        """Get the file path of an entry."""
+        return os.path.join(self.directory, f"{key}.json")
+
+    def get(self, key: str) -> Optional[Tuple[str, float]]:
+        """
+        Look up a cached response.
+
+        Args:
+            key: Cache key from ``key``
+
+        Returns:
+            Tuple of (response text, original response time in seconds), or
+            None if the entry is missing, unreadable or expired
+        """
+        path = self._path(key)
+        try:
+            with open(path, encoding="utf-8") as f:
+                entry = json.load(f)
+            created = entry["created"]
+            response, response_time = entry["response"], entry["response_time"]
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            logger.warning(f"Discarding unreadable cache entry {key}: {e}")
+            self._remove(path)
+            return None
+
+        if self.ttl is not None and time.time() - created > self.ttl:
+            self._remove(path)
+            return None
+
+        # Mark the entry as recently used
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        return response, response_time
+
+    def put(self, key: str, response: str, response_time: float = 0.0, **metadata: Any) -> None:
+        """
+        Store a response atomically.
+
+        Args:
+            key: Cache key from ``key``
+            response: Response text
+            response_time: Seconds the response took
+            **metadata: Extra JSON-serializable fields stored with the entry
+        """
+        entry = {"created": time.time(), "response": response, "response_time": response_time, **metadata}
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, prefix=_TMP_PREFIX, suffix=".json")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(entry, f, ensure_ascii=False)
+            os.replace(tmp_path, self._path(key))
+        except BaseException:
+            self._remove(tmp_path)
+            raise
+
+        self._writes_since_evict += 1
+        if self._writes_since_evict >= EVICT_INTERVAL:
+            self.evict()
+
+    def evict(self) -> int:
+        """
+        Remove expired entries, then least recently used ones beyond the limits.
+
+        Partially written files older than ``TMP_GRACE`` are also deleted.
+
+        Returns:
+            Number of entries removed
+        """
+        self._writes_since_evict = 0
+        now = time.time()
+        entries = []
+        with os.scandir(self.directory) as scan:
+            for item in scan:
+                if item.name.startswith(_TMP_PREFIX):
+                    self._remove_stale_tmp(item, now)
+                    continue
+                if not item.name.endswith(".json"):
+                    continue
+                try:
+                    stat = item.stat()
+                except FileNotFoundError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, item.path))
+
+        removed = 0
+        # Entries unused for longer than the TTL were also created before it
+        if self.ttl is not None:
+            expired = [entry for entry in entries if now - entry[0] > self.ttl]
+            for _, _, path in expired:
+                removed += self._remove(path)
+            entries = [entry for entry in entries if now - entry[0] <= self.ttl]
+
+        entries.sort()
+        total_bytes = sum(size for _, size, _ in entries)
+        count = len(entries)
+        for _, size, path in entries:
+            over_count = self.max_entries is not None and count > self.max_entries
+            over_size = self.max_bytes is not None and total_bytes > self.max_bytes
+            if not (over_count or over_size):
+                break
+            removed += self._remove(path)
+            count -= 1
+            total_bytes -= size
+
+        if removed:
+            logger.debug(f"Evicted {removed} cached responses")
+        return removed
+
+    def clear(self) -> None:
+        """Remove every cached response (files still being written by other processes are left alone)."""
+        now = time.time()
+        with os.scandir(self.directory) as scan:
+            for item in scan:
+                if item.name.startswith(_TMP_PREFIX):
+                    self._remove_stale_tmp(item, now)
+                elif item.name.endswith(".json"):
+                    self._remove(item.path)
+
+    def __len__(self) -> int:
+        with os.scandir(self.directory) as scan:
+            return sum(1 for item in scan
+                       if item.name.endswith(".json") and not item.name.startswith(_TMP_PREFIX))
+
+    def _remove_stale_tmp(self, item: os.DirEntry, now: float) -> None:
+        """Delete a partially written file if its writer stopped updating it ``TMP_GRACE`` seconds ago."""
+        try:
+            if now - item.stat().st_mtime > TMP_GRACE:
+                self._remove(item.path)
+        except FileNotFoundError:
+            pass
+
+    @staticmethod
+    def _remove(path: str) -> int:
+        """Delete a file that another process may already have removed; return 1 if this call removed it."""
+        try:
+            os.remove(path)
+            return 1
+        except FileNotFoundError:
+            return 0
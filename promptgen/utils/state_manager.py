@@ -2,6 +2,7 @@
 
 from typing import Dict, List, Any, Optional
 from datetime import datetime
+import asyncio
 import json
 import os
 from dataclasses import dataclass, asdict
@@ -25,6 +26,7 @@ class StateManager:
         """Initialize the state manager."""
         self.config = get_config()
         self.history: List[PromptHistory] = []
+        self._save_lock: Optional[asyncio.Lock] = None
         self._load_history()
     
     def add_to_history(
@@ -46,6 +48,51 @@ class StateManager:
             quality_score: Quality score of the prompt
             metadata: Additional metadata about the generation
         """
+        self._record(objective, generated_prompt, domain, techniques_used, quality_score, metadata)
+        self._save_history()
+    
+    async def aadd_to_history(
+        self,
+        objective: str,
+        generated_prompt: str,
+        domain: str,
+        techniques_used: List[str],
+        quality_score: float,
+        metadata: Optional[Dict[str, Any]] = None
+    ) -> None:
+        """Add a new prompt generation to history without blocking the event loop.
+        
+        The history file is written in a worker thread. Concurrent calls are
+        serialized so the file always ends up with the latest history.
+        
+        Args:
+            objective: The original user objective
+            generated_prompt: The generated prompt
+            domain: The domain of the prompt
+            techniques_used: List of techniques used
+            quality_score: Quality score of the prompt
+            metadata: Additional metadata about the generation
+        """
+        self._record(objective, generated_prompt, domain, techniques_used, quality_score, metadata)
+        if not self.config.cache_responses:
+            return
+        
+        if self._save_lock is None:
+            self._save_lock = asyncio.Lock()
+        async with self._save_lock:
+            history_data = [asdict(item) for item in self.history]
+            await asyncio.to_thread(self._write_history, history_data)
+    
+    def _record(
+        self,
+        objective: str,
+        generated_prompt: str,
+        domain: str,
+        techniques_used: List[str],
+        quality_score: float,
+        metadata: Optional[Dict[str, Any]]
+    ) -> None:
+        """Append a history item, trimming the history to its maximum size."""
         history_item = PromptHistory(
             timestamp=datetime.now().isoformat(),
             objective=objective,
@@ -61,8 +108,6 @@ class StateManager:
         # Trim history if it exceeds max items
         if len(self.history) > self.config.max_history_items:
             self.history = self.history[-self.config.max_history_items:]
-        
-        self._save_history()
     
     def get_history(
         self,
@@ -155,6 +200,10 @@ class StateManager:
             return
             
         history_data = [asdict(item) for item in self.history]
+        self._write_history(history_data)
+    
+    def _write_history(self, history_data: List[Dict[str, Any]]) -> None:
+        """Write serialized history items to the history file."""
         with open(self._get_history_file_path(), 'w') as f:
             json.dump(history_data, f, indent=2)
     
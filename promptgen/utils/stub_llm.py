@@ -0,0 +1,378 @@
+"""
+Local stub LLM client for tests and benchmarks.
+
+``StubLLMClient`` generates deterministic response text with controllable
+length, latency distribution, jitter and error rate, so evaluation
+throughput, concurrency and response caching can be measured offline.
+``StubLLMServer`` exposes a client over a tiny local HTTP server and
+``StubHTTPClient`` talks to it, for end-to-end tests that include a network
+round trip.
+
+Usage:
+    python -m promptgen.utils.stub_llm --port 8001 --latency 0.5 --jitter 0.1 --error-rate 0.05
+"""
+
+import argparse
+import asyncio
+import hashlib
+import json
+import logging
+import random
+import sys
+import threading
+import time
+import urllib.request
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional, Tuple
+
+# Setup logger
+logger = logging.getLogger(__name__)
+
+# Supported latency distributions; ``jitter`` is the spread of each
+LATENCY_DISTRIBUTIONS = ("uniform", "normal", "lognormal")
+
+# Filler words mixed into responses along with words from the prompt
+_FILLER_WORDS = (
+    "the", "result", "should", "include", "a", "clear", "summary", "of", "each", "step",
+    "and", "then", "return", "data", "with", "details", "for", "this", "task", "output",
+    "example", "approach", "first", "next", "finally", "value", "list", "code", "section", "response",
+)
+
+
+class StubLLMError(Exception):
+    """Injected failure of a stub LLM request."""
+    pass
+
+
+class StubLLMClient:
+    """
+    Deterministic LLM client that answers without calling a model.
+
+    Responses and latencies are drawn from random generators seeded by the
+    client seed, the prompt and a sample index. By default the sample index
+    is the number of earlier calls with that prompt, so a run is reproducible
+    as long as calls with the same prompt arrive in the same order; callers
+    sending the same prompt concurrently can pass ``sample_index`` to make
+    each response independent of thread scheduling.
+    """
+
+    def __init__(self,
+                 model: str = "stub",
+                 seed: int = 0,
+                 response_length: int = 50,
+                 length_jitter: float = 0.0,
+                 variability: float = 0.2,
+                 latency: float = 0.0,
+                 jitter: float = 0.0,
+                 distribution: str = "uniform",
+                 error_rate: float = 0.0):
+        """
+        Initialize the stub client.
+
+        Args:
+            model: Model name reported for cache keys
+            seed: Seed making responses, latencies and errors reproducible
+            response_length: Mean response length in words
+            length_jitter: Standard deviation of the length as a fraction of the mean
+            variability: Fraction of words that differ between calls with the same prompt
+            latency: Typical latency in seconds (mean, or median for 'lognormal')
+            jitter: Spread of the latency: half-width for 'uniform', standard
+                    deviation in seconds for 'normal', sigma of the log for 'lognormal'
+            distribution: Latency distribution, one of LATENCY_DISTRIBUTIONS
+            error_rate: Probability that a call raises StubLLMError
+
+        Raises:
+            ValueError: If a parameter is out of range
+        """
+        if distribution not in LATENCY_DISTRIBUTIONS:
+            raise ValueError(f"Unknown latency distribution '{distribution}', "
+                             f"expected one of {', '.join(LATENCY_DISTRIBUTIONS)}")
+        if not 0.0 <= error_rate <= 1.0:
+            raise ValueError("error_rate must be between 0 and 1")
+        if not 0.0 <= variability <= 1.0:
+            raise ValueError("variability must be between 0 and 1")
+        if response_length < 1 or latency < 0 or jitter < 0 or length_jitter < 0:
+            raise ValueError("response_length must be positive and latencies and jitters non-negative")
+
+        self.model = model
+        self.seed = seed
+        self.response_length = response_length
+        self.length_jitter = length_jitter
+        self.variability = variability
+        self.latency = latency
+        self.jitter = jitter
+        self.distribution = distribution
+        self.error_rate = error_rate
+
+        self.calls = 0
+        self.errors = 0
+        self._prompt_calls: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def plan(self, prompt: str, sample_index: int = None) -> Tuple[float, Optional[str]]:
+        """
+        Draw the outcome of the next call with a prompt without waiting.
+
+        Args:
+            prompt: Prompt text
+            sample_index: Index selecting the outcome (the number of earlier
+                          calls with the prompt if None)
+
+        Returns:
+            Tuple of (latency in seconds, response text), with None as the
+            text for an injected error
+        """
+        prompt_hash = hashlib.sha256(prompt.encode("utf-8")).hexdigest()
+        with self._lock:
+            call_index = self._prompt_calls.get(prompt_hash, 0)
+            self._prompt_calls[prompt_hash] = call_index + 1
+            self.calls += 1
+        if sample_index is not None:
+            call_index = sample_index
+
+        rng = random.Random(f"{self.seed}:{prompt_hash}:{call_index}")
+        latency = self._sample_latency(rng)
+        if rng.random() < self.error_rate:
+            with self._lock:
+                self.errors += 1
+            return latency, None
+        return latency, self._response_text(prompt, prompt_hash, rng)
+
+    def generate(self, prompt: str, sample_index: int = None) -> str:
+        """
+        Generate a response, sleeping for the drawn latency.
+
+        Args:
+            prompt: Prompt text
+            sample_index: Index selecting the outcome (see ``plan``)
+
+        Returns:
+            Response text
+
+        Raises:
+            StubLLMError: For an injected error (after the latency)
+        """
+        latency, text = self.plan(prompt, sample_index)
+        time.sleep(latency)
+        if text is None:
+            raise StubLLMError("Injected stub LLM error")
+        return text
+
+    async def agenerate(self, prompt: str, sample_index: int = None) -> str:
+        """Generate a response without blocking the event loop; see ``generate``."""
+        latency, text = self.plan(prompt, sample_index)
+        await asyncio.sleep(latency)
+        if text is None:
+            raise StubLLMError("Injected stub LLM error")
+        return text
+
+    def _sample_latency(self, rng: random.Random) -> float:
+        """Draw a latency from the configured distribution."""
+        if self.jitter == 0:
+            return self.latency
+        if self.distribution == "uniform":
+            value = rng.uniform(self.latency - self.jitter, self.latency + self.jitter)
+        elif self.distribution == "normal":
+            value = rng.gauss(self.latency, self.jitter)
+        else:
+            value = self.latency * rng.lognormvariate(0.0, self.jitter)
+        return max(0.0, value)
+
+    def _response_text(self, prompt: str, prompt_hash: str, rng: random.Random) -> str:
+        """Build a response whose words mostly depend on the prompt only."""
+        vocabulary = [word.strip(".,:;!?\"'()[]{}#*").lower() for word in prompt.split()]
+        vocabulary = [word for word in vocabulary if word.isalpha()] + list(_FILLER_WORDS)
+
+        length = self.response_length
+        if self.length_jitter:
+            length = max(1, round(rng.gauss(self.response_length, self.response_length * self.length_jitter)))
+
+        # Words shared by every call with this prompt, some replaced per call
+        base = random.Random(f"{self.seed}:{prompt_hash}")
+        words: List[str] = []
+        for _ in range(length):
+            word = base.choice(vocabulary)
+            if rng.random() < self.variability:
+                word = rng.choice(vocabulary)
+            words.append(word)
+
+        words[0] = words[0].capitalize()
+        return " ".join(words) + "."
+
+
+class _StubRequestHandler(BaseHTTPRequestHandler):
+    """Serves ``POST /generate`` with ``{"prompt": ..., "sample_index": ...}`` and ``GET /health``."""
+
+    server: "ThreadingHTTPServer"
+
+    def do_GET(self):
+        if self.path == "/health":
+            self._send(200, {"status": "ok", "model": self.server.client.model})
+        else:
+            self._send(404, {"error": "Not found"})
+
+    def do_POST(self):
+        if self.path != "/generate":
+            self._send(404, {"error": "Not found"})
+            return
+
+        try:
+            length = int(self.headers.get("Content-Length", 0))
+            request = json.loads(self.rfile.read(length))
+            prompt, sample_index = request["prompt"], request.get("sample_index")
+            if not isinstance(prompt, str):
+                raise TypeError("prompt must be a string")
+            if sample_index is not None and not isinstance(sample_index, int):
+                raise TypeError("sample_index must be an integer")
+        except (ValueError, KeyError, TypeError) as e:
+            self._send(400, {"error": f"Invalid request: {e}"})
+            return
+
+        try:
+            text = self.server.client.generate(prompt, sample_index)
+        except StubLLMError as e:
+            self._send(503, {"error": str(e)})
+            return
+        self._send(200, {"text": text, "model": self.server.client.model})
+
+    def _send(self, status: int, payload: Dict[str, Any]) -> None:
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        logger.debug("%s - %s", self.address_string(), format % args)
+
+
+class StubLLMServer:
+    """
+    Serves a stub client over HTTP from a background thread.
+
+    Use as a context manager, or call ``start`` and ``stop``.
+    """
+
+    def __init__(self, client: StubLLMClient = None, host: str = "127.0.0.1", port: int = 0):
+        """
+        Initialize the server.
+
+        Args:
+            client: Stub client answering requests (a default one if None)
+            host: Interface to bind
+            port: Port to bind (0 picks a free port)
+        """
+        self.client = client or StubLLMClient()
+        self.httpd = ThreadingHTTPServer((host, port), _StubRequestHandler)
+        self.httpd.daemon_threads = True
+        self.httpd.client = self.client
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        """Base URL of the server."""
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> 'StubLLMServer':
+        """Start serving in a daemon thread."""
+        self._thread = threading.Thread(target=self.httpd.serve_forever, name="stub-llm-server", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        """Stop serving and close the socket."""
+        if self._thread is not None:
+            self.httpd.shutdown()
+            self._thread.join()
+            self._thread = None
+        self.httpd.server_close()
+
+    def __enter__(self) -> 'StubLLMServer':
+        return self.start()
+
+    def __exit__(self, *exc_info) -> None:
+        self.stop()
+
+
+class StubHTTPClient:
+    """LLM client for a ``StubLLMServer``, with the ``generate`` interface used by the evaluator."""
+
+    def __init__(self, url: str, timeout: float = 30.0, model: str = None):
+        """
+        Initialize the client.
+
+        Args:
+            url: Base URL of the server
+            timeout: Socket timeout in seconds
+            model: Model name reported for cache keys (defaults to the URL)
+        """
+        self.url = url.rstrip("/")
+        self.timeout = timeout
+        self.model = model or self.url
+
+    def generate(self, prompt: str, sample_index: int = None) -> str:
+        """
+        Request a response from the server.
+
+        Args:
+            prompt: Prompt text
+            sample_index: Index selecting the outcome (see ``StubLLMClient.plan``)
+
+        Returns:
+            Response text
+
+        Raises:
+            urllib.error.HTTPError: If the server reports an error
+        """
+        request = urllib.request.Request(
+            f"{self.url}/generate",
+            data=json.dumps({"prompt": prompt, "sample_index": sample_index}).encode("utf-8"),
+            headers={"Content-Type": "application/json"},
+            method="POST"
+        )
+        with urllib.request.urlopen(request, timeout=self.timeout) as response:
+            return json.loads(response.read())["text"]
+
+
+def main(argv: List[str] = None) -> int:
+    """Command-line entry point serving a stub client until interrupted."""
+    parser = argparse.ArgumentParser(description="Serve a deterministic stub LLM over HTTP.")
+    parser.add_argument("--host", default="127.0.0.1", help="Interface to bind")
+    parser.add_argument("--port", type=int, default=8001, help="Port to bind")
+    parser.add_argument("--seed", type=int, default=0, help="Seed for reproducible responses")
+    parser.add_argument("--response-length", type=int, default=50, help="Mean response length in words")
+    parser.add_argument("--length-jitter", type=float, default=0.0, help="Length deviation as a fraction")
+    parser.add_argument("--variability", type=float, default=0.2, help="Fraction of words varying per call")
+    parser.add_argument("--latency", type=float, default=0.0, help="Typical latency in seconds")
+    parser.add_argument("--jitter", type=float, default=0.0, help="Latency spread")
+    parser.add_argument("--distribution", choices=LATENCY_DISTRIBUTIONS, default="uniform",
+                        help="Latency distribution")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Probability of an injected error")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO)
+    client = StubLLMClient(
+        seed=args.seed,
+        response_length=args.response_length,
+        length_jitter=args.length_jitter,
+        variability=args.variability,
+        latency=args.latency,
+        jitter=args.jitter,
+        distribution=args.distribution,
+        error_rate=args.error_rate
+    )
+    server = StubLLMServer(client, args.host, args.port)
+    logger.info(f"Serving stub LLM at {server.url}")
+    try:
+        server.httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.httpd.server_close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
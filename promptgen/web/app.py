@@ -14,10 +14,8 @@ import pandas as pd
 import altair as alt
 import time
 
-from promptgen.core.classifier import DomainClassifier
-from promptgen.core.generator import PromptGenerator
+from promptgen.core.engine import get_engine
 from promptgen.core.refiner import PromptRefiner
-from promptgen.core.technique_selector import TechniqueSelector
 from promptgen.domains import get_domain_service
 from promptgen.utils.evaluator import PromptEvaluator
 from promptgen.utils.domain_evaluator import DomainSpecificEvaluator, evaluate_prompt_with_domain
@@ -55,11 +53,12 @@ class NotificationManager:
 
 def create_app():
     """Configure the Streamlit application."""
-    # Initialize components
-    classifier = DomainClassifier()
-    generator = PromptGenerator()
+    # Initialize components; catalogs and classifiers come from the shared engine
+    engine = get_engine()
+    classifier = engine.classifier
+    generator = engine.generator
     refiner = PromptRefiner()
-    technique_selector = TechniqueSelector()
+    technique_selector = engine.technique_selector
     evaluator = PromptEvaluator()
     notifications = NotificationManager()
     
@@ -145,18 +144,18 @@ def create_app():
                         # Domain Classification
                         status.update(label="Detecting domain...")
                         time.sleep(0.5)  # Simulate processing
-                        detected_domain = classifier.classify(user_input)
+                        detected_domain, _ = classifier.classify_domain(user_input)
                         notifications.info(f"Detected domain: {detected_domain}")
                         
                         # Technique Selection
                         status.update(label="Selecting techniques...")
                         time.sleep(0.5)  # Simulate processing
-                        selected_techniques = technique_selector.select(user_input, detected_domain)
+                        selected_techniques = technique_selector.select_techniques(user_input, detected_domain)
                         
                         # Generate Prompt
                         status.update(label="Generating prompt...")
                         time.sleep(0.5)  # Simulate processing
-                        generated_prompt = generator.generate(
+                        generated_prompt = generator.generate_prompt(
                             user_input,
                             domain=detected_domain,
                             techniques=selected_techniques
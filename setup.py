@@ -10,4 +10,9 @@ setup(
         "altair",
     ],
     python_requires=">=3.8",
+    entry_points={
+        "console_scripts": [
+            "promptgen-refine=promptgen.batch_refine:main",
+        ],
+    },
 ) 
\ No newline at end of file
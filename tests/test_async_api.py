@@ -0,0 +1,86 @@
+"""
+Tests for the asyncio generation and evaluation API.
+"""
+
+import asyncio
+import json
+import os
+import time
+import pytest
+from promptgen.config import AppConfig
+from promptgen.core.generator import PromptGenerator, TemplateFactory
+from promptgen.templates.loader import PromptTemplate, TemplateLibrary
+from promptgen.utils.evaluator import PromptEvaluator
+from promptgen.utils.state_manager import StateManager
+
+PROMPT = "Write a Python function that parses a CSV file and returns the rows as a list of dictionaries."
+
+
+class AsyncStubClient:
+    """LLM client whose agenerate coroutine sleeps instead of calling a model."""
+
+    def __init__(self, delay=0.2):
+        self.delay = delay
+
+    def generate(self, prompt):
+        time.sleep(self.delay)
+        return "def parse(path): return list(csv.DictReader(open(path)))"
+
+    async def agenerate(self, prompt):
+        await asyncio.sleep(self.delay)
+        return "def parse(path): return list(csv.DictReader(open(path)))"
+
+
+@pytest.fixture
+def generator():
+    """Fixture to provide a generator over a single-template library."""
+    library = TemplateLibrary()
+    library.register(PromptTemplate.from_dict({
+        'name': 'software_async',
+        'domain': 'software',
+        'sections': [{'name': 'Objective', 'position': 1, 'content_template': 'Build {objective}'}]
+    }))
+    return PromptGenerator(template_factory=TemplateFactory(library))
+
+
+def test_agenerate_prompt_matches_sync(generator):
+    """Test the coroutine returns the same prompt as generate_prompt."""
+    expected = generator.generate_prompt(objective="a todo app", domain="software", complexity=2)
+    result = asyncio.run(generator.agenerate_prompt(objective="a todo app", domain="software", complexity=2))
+    assert result == expected
+
+
+def test_aevaluate_samples_concurrently():
+    """Test LLM test requests are awaited concurrently and give the sync metrics."""
+    evaluator = PromptEvaluator(AsyncStubClient(delay=0.2), config=AppConfig(cache_responses=False))
+
+    start = time.perf_counter()
+    results = asyncio.run(evaluator.aevaluate(PROMPT))
+    elapsed = time.perf_counter() - start
+
+    assert elapsed < 0.5
+    assert len(results["sample_responses"]) == 3
+    assert results["response_consistency"] == 1.0
+
+    expected = evaluator.evaluate(PROMPT)
+    for key in ("quality_score", "word_count", "factor_scores", "suggestions", "response_length"):
+        assert results[key] == expected[key]
+
+
+def test_aadd_to_history_persists(tmp_path):
+    """Test async history persistence writes every concurrently added item."""
+    manager = StateManager()
+    manager.config = AppConfig(cache_dir=str(tmp_path))
+    manager.history = []
+
+    async def add_all():
+        await asyncio.gather(*(
+            manager.aadd_to_history(f"objective {i}", "prompt", "software", [], 0.5)
+            for i in range(5)
+        ))
+
+    asyncio.run(add_all())
+
+    with open(os.path.join(tmp_path, 'prompt_history.json')) as f:
+        saved = json.load(f)
+    assert [item['objective'] for item in saved] == [f"objective {i}" for i in range(5)]
@@ -0,0 +1,89 @@
+"""
+Tests for the batch refinement command-line tool.
+"""
+
+import json
+import pytest
+from promptgen.batch_refine import main, run, read_checkpoint, write_checkpoint
+from promptgen.core.refiner import PromptRefiner
+
+
+@pytest.fixture
+def prompts_file(tmp_path):
+    """A JSONL file of prompts with one malformed line."""
+    path = tmp_path / "prompts.jsonl"
+    lines = [json.dumps({"id": f"p{i}", "prompt": f"# Context\nPrompt {i} about code"}) for i in range(10)]
+    lines.insert(5, "not json")
+    path.write_text("\n".join(lines) + "\n")
+    return path
+
+
+def _read_jsonl(path):
+    with open(path) as f:
+        return [json.loads(line) for line in f]
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_results_written_in_order(prompts_file, tmp_path, workers):
+    """Test results match PromptRefiner.refine and keep the input order."""
+    output = tmp_path / "out.jsonl"
+    written, failed = run(str(prompts_file), str(output), workers=workers, chunksize=3)
+
+    results = _read_jsonl(output)
+    assert (written, failed) == (11, 1)
+    assert [result["index"] for result in results] == list(range(11))
+    assert "error" in results[5]
+
+    expected = PromptRefiner().refine("# Context\nPrompt 0 about code")
+    assert results[0]["id"] == "p0"
+    assert results[0]["refined_prompt"] == expected["refined_prompt"]
+    assert results[0]["improvement_score"] == expected["improvement_score"]
+
+
+def test_resume_from_checkpoint(prompts_file, tmp_path):
+    """Test a resumed run appends only the records after the checkpoint offset."""
+    output = tmp_path / "out.jsonl"
+    checkpoint = tmp_path / "out.ckpt"
+
+    # Simulate an interrupted run that wrote the first 4 records
+    run(str(prompts_file), str(output), chunksize=4, checkpoint=str(checkpoint))
+    results = _read_jsonl(output)[:4]
+    output.write_text("".join(json.dumps(result) + "\n" for result in results))
+    checkpoint.write_text(json.dumps({"offset": 4}))
+
+    main([str(prompts_file), "-o", str(output), "-w", "1", "--checkpoint", str(checkpoint), "--resume"])
+
+    assert [result["index"] for result in _read_jsonl(output)] == list(range(11))
+    assert read_checkpoint(str(checkpoint)) == 11
+
+
+def test_resume_truncates_output_past_checkpoint(prompts_file, tmp_path):
+    """Test resuming drops lines written after the checkpoint, including a torn last line."""
+    output = tmp_path / "out.jsonl"
+    checkpoint = tmp_path / "out.ckpt"
+    run(str(prompts_file), str(output), chunksize=4)
+    complete = output.read_bytes()
+
+    # Simulate a run killed mid-chunk: 4 records checkpointed, 2 more flushed, a partial line
+    lines = complete.splitlines(keepends=True)
+    checkpointed = b"".join(lines[:4])
+    output.write_bytes(checkpointed + lines[4] + lines[5] + lines[6][:10])
+    write_checkpoint(str(checkpoint), 4, len(checkpointed))
+
+    main([str(prompts_file), "-o", str(output), "-w", "1", "--checkpoint", str(checkpoint), "--resume"])
+
+    assert output.read_bytes() == complete
+    assert read_checkpoint(str(checkpoint)) == 11
+
+
+def test_resume_without_checkpoint_replaces_output(prompts_file, tmp_path):
+    """Test resuming before any checkpoint exists rewrites the output instead of appending."""
+    output = tmp_path / "out.jsonl"
+    checkpoint = tmp_path / "out.ckpt"
+    run(str(prompts_file), str(output), chunksize=4)
+    complete = output.read_bytes()
+
+    main([str(prompts_file), "-o", str(output), "-w", "1", "--checkpoint", str(checkpoint), "--resume"])
+
+    assert output.read_bytes() == complete
+    assert read_checkpoint(str(checkpoint)) == 11
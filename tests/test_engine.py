@@ -0,0 +1,66 @@
+"""
+Tests for the shared prompt generation engine.
+"""
+
+import pytest
+from promptgen.core.engine import PromptEngine, get_engine, DEFAULT_TEMPLATES_DIR
+from promptgen.techniques.library import TechniqueLibrary
+from promptgen.templates.loader import PromptGenerator as TemplateGenerator
+
+
+@pytest.fixture
+def engine():
+    """Fixture to provide a lazily loaded engine over the bundled templates."""
+    return PromptEngine(DEFAULT_TEMPLATES_DIR, lazy=True)
+
+
+def test_generators_share_catalogs(engine):
+    """Test both generators use the engine's template and technique libraries."""
+    assert engine.generator.template_factory.template_library is engine.template_library
+    assert engine.template_generator.template_library is engine.template_library
+    assert engine.generator.technique_library is engine.technique_library
+    assert engine.template_generator.technique_library is engine.technique_library
+
+
+def test_warm_loads_templates(engine):
+    """Test warming loads every lazily loaded template body."""
+    assert not engine.is_warm
+    assert engine.template_library.loaded_templates() == []
+
+    engine.warm()
+
+    assert engine.is_warm
+    assert sorted(engine.template_library.loaded_templates()) == sorted(engine.template_library.list_templates())
+
+
+def test_warm_keeps_loaded_budget():
+    """Test warming a lazy engine loads no more template bodies than max_loaded."""
+    engine = PromptEngine(DEFAULT_TEMPLATES_DIR, lazy=True, max_loaded=2)
+    names = engine.template_library.list_templates()
+
+    engine.warm()
+
+    assert engine.template_library.loaded_templates() == names[:2]
+    assert all(not engine.template_library.templates[name].is_loaded for name in names[2:])
+
+
+def test_engine_generates_with_both_apis(engine):
+    """Test objective-driven and template-driven generation through one engine."""
+    prompt = engine.generate_prompt("Build a REST API in Python", domain="software", complexity=3)
+    assert "Build a REST API in Python" in prompt
+
+    prompt, template = engine.generate_from_template("Build a REST API", "software", "implementation", 3)
+    assert template is not None
+    assert "Build a REST API" in prompt
+
+
+def test_get_engine_is_shared():
+    """Test the process-wide engine is built and warmed once."""
+    first = get_engine()
+    assert first.is_warm
+    assert get_engine() is first
+
+
+def test_template_generator_default_technique_library():
+    """Test the template generator defaults to the technique library, not a template library."""
+    assert isinstance(TemplateGenerator().technique_library, TechniqueLibrary)
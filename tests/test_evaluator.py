@@ -0,0 +1,279 @@
+"""
+Tests for the prompt evaluation utilities.
+"""
+
+import os
+import re
+import threading
+import time
+import pytest
+from unittest.mock import patch
+from promptgen.config import AppConfig
+from promptgen.utils.evaluator import PromptEvaluator
+from promptgen.utils.response_cache import TMP_GRACE, ResponseCache
+
+PROMPTS = [
+    "Write a Python function that parses a CSV file and returns the rows as a list of dictionaries.",
+    "# Context\nYou might possibly need this for the data pipeline.\n\n"
+    "1. Read the file\n2. Return rows\n * be careful\n- really\n```python\nrows = []\n```\n"
+    "The output should be a list of dictionaries, for example [{...}].",
+    "Maybe it could work. Something nice, mightily done. YOU should CREATE the OUTPUT before they leave.",
+]
+
+
+class StubClient:
+    """LLM client with injected latency whose first ``failures`` calls raise."""
+
+    def __init__(self, latencies=(0.2,), failures=0):
+        self.latencies = list(latencies)
+        self.failures = failures
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def generate(self, prompt):
+        with self._lock:
+            call = self.calls
+            self.calls += 1
+        time.sleep(self.latencies[call % len(self.latencies)])
+        if call < self.failures:
+            raise ConnectionError("service unavailable")
+        return f"Response to: {prompt[:20]}"
+
+
+def _config(**kwargs):
+    """Configuration for LLM tests, without the on-disk response cache."""
+    return AppConfig(cache_responses=False, **kwargs)
+
+
+@pytest.fixture
+def evaluator():
+    """Fixture to provide an evaluator without an LLM client."""
+    return PromptEvaluator()
+
+
+def _separate_counts(evaluator, text):
+    """Count matches the straightforward way: each pattern on its own."""
+    counts = {
+        factor: sum(1 for pattern in patterns for _ in re.finditer(pattern, text, re.MULTILINE))
+        for factor, patterns in evaluator.patterns.items() if factor != "structure"
+    }
+    counts["structure"] = sum(
+        1 for pattern in evaluator.patterns["structure"] for line in text.split("\n") if re.match(pattern, line)
+    )
+    return counts
+
+
+@pytest.mark.parametrize("prompt", PROMPTS)
+def test_combined_scan_matches_separate_patterns(evaluator, prompt):
+    """Test the combined scanners count the same matches as each pattern on its own."""
+    scanner = evaluator._scanner
+    counts = scanner.count_text(prompt)
+    counts["structure"] = scanner.count_lines(prompt.split("\n"))
+
+    assert counts == _separate_counts(evaluator, prompt)
+
+
+def test_overlapping_patterns_count_for_each_factor(evaluator):
+    """Test a word matched by patterns of two factors counts for both."""
+    counts = evaluator._scanner.count_text("possibly")
+    assert counts["clarity"] == 1
+    assert counts["specificity"] == 1
+
+
+def test_patterns_compiled_once():
+    """Test evaluators share the compiled scanner."""
+    assert PromptEvaluator()._scanner is PromptEvaluator()._scanner
+
+
+def test_pattern_edits_take_effect(evaluator):
+    """Test changing an evaluator's patterns changes its scanner and counts."""
+    before = evaluator._scanner.count_text("a widget")
+    evaluator.patterns["specificity"] = evaluator.patterns["specificity"] + [r"\b(widget)\b"]
+    after = evaluator._scanner.count_text("a widget")
+
+    assert after["specificity"] == before["specificity"] + 1
+    assert evaluator._scanner is not PromptEvaluator()._scanner
+
+
+def test_llm_samples_sent_concurrently():
+    """Test test requests overlap, so evaluation takes about one round trip."""
+    client = StubClient(latencies=[0.3])
+    evaluator = PromptEvaluator(client, config=_config(api_timeout=5, max_retries=0), num_samples=5)
+
+    start = time.perf_counter()
+    results = evaluator._evaluate_with_llm(PROMPTS[0])
+    elapsed = time.perf_counter() - start
+
+    assert elapsed < 0.6
+    assert client.calls == 5
+    assert len(results["sample_responses"]) == 5
+    assert "sample_errors" not in results
+
+
+def test_llm_samples_retried_with_backoff():
+    """Test failed requests are retried until they succeed."""
+    client = StubClient(latencies=[0.01], failures=2)
+    evaluator = PromptEvaluator(client, config=_config(api_timeout=5, max_retries=2), num_samples=2)
+    evaluator.retry_backoff = 0.01
+
+    results = evaluator._evaluate_with_llm(PROMPTS[0])
+
+    assert client.calls == 4
+    assert len(results["sample_responses"]) == 2
+    assert "sample_errors" not in results
+
+
+def test_llm_timeouts_give_partial_results():
+    """Test requests over the timeout fail after their retries while the rest are kept."""
+    client = StubClient(latencies=[0.01, 0.01, 2.0])
+    evaluator = PromptEvaluator(client, config=_config(api_timeout=0.3, max_retries=0), num_samples=3)
+
+    start = time.perf_counter()
+    results = evaluator._evaluate_with_llm(PROMPTS[0])
+
+    assert time.perf_counter() - start < 1.0
+    assert len(results["sample_responses"]) == 2
+    assert results["sample_errors"] == ["TimeoutError"]
+
+
+def test_llm_all_samples_failing():
+    """Test an error is reported when no test request succeeds."""
+    client = StubClient(latencies=[0.01], failures=10)
+    evaluator = PromptEvaluator(client, config=_config(api_timeout=5, max_retries=1), num_samples=2)
+    evaluator.retry_backoff = 0.01
+
+    results = evaluator._evaluate_with_llm(PROMPTS[0])
+
+    assert client.calls == 4
+    assert results == {"llm_test_error": "ConnectionError: service unavailable"}
+
+
+def test_cached_responses_reused_per_sample(tmp_path):
+    """Test re-evaluating a prompt reuses each cached sample instead of calling the model."""
+    config = AppConfig(cache_dir=str(tmp_path), api_timeout=5, max_retries=0)
+    client = StubClient(latencies=[0.01])
+    PromptEvaluator(client, config=config)._evaluate_with_llm(PROMPTS[0])
+    assert client.calls == 3
+
+    results = PromptEvaluator(client, config=config)._evaluate_with_llm(PROMPTS[0])
+    assert client.calls == 3
+    assert results["cached_samples"] == 3
+    assert len(results["sample_responses"]) == 3
+
+    # Asking for more samples only requests the missing one
+    PromptEvaluator(client, config=config, num_samples=4)._evaluate_with_llm(PROMPTS[0])
+    assert client.calls == 4
+
+
+def test_response_cache_not_used_when_disabled(tmp_path):
+    """Test cache_responses=False disables the response cache."""
+    config = AppConfig(cache_dir=str(tmp_path), cache_responses=False)
+    assert PromptEvaluator(StubClient(), config=config).response_cache is None
+
+
+def test_response_cache_errors_do_not_fail_samples(tmp_path):
+    """Test an unusable cache directory disables caching and failed writes keep the responses."""
+    blocker = tmp_path / "not_a_directory"
+    blocker.write_text("")
+    assert PromptEvaluator(StubClient(), config=AppConfig(cache_dir=str(blocker))).response_cache is None
+
+    client = StubClient(latencies=[0.01])
+    evaluator = PromptEvaluator(client, config=AppConfig(cache_dir=str(tmp_path), max_retries=0))
+    with patch.object(evaluator.response_cache, "put", side_effect=OSError("disk full")):
+        results = evaluator._evaluate_with_llm(PROMPTS[0])
+
+    assert len(results["sample_responses"]) == 3
+    assert "sample_errors" not in results
+
+
+def test_response_cache_clear_keeps_partial_writes(tmp_path):
+    """Test clearing the cache leaves other writers' temporary files in place."""
+    cache = ResponseCache(str(tmp_path))
+    cache.put(cache.key("client", "prompt"), "response")
+    partial = os.path.join(cache.directory, ".tmp-writer.json")
+    open(partial, "w").close()
+
+    cache.clear()
+    assert len(cache) == 0
+    assert os.path.exists(partial)
+
+
+def test_response_cache_removes_stale_partial_writes(tmp_path):
+    """Test clear and evict delete temporary files abandoned by crashed writers."""
+    cache = ResponseCache(str(tmp_path))
+
+    def partial_write(name, age):
+        path = os.path.join(cache.directory, name)
+        open(path, "w").close()
+        os.utime(path, (1, time.time() - age))
+        return path
+
+    for remove in (cache.evict, cache.clear):
+        stale = partial_write(".tmp-crashed.json", 2 * TMP_GRACE)
+        active = partial_write(".tmp-writer.json", 0)
+        remove()
+        assert not os.path.exists(stale)
+        assert os.path.exists(active)
+
+
+def test_response_cache_ttl_and_lru_eviction(tmp_path):
+    """Test expired entries are dropped and the least recently used entries evicted."""
+    cache = ResponseCache(str(tmp_path), ttl=60, max_entries=2)
+    keys = [cache.key("client", f"prompt {i}") for i in range(3)]
+    assert len(set(keys + [cache.key("client", "prompt 0", sample_index=1)])) == 4
+
+    cache.put(keys[0], "first", 0.1)
+    cache.put(keys[1], "second", 0.2)
+    os.utime(cache._path(keys[0]), (1, time.time() - 30))
+    os.utime(cache._path(keys[1]), (1, time.time() - 20))
+    assert cache.get(keys[0]) == ("first", 0.1)  # Now the most recently used
+
+    cache.put(keys[2], "third", 0.3)
+    cache.evict()
+    assert len(cache) == 2
+    assert cache.get(keys[1]) is None
+    assert cache.get(keys[0]) == ("first", 0.1)
+
+    cache.ttl = 0
+    time.sleep(0.01)
+    assert cache.get(keys[2]) is None
+
+
+def test_evaluate_many_matches_evaluate(evaluator):
+    """Test batch scores, word counts and suggestions equal single-prompt evaluation."""
+    prompts = PROMPTS + ["", "   \n  ", "# Plan\nThis is it.\nIt could be, possibly.", "NUL\0separated you text"]
+    batch = evaluator.evaluate_many(prompts, suggestions_for=range(len(prompts)))
+
+    assert batch["factor_scores"].shape == (len(prompts), len(evaluator.quality_factors))
+    assert batch["pattern_counts"].shape == (len(prompts), sum(map(len, evaluator.patterns.values())))
+    for i, prompt in enumerate(prompts):
+        expected = evaluator.evaluate(prompt)
+        assert batch["quality_scores"][i] == expected["quality_score"]
+        assert dict(zip(batch["factors"], batch["factor_scores"][i].tolist())) == expected["factor_scores"]
+        assert batch["word_counts"][i] == expected["word_count"]
+        assert batch["suggestions"][i] == expected["suggestions"]
+
+
+def test_evaluate_many_ranks_and_limits_suggestions(evaluator):
+    """Test prompts are ranked by quality and suggestions are only made for requested prompts."""
+    prompts = ["Do it.", PROMPTS[1], PROMPTS[0]]
+    batch = evaluator.evaluate_many(prompts, suggestions_for=[0])
+
+    assert list(batch["suggestions"]) == [0]
+    ranked = batch["quality_scores"][batch["ranking"]]
+    assert list(ranked) == sorted(batch["quality_scores"], reverse=True)
+    assert evaluator.evaluate_many([])["quality_scores"].shape == (0,)
+
+
+def test_compare_prompts_matches_evaluate(evaluator):
+    """Test batch comparison gives each prompt's evaluate results, best first."""
+    comparison = evaluator.compare_prompts(PROMPTS)
+
+    for result in comparison["evaluations"]:
+        expected = evaluator.evaluate(PROMPTS[result["prompt_index"]])
+        assert {k: v for k, v in result.items() if k not in ("prompt_index", "prompt_text")} == expected
+        assert list(result["factor_scores"]) == list(expected["factor_scores"])
+        assert type(result["quality_score"]) is float
+    scores = [result["quality_score"] for result in comparison["evaluations"]]
+    assert scores == sorted(scores, reverse=True)
+    assert comparison["best_prompt_index"] == comparison["evaluations"][0]["prompt_index"]
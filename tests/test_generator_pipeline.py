@@ -0,0 +1,110 @@
+"""
+Tests for the staged prompt generation pipeline.
+"""
+
+import pytest
+from unittest.mock import Mock
+from promptgen.core.generator import PromptGenerator, TemplateFactory, GenerationState
+from promptgen.templates.loader import PromptTemplate, TemplateLibrary
+
+
+@pytest.fixture
+def template():
+    """A software template with one conditional section."""
+    return PromptTemplate.from_dict({
+        'name': 'software_pipeline',
+        'domain': 'software',
+        'complexity_range': [1, 5],
+        'sections': [
+            {'name': 'Objective', 'position': 1, 'content_template': 'Build {objective}'},
+            {'name': 'Stack', 'position': 2, 'content_template': 'Use {language}'},
+        ],
+        'conditional_sections': [
+            {'trigger': {'key': 'testing', 'value': True},
+             'add_sections': [{'name': 'Testing', 'position': 3, 'content_template': 'Write tests'}]}
+        ],
+        'best_practices': ['Keep it simple']
+    })
+
+
+@pytest.fixture
+def generator(template):
+    """Fixture to provide a generator over a single-template library."""
+    library = TemplateLibrary()
+    library.register(template)
+    return PromptGenerator(template_factory=TemplateFactory(library))
+
+
+def test_generate_prompt_renders_sections(generator, template):
+    """Test the pipeline populates and renders the selected template."""
+    prompt = generator.generate_prompt(
+        objective="a todo app",
+        domain="software",
+        complexity=2,
+        context={'language': 'Python', 'testing': True}
+    )
+
+    assert prompt == (
+        "# Objective\nBuild a todo app\n\n"
+        "# Stack\nUse Python\n\n"
+        "# Testing\nWrite tests\n\n"
+        "# Best Practices\n- Keep it simple"
+    )
+    # The shared template is not modified by conditional sections
+    assert [section['name'] for section in template.sections] == ['Objective', 'Stack']
+
+
+def test_supplied_stage_outputs_are_skipped(generator, template):
+    """Test stages whose output is supplied do not run."""
+    state = GenerationState(objective="a todo app", domain="software", complexity=2, template=template)
+    generator.run_pipeline(state)
+
+    assert state.skipped == ["classify", "analyze", "select"]
+    assert set(state.timings) == {"populate", "techniques", "render"}
+    assert "Use [language]" in state.prompt
+
+
+def test_stage_outputs_are_reused(generator):
+    """Test a state can be rerun with a changed context, reusing earlier stages."""
+    generator.template_factory = Mock(wraps=generator.template_factory)
+    state = generator.run_pipeline(GenerationState(objective="a todo app", domain="software", complexity=2))
+
+    state.context = {'language': 'Go'}
+    state.sections = state.prompt = None
+    generator.run_pipeline(state)
+
+    assert generator.template_factory.create_template.call_count == 1
+    assert "Use Go" in state.prompt
+
+
+def test_custom_populator(template):
+    """Test a custom populator replaces placeholder filling."""
+    library = TemplateLibrary()
+    library.register(template)
+    generator = PromptGenerator(
+        template_factory=TemplateFactory(library),
+        populator=lambda section, context: section['name'].upper()
+    )
+
+    prompt = generator.generate_prompt(objective="x", domain="software", complexity=1)
+    assert prompt.startswith("# Objective\nOBJECTIVE\n\n# Stack\nSTACK")
+
+
+@pytest.mark.parametrize("techniques", [
+    [("role_prompting", {"role": "analyst"}), ("prefill_response", {})],
+    [("chain_of_thought", {}), ("xml_tagging", {})],
+])
+def test_techniques_match_whole_prompt_application(generator, techniques):
+    """Test staged techniques give the same text as applying them to the rendered prompt."""
+    from promptgen.techniques import advanced  # noqa: F401 (registers prefill_response)
+    from promptgen.templates.loader import apply_technique_sequence
+    state = generator.run_pipeline(GenerationState(
+        objective="analyze a todo app", domain="software", complexity=2, techniques=techniques
+    ))
+
+    body = "\n\n".join(f"# {name}\n{content}" for name, content in state.sections)
+    expected = apply_technique_sequence(generator.technique_library, body, techniques)
+    assert state.prompt == expected + "\n\n# Best Practices\n- Keep it simple"
+    if techniques[-1][0] == "prefill_response":
+        assert state.technique_wrapping is None
+        assert "Analysis:\n1. Key Points:" in state.prompt
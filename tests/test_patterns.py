@@ -0,0 +1,71 @@
+"""
+Tests for the prompt pattern catalog.
+"""
+
+import os
+import pytest
+from promptgen.templates.patterns import PromptPattern, PatternCatalog, load_patterns
+
+PATTERNS_FILE = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+    "promptgen", "templates", "examples", "prompt_patterns.yaml"
+)
+
+
+@pytest.fixture
+def catalog():
+    """Fixture to provide the bundled pattern catalog."""
+    return load_patterns(PATTERNS_FILE)
+
+
+def test_pattern_compiles_segments():
+    """Patterns are split into literal and variable segments once."""
+    pattern = PromptPattern("greet", "Hi {{ name }}, {{task}} for {{name}}.")
+    assert pattern.variables == ("name", "task")
+    assert pattern.segments == (
+        (False, "Hi "), (True, "name"), (False, ", "), (True, "task"),
+        (False, " for "), (True, "name"), (False, ".")
+    )
+
+
+def test_pattern_render_fills_and_marks_missing():
+    """Missing variables render as bracketed placeholders."""
+    pattern = PromptPattern("greet", "Hi {{name}}, {{task}}.")
+    assert pattern.render({"name": "Ada", "task": "review"}) == "Hi Ada, review."
+    assert pattern.render({"name": "Ada"}) == "Hi Ada, [task]."
+
+
+def test_catalog_indexes_bundled_patterns(catalog):
+    """Every pattern in prompt_patterns.yaml is indexed by name and category."""
+    assert len(catalog.list_patterns()) == 10
+    assert catalog.list_categories() == ["meta"]
+    assert len(catalog.find_patterns("meta")) == 10
+    assert catalog.get("role prompting") is catalog.get("Role Prompting")
+
+
+def test_catalog_render_example(catalog):
+    """Bundled examples fill their pattern's variables."""
+    rendered = catalog.get("Role Prompting").render_example()
+    assert rendered.startswith("You are an expert data scientist with deep expertise in time series analysis.")
+    assert "{{" not in rendered
+    assert catalog.render("Missing Pattern") is None
+
+
+def test_register_replaces_category_entry():
+    """Re-registering a name moves it to its new category."""
+    catalog = PatternCatalog()
+    catalog.register(PromptPattern("p", "a", category="one"))
+    catalog.register(PromptPattern("p", "b", category="two"))
+    assert catalog.find_patterns("one") == []
+    assert catalog.list_categories() == ["two"]
+    assert catalog.render("p") == "b"
+
+
+def test_register_replaces_name_differing_in_case():
+    """A name differing only in case or whitespace replaces the earlier pattern."""
+    catalog = PatternCatalog()
+    catalog.register(PromptPattern("Summary", "a", category="one"))
+    catalog.register(PromptPattern(" summary ", "b", category="one"))
+    assert catalog.list_patterns() == [" summary "]
+    assert [p.pattern for p in catalog.find_patterns("one")] == ["b"]
+    assert catalog.render("SUMMARY") == "b"
@@ -0,0 +1,263 @@
+"""
+Tests for the prompt analysis and refinement functionality.
+"""
+
+import numpy as np
+import pytest
+from unittest.mock import patch
+from promptgen.core.refiner import PromptAnalyzer, PromptRefiner
+
+STRUCTURED_PROMPT = """# Context
+We are building an internal dashboard for the sales team.
+
+# Instructions
+Write the code for an API that reports weekly statistics.
+For instance, return totals per region.
+
+# Output
+Return the result in JSON format."""
+
+
+@pytest.fixture
+def analyzer():
+    """Fixture to provide a prompt analyzer instance."""
+    return PromptAnalyzer()
+
+
+def test_analyze_structured_prompt(analyzer):
+    """Test analysis of a prompt with headed sections."""
+    analysis = analyzer.analyze(STRUCTURED_PROMPT)
+
+    assert [section["name"] for section in analysis["sections"]] == ["Context", "Instructions", "Output"]
+    assert [issue["type"] for issue in analysis["issues"]] == ["vague_instructions"]
+    assert analysis["word_count"] == len(STRUCTURED_PROMPT.split())
+    assert analysis["domain"] == "software"
+    assert analysis["quality_score"] == pytest.approx(0.7)
+
+
+def test_analyze_unstructured_prompt(analyzer):
+    """Test an unstructured prompt is reported as a single section."""
+    analysis = analyzer.analyze("Write a blog post about cats.")
+
+    assert [section["name"] for section in analysis["sections"]] == ["Unstructured Content"]
+    assert {issue["type"] for issue in analysis["issues"]} == {
+        "missing_context", "vague_instructions", "missing_examples", "missing_output_format", "no_sections"
+    }
+    assert analysis["complexity"] == 1
+    assert analysis["quality_score"] == pytest.approx(0.1)
+
+
+def test_analyze_extracts_sections_once(analyzer):
+    """Test sections are extracted once and shared by every analysis step."""
+    with patch.object(analyzer, "_scan_sections", wraps=analyzer._scan_sections) as scan:
+        analyzer.analyze(STRUCTURED_PROMPT)
+
+    assert scan.call_count == 1
+
+
+def test_section_headers_follow_pattern_order(analyzer):
+    """Test a header line is named by the first pattern matching anywhere in it."""
+    prompt = "# Foo: ## Context\nbody\nTone: friendly\n#\nContext\nlast line"
+    sections = analyzer._extract_sections(prompt)
+
+    assert [(s["name"], s["line_start"], s["line_end"]) for s in sections] == [
+        ("Context", 1, 1),
+        ("Tone: friendly", 3, 5),
+    ]
+    assert sections[1]["content"] == "#\nContext\nlast line"
+
+
+def test_section_scan_on_large_prompt(analyzer):
+    """Test sections of a long prompt are found with correct line offsets."""
+    prompt = "\n".join(f"# Examples\nline {i}\nmore" for i in range(1000))
+    sections = analyzer._extract_sections(prompt)
+
+    assert len(sections) == 1000
+    assert sections[-1] == {"name": "Examples", "content": "line 999\nmore", "line_start": 2998, "line_end": 2999}
+
+
+@pytest.mark.parametrize("prompt, addition", [
+    (STRUCTURED_PROMPT, "\n\n# Examples\nExample 1: [details]"),
+    (STRUCTURED_PROMPT, "\n\nUpdated objective: summarize sales"),
+    ("Write a blog post about cats.", "\n\n# Context\nA pet blog.\n\n# Output\nMarkdown."),
+    ("Write a blog post about cats.", "\nMore detail, no headers."),
+])
+def test_analyze_extension_matches_full_analysis(analyzer, prompt, addition):
+    """Test merging the analysis of appended text gives the full analysis."""
+    _, features = analyzer.analyze_with_features(prompt)
+    analysis, _ = analyzer.analyze_extension(prompt, features, addition)
+
+    assert analysis == analyzer.analyze(prompt + addition)
+
+
+def test_enhance_reanalyzes_only_added_sections():
+    """Test enhance scans the original prompt once and then only the appended text."""
+    refiner = PromptRefiner()
+    enhancer = refiner.enhancer
+    with patch.object(enhancer.analyzer, "_extract_features",
+                      wraps=enhancer.analyzer._extract_features) as extract:
+        result = enhancer.enhance(STRUCTURED_PROMPT, desired_improvements=["add_examples"])
+
+    scanned = [call.args[0] for call in extract.call_args_list]
+    assert scanned[0] == STRUCTURED_PROMPT
+    assert scanned[1:] == [result["refined_prompt"][len(STRUCTURED_PROMPT):]]
+
+
+def test_refine_analyzes_each_text_once():
+    """Test refine analyzes the original and refined prompts once each."""
+    refiner = PromptRefiner()
+    analyses = refiner.new_analysis_cache()
+    with patch.object(refiner.analyzer, "analyze_with_features",
+                      wraps=refiner.analyzer.analyze_with_features) as analyze:
+        result = refiner.refine("Write a blog post about cats.", analyses=analyses)
+        suggestions = refiner.suggest_improvements(result["refined_prompt"], analyses=analyses)
+
+    # The refined prompt replaces the unstructured original, so both are analyzed in full
+    assert [call.args[0] for call in analyze.call_args_list] == [
+        "Write a blog post about cats.", result["refined_prompt"]
+    ]
+    assert len(analyses) == 2
+    assert result["refined_analysis"] is analyses.analysis(result["refined_prompt"])
+    assert suggestions == refiner.suggest_improvements(result["refined_prompt"])
+
+
+def test_analysis_cache_accepts_lone_surrogates():
+    """Test prompts with unpaired surrogates are cached under distinct keys."""
+    refiner = PromptRefiner()
+    analyses = refiner.new_analysis_cache()
+    prompt = "# Context\nhello \ud800 world"
+
+    result = refiner.refine(prompt, analyses=analyses)
+    assert result["original_analysis"] is analyses.analysis(prompt)
+    assert analyses.key(prompt) != analyses.key("# Context\nhello \udc00 world")
+
+
+def test_analyze_file_records_section_offsets(analyzer, tmp_path):
+    """Test memory-mapped analysis matches text analysis, with sections as offsets."""
+    path = tmp_path / "prompt.md"
+    path.write_bytes(STRUCTURED_PROMPT.encode("utf-8"))
+
+    analysis = analyzer.analyze_file(str(path))
+    expected = analyzer.analyze(STRUCTURED_PROMPT)
+
+    assert {k: v for k, v in analysis.items() if k != "sections"} == \
+        {k: v for k, v in expected.items() if k != "sections"}
+    assert [dict(section) for section in analysis["sections"]] == expected["sections"]
+
+    instructions = analysis["sections"][1]
+    raw = STRUCTURED_PROMPT.encode("utf-8")[instructions.start:instructions.end]
+    assert raw.decode("utf-8").strip() == instructions.content
+
+
+def test_open_file_closes_map(analyzer, tmp_path):
+    """Test sections read from the map inside the block, and the map is closed after it."""
+    path = tmp_path / "prompt.md"
+    path.write_bytes(STRUCTURED_PROMPT.encode("utf-8"))
+
+    with analyzer.open_file(str(path)) as analysis:
+        section = analysis["sections"][0]
+        assert section.content == analyzer.analyze(STRUCTURED_PROMPT)["sections"][0]["content"]
+    with pytest.raises(ValueError):
+        section.content
+
+    # analyze_file decodes its sections before closing the map
+    expected = analyzer.analyze(STRUCTURED_PROMPT)["sections"]
+    assert [dict(s) for s in analyzer.analyze_file(str(path))["sections"]] == expected
+
+
+def test_analyze_empty_file(analyzer, tmp_path):
+    """Test an empty file is analyzed as unstructured content."""
+    path = tmp_path / "empty.md"
+    path.write_bytes(b"")
+
+    analysis = analyzer.analyze_file(str(path))
+    assert analysis["word_count"] == 0
+    assert analysis["sections"][0]["name"] == "Unstructured Content"
+
+
+def test_refine_until_stops_when_converged():
+    """Test iterative refinement keeps improving passes and stops at a plateau."""
+    refiner = PromptRefiner()
+    result = refiner.refine_until("Write a blog post about cats.", max_iterations=10)
+
+    assert result["stop_reason"] == "converged"
+    assert result["score_history"] == sorted(result["score_history"])
+    assert len(result["score_history"]) < result["iterations"] + 1
+    assert result["refined_analysis"]["quality_score"] == result["score_history"][-1]
+
+
+@pytest.mark.parametrize("kwargs, stop_reason, iterations", [
+    ({"target_score": 0.0}, "target_reached", 0),
+    ({"max_iterations": 1}, "max_iterations", 1),
+    ({"time_budget": 0}, "time_budget", 0),
+])
+def test_refine_until_budgets(kwargs, stop_reason, iterations):
+    """Test the target score and iteration and time budgets end refinement."""
+    result = PromptRefiner().refine_until("Write a blog post about cats.", **kwargs)
+
+    assert result["stop_reason"] == stop_reason
+    assert result["iterations"] == iterations
+    if iterations == 0:
+        assert result["refined_prompt"] == "Write a blog post about cats."
+
+
+def test_refine_until_applies_objective_to_perfect_prompt(analyzer):
+    """Test the objective pass runs and is kept even when the prompt already scores 1.0."""
+    prompt = STRUCTURED_PROMPT + "\nInclude the total revenue, order count and average order value." * 8
+    assert analyzer.analyze(prompt)["quality_score"] == 1.0
+
+    result = PromptRefiner().refine_until(prompt, objective="Report on the last quarter.")
+
+    assert result["stop_reason"] == "target_reached"
+    assert result["iterations"] == 1
+    assert result["refined_prompt"].endswith("Updated objective: Report on the last quarter.")
+    assert result["score_history"] == [1.0, 1.0]
+
+
+def test_analyze_batch_matches_analyze(analyzer):
+    """Test batch issue detection and scoring agree with per-prompt analysis."""
+    prompts = [
+        STRUCTURED_PROMPT,
+        "Write a blog post about cats.",
+        "",
+        "# Context\nSome background.\n# Output\nA table.",
+        " ".join(["word"] * 501),
+        "# Examples\n" + " ".join(["sample"] * 120) + "\n## Format\nMarkdown\n# Tone: calm\nx\n# Output\ny",
+    ]
+    batch = analyzer.analyze_batch(prompts)
+
+    assert batch["issues"].shape == (len(prompts), len(analyzer.issue_detectors))
+    assert batch["issues"].dtype == np.bool_
+    for i, prompt in enumerate(prompts):
+        analysis = analyzer.analyze(prompt)
+        detected = [t for t, found in zip(batch["issue_types"], batch["issues"][i]) if found]
+        assert detected == [issue["type"] for issue in analysis["issues"]]
+        assert batch["quality_scores"][i] == analysis["quality_score"]
+
+
+def test_analyze_batch_empty(analyzer):
+    """Test an empty batch gives empty arrays."""
+    batch = analyzer.analyze_batch([])
+    assert batch["issues"].shape == (0, len(analyzer.issue_detectors))
+    assert batch["quality_scores"].shape == (0,)
+
+
+def test_custom_issue_detectors(analyzer, tmp_path):
+    """Test prompt-style and feature-style custom detectors in single, batch and file analysis."""
+    analyzer.issue_detectors["mentions_cats"] = lambda prompt: "cats" in prompt
+    analyzer.issue_detectors["very_short"] = lambda prompt, features: features["word_count"] < 8
+
+    prompts = ["Write a blog post about cats.", STRUCTURED_PROMPT]
+    batch = analyzer.analyze_batch(prompts)
+    for i, prompt in enumerate(prompts):
+        analysis = analyzer.analyze(prompt)
+        detected = [t for t, found in zip(batch["issue_types"], batch["issues"][i]) if found]
+        assert detected == [issue["type"] for issue in analysis["issues"]]
+        assert batch["quality_scores"][i] == analysis["quality_score"]
+
+    assert {"mentions_cats", "very_short"} <= set(batch["issue_types"])
+    assert batch["issues"][:, batch["issue_types"].index("mentions_cats")].tolist() == [True, False]
+
+    path = tmp_path / "prompt.md"
+    path.write_bytes(prompts[0].encode("utf-8"))
+    assert analyzer.analyze_file(str(path))["issues"] == analyzer.analyze(prompts[0])["issues"]
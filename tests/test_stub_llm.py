@@ -0,0 +1,80 @@
+"""
+Tests for the local stub LLM client and server.
+"""
+
+import time
+import urllib.error
+import pytest
+from promptgen.config import AppConfig
+from promptgen.utils.evaluator import PromptEvaluator
+from promptgen.utils.stub_llm import StubLLMClient, StubLLMError, StubLLMServer, StubHTTPClient
+
+PROMPT = "Write a Python function that parses a CSV file and returns the rows as a list of dictionaries."
+
+
+def test_responses_are_deterministic():
+    """Test clients with the same seed give the same responses in the same order."""
+    first, second = StubLLMClient(seed=7), StubLLMClient(seed=7)
+
+    responses = [first.generate(PROMPT) for _ in range(3)]
+    assert responses == [second.generate(PROMPT) for _ in range(3)]
+    assert len(set(responses)) == 3
+    assert responses[0] != StubLLMClient(seed=8).generate(PROMPT)
+
+
+def test_sample_index_selects_response():
+    """Test a sample index gives the same response whatever the call order."""
+    first, second = StubLLMClient(seed=7), StubLLMClient(seed=7)
+
+    in_order = [first.generate(PROMPT, sample_index=i) for i in range(3)]
+    reversed_order = [second.generate(PROMPT, sample_index=i) for i in reversed(range(3))]
+    assert in_order == reversed_order[::-1]
+    # Without an index, calls take indices in arrival order
+    assert in_order[0] == StubLLMClient(seed=7).generate(PROMPT)
+
+
+@pytest.mark.parametrize("variability", [0.0, 1.0])
+def test_response_length_and_variability(variability):
+    """Test the response length and how much repeated calls differ."""
+    client = StubLLMClient(response_length=30, variability=variability)
+    responses = [client.generate(PROMPT) for _ in range(2)]
+
+    assert all(len(response.split()) == 30 for response in responses)
+    assert (responses[0] == responses[1]) == (variability == 0.0)
+
+
+def test_latency_and_errors_injected():
+    """Test calls wait for the drawn latency and fail at the error rate."""
+    client = StubLLMClient(latency=0.05, jitter=0.02, distribution="normal", error_rate=0.5)
+    latencies = [client.plan(f"prompt {i}")[0] for i in range(200)]
+    assert 0.04 < sum(latencies) / len(latencies) < 0.06
+    assert 60 < client.errors < 140
+
+    start = time.perf_counter()
+    StubLLMClient(latency=0.1).generate(PROMPT)
+    assert time.perf_counter() - start >= 0.1
+
+    with pytest.raises(StubLLMError):
+        StubLLMClient(error_rate=1.0).generate(PROMPT)
+
+    with pytest.raises(ValueError):
+        StubLLMClient(distribution="pareto")
+
+
+def test_http_server_round_trip():
+    """Test evaluation end to end through the HTTP stub server."""
+    with StubLLMServer(StubLLMClient(seed=3, latency=0.2)) as server:
+        client = StubHTTPClient(server.url)
+        evaluator = PromptEvaluator(client, config=AppConfig(cache_responses=False))
+
+        start = time.perf_counter()
+        results = evaluator.evaluate(PROMPT)
+        assert time.perf_counter() - start < 0.5
+        assert len(results["sample_responses"]) == 3
+        assert server.client.calls == 3
+        assert client.generate(PROMPT, sample_index=1) == StubLLMClient(seed=3).generate(PROMPT, sample_index=1)
+
+    with StubLLMServer(StubLLMClient(error_rate=1.0)) as server:
+        with pytest.raises(urllib.error.HTTPError) as error:
+            StubHTTPClient(server.url).generate(PROMPT)
+        assert error.value.code == 503
@@ -226,4 +226,65 @@ class TestTemplateFactory:
             complexity=2,
             tags=["tag1"]
         )
-        assert score > 0.7  # Should have good score for tag match 
\ No newline at end of file
+        assert score > 0.7  # Should have good score for tag match 
+    
+    def test_section_sets_computed_once(self, factory, template_library):
+        """Section sets are built once per template, not per request"""
+        for _ in range(3):
+            factory.create_template("software", 4, components=["architecture"])
+        sw_advanced = template_library.find_templates("software", 4)[-1]
+        assert sw_advanced.get_required_sections.call_count == 1
+        assert sw_advanced.get_optional_sections.call_count == 1
+    
+    def test_rank_templates_top_k(self, factory):
+        """Ranking returns the k best templates, best first"""
+        ranked = factory.rank_templates("software", 2, k=2)
+        assert [t.name for _, t in ranked] == ["software_basic", "general_template"]
+        assert ranked[0][0] > ranked[1][0]
+
+
+def test_selection_memo_invalidated_on_register():
+    """Memoized selections are dropped when the catalog changes"""
+    library = TemplateLibrary()
+    library.register(PromptTemplate("fallback", "general"))
+    factory = TemplateFactory(library)
+
+    assert factory.create_template("software", 3).name == "fallback"
+    assert factory.create_template("software", 3).name == "fallback"
+
+    library.register(PromptTemplate("specific", "software"))
+    assert factory.create_template("software", 3).name == "specific"
+
+
+def test_section_sets_kept_for_catalog_larger_than_memo():
+    """Section sets stay cached when the catalog has more templates than memo_size"""
+    library = TemplateLibrary()
+    for i in range(8):
+        library.register(PromptTemplate(f"software_{i}", "software"))
+    factory = TemplateFactory(library, memo_size=2)
+
+    with patch.object(PromptTemplate, "get_required_sections", autospec=True, return_value=[]) as required:
+        factory.rank_templates("software", 3, components=["architecture"])
+        factory.rank_templates("software", 2, components=["architecture"])
+
+    assert required.call_count == 8
+
+
+def test_section_sets_follow_conditional_sections():
+    """Section sets are recomputed when a template's sections change"""
+    template = PromptTemplate(
+        "software_db", "software",
+        sections=[{"name": "Overview"}],
+        conditional_sections=[{"trigger": {"key": "db", "value": True},
+                               "add_sections": [{"name": "Schema", "position": 5}]}]
+    )
+    library = TemplateLibrary()
+    library.register(template)
+    factory = TemplateFactory(library)
+    assert factory._section_set(template) == {"Overview"}
+
+    template.apply_conditional_sections({"db": True})
+    assert factory._section_set(template) == {"Overview", "Schema"}
+
+    template.sections.append({"name": "Testing", "required": False})
+    assert factory._section_set(template) == {"Overview", "Schema", "Testing"}
@@ -0,0 +1,423 @@
+"""
+Tests for the template loader and library.
+"""
+
+import os
+import pytest
+import yaml
+from unittest.mock import patch
+from promptgen.templates.loader import (
+    PromptTemplate, LazyPromptTemplate, TemplateLibrary, PromptGenerator
+)
+
+TEMPLATES_DIR = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+    "promptgen", "templates", "examples"
+)
+
+
+@pytest.fixture
+def eager_library():
+    """Fixture to provide a fully loaded template library."""
+    return TemplateLibrary(TEMPLATES_DIR)
+
+
+@pytest.fixture
+def lazy_library():
+    """Fixture to provide a header-only template library."""
+    return TemplateLibrary(TEMPLATES_DIR, lazy=True, max_loaded=2)
+
+
+def test_lazy_library_indexes_headers_only(eager_library, lazy_library):
+    """Lazy mode lists the same templates without loading any bodies."""
+    assert lazy_library.list_templates() == eager_library.list_templates()
+    assert lazy_library.loaded_templates() == []
+
+    for name in lazy_library.list_templates():
+        template = lazy_library.templates[name]
+        assert isinstance(template, LazyPromptTemplate)
+        assert not template.is_loaded
+
+
+def test_lazy_find_templates_does_not_load(lazy_library):
+    """Finding templates only needs header fields."""
+    candidates = lazy_library.find_templates("software", 4)
+    assert [t.name for t in candidates] == ["Software Development Complete"]
+    assert not candidates[0].is_loaded
+
+
+def test_lazy_body_matches_eager(eager_library, lazy_library):
+    """Bodies loaded on first access match the eager definitions."""
+    name = "Software Development Complete"
+    lazy_template = lazy_library.get(name)
+    eager_template = eager_library.get(name)
+
+    assert lazy_template.to_dict() == eager_template.to_dict()
+    assert lazy_template.is_loaded
+    assert lazy_library.loaded_templates() == [name]
+
+
+def test_lazy_lru_eviction(lazy_library):
+    """Least recently used bodies are dropped beyond the budget."""
+    names = lazy_library.list_templates()[:3]
+    templates = [lazy_library.get(name) for name in names]
+    for template in templates:
+        template.sections  # trigger body load
+
+    assert lazy_library.loaded_templates() == names[1:]
+    assert not templates[0].is_loaded
+
+    # Evicted templates transparently reload
+    assert templates[0].sections
+    assert templates[0].is_loaded
+    assert len(lazy_library.loaded_templates()) == 2
+
+
+def test_lazy_body_parses_only_its_entry(tmp_path):
+    """Bodies from multi-template files are parsed alone, falling back to the file for aliases."""
+    (tmp_path / "multi.yaml").write_text(
+        "- name: \"First\"\n"
+        "  sections: &shared\n"
+        "    - name: \"Task\"\n"
+        "      content_template: |\n"
+        "        Build {objective}\n"
+        "- {name: \"Second\", domain: \"content\", best_practices: [\"Be brief\"]}\n"
+        "- name: \"Third\"\n"
+        "  sections: *shared\n"
+    )
+    eager = TemplateLibrary(str(tmp_path))
+    lazy = TemplateLibrary(str(tmp_path), lazy=True)
+
+    names = ("First", "Second", "Third")
+    for name in names:
+        with patch("yaml.safe_load", wraps=yaml.safe_load) as safe_load:
+            assert lazy.get(name).to_dict() == eager.get(name).to_dict()
+        source = safe_load.call_args.args[0]
+        if name == "Third":
+            # The alias only resolves in the whole file
+            assert isinstance(source, bytes)
+        else:
+            assert safe_load.call_count == 1
+            assert [other for other in names if f'"{other}"' in source] == [name]
+
+
+def test_lazy_generation_matches_eager(eager_library, lazy_library):
+    """Generating from a lazy library gives the same prompt."""
+    kwargs = dict(objective="a todo app", domain="software", task="coding", complexity=4)
+    eager_prompt, _ = PromptGenerator(eager_library).generate_prompt(**kwargs)
+    lazy_prompt, _ = PromptGenerator(lazy_library).generate_prompt(**kwargs)
+    assert lazy_prompt == eager_prompt
+
+
+def _write_catalog(directory, count):
+    """Write a catalog of small templates, with duplicate names and one broken file."""
+    for i in range(count):
+        name = f"Template {i % (count - 4)}"
+        (directory / f"t{i:03d}.yaml").write_text(
+            f"name: \"{name}\"\n"
+            f"domain: \"software\"\n"
+            f"description: \"from file {i}\"\n"
+            "sections:\n"
+            "  - name: \"Task\"\n"
+            "    position: 1\n"
+            "    content_template: \"Build {objective}\"\n"
+        )
+    (directory / "broken.yaml").write_text("name: [unclosed\n")
+
+
+def test_parallel_load_matches_serial(tmp_path):
+    """Process-pool loading gives the same catalog as a serial load."""
+    _write_catalog(tmp_path, 24)
+
+    serial = TemplateLibrary()
+    serial_errors = serial.load_templates(str(tmp_path))
+    parallel = TemplateLibrary()
+    parallel_errors = parallel.load_templates(str(tmp_path), workers=2)
+
+    assert parallel.list_templates() == serial.list_templates()
+    for name in serial.list_templates():
+        assert parallel.get(name).to_dict() == serial.get(name).to_dict()
+
+    assert [path for path, _ in parallel_errors] == [str(tmp_path / "broken.yaml")]
+    assert parallel_errors == serial_errors
+
+
+def test_stream_prompt_matches_generate():
+    """Streamed chunks join to the generated prompt, wrapped by technique text."""
+    from promptgen.techniques.library import default_library as technique_library
+    techniques = [("role_prompting", {"role": "architect"}), ("chain_of_thought", {})]
+    kwargs = dict(objective="a todo app", domain="software", task="coding", complexity=4,
+                  techniques=techniques)
+
+    generator = PromptGenerator(TemplateLibrary(TEMPLATES_DIR), technique_library)
+    chunks = list(generator.stream_prompt(context={"database_required": True}, **kwargs))
+    generator = PromptGenerator(TemplateLibrary(TEMPLATES_DIR), technique_library)
+    prompt, _ = generator.generate_prompt(context={"database_required": True}, **kwargs)
+
+    assert "".join(chunks) == prompt
+    assert chunks[0] == "You are an architect.\n\n"
+    assert chunks[1].startswith("# Task Description\n")
+    assert chunks[-1].startswith("\n\n# Best Practices\n")
+    assert "step-by-step" in chunks[-2]
+
+
+def test_stream_prompt_content_dependent_technique():
+    """A technique choosing its text from the prompt is applied to the whole prompt."""
+    from promptgen.techniques import advanced  # noqa: F401 (registers prefill_response)
+    from promptgen.techniques.library import default_library as technique_library
+    techniques = [("role_prompting", {"role": "analyst"}), ("prefill_response", {})]
+    kwargs = dict(objective="analyze the quarterly sales code", domain="software", task="coding",
+                  complexity=4, techniques=techniques)
+
+    generator = PromptGenerator(TemplateLibrary(TEMPLATES_DIR), technique_library)
+    chunks = list(generator.stream_prompt(**kwargs))
+    prompt, template = generator.generate_prompt(**kwargs)
+
+    context = {"objective": kwargs["objective"], "domain": "software", "task": "coding", "complexity": 4}
+    body = "".join(template.iter_render_context(context, lambda s: generator.populate_section(s, context)))
+    assert "".join(chunks) == prompt
+    assert prompt.startswith(generator.apply_techniques(body, techniques))
+    assert "Analysis:\n1. Key Points:" in prompt
+    assert "Here's my response:" not in prompt
+
+
+def test_split_techniques_detects_prompt_dependent_text():
+    """Techniques adding text that varies with the prompt are not reduced to a wrapping."""
+    from promptgen.techniques.library import PromptTechnique, TechniqueLibrary
+    from promptgen.templates.loader import split_technique_sequence
+
+    class LengthTechnique(PromptTechnique):
+        def apply(self, prompt_content, context=None):
+            return f"({len(prompt_content)} characters)\n{prompt_content}"
+
+    library = TechniqueLibrary()
+    library.register(LengthTechnique(name="length", description="", template=""))
+    library.register(PromptTechnique(name="wrap", description="", template="<<{content}>>"))
+
+    assert split_technique_sequence(library, [("wrap", {})]) == ("<<", ">>")
+    assert split_technique_sequence(library, [("wrap", {}), ("length", {})]) is None
+
+
+def test_generate_prompt_leaves_shared_template_untouched(eager_library):
+    """Rendering does not add conditional sections or content to the shared template."""
+    generator = PromptGenerator(eager_library)
+    kwargs = dict(domain="software", task="coding", complexity=4)
+    plain, template = generator.generate_prompt("a todo app", **kwargs)
+    sections = list(template.sections)
+    section_content = {name: dict(state) for name, state in template.section_content.items()}
+
+    with_db, _ = generator.generate_prompt("a todo app", context={"database_required": True}, **kwargs)
+    again, _ = generator.generate_prompt("a todo app", **kwargs)
+
+    assert with_db != plain
+    assert again == plain
+    assert template.sections == sections
+    assert template.section_content == section_content
+    assert not any(state["populated"] for state in template.section_content.values())
+
+
+def test_stream_prompt_without_template(eager_library):
+    """Streaming raises when no template fits."""
+    generator = PromptGenerator(eager_library)
+    with pytest.raises(ValueError):
+        list(generator.stream_prompt("x", "unknown", "task", 3))
+
+
+def test_generate_many_in_order_with_errors():
+    """Batch generation keeps input order and captures per-item errors."""
+    requests = [
+        {"objective": f"app {i}", "domain": "software", "task": "coding", "complexity": 4}
+        for i in range(6)
+    ]
+    requests[2] = {"objective": "x", "domain": "unknown", "task": "t", "complexity": 3}
+    requests[4] = {"objective": "x", "domain": "software"}  # missing arguments
+
+    serial = PromptGenerator(TemplateLibrary(TEMPLATES_DIR)).generate_many(requests)
+    parallel = PromptGenerator(TemplateLibrary(TEMPLATES_DIR)).generate_many(
+        requests, workers=2, chunksize=2)
+
+    assert parallel == serial
+    assert len(parallel) == len(requests)
+    assert "app 5" in parallel[5]["prompt"]
+    assert parallel[0]["template"] == "Software Development Complete"
+    assert parallel[2]["prompt"] is None and "Could not find" in parallel[2]["error"]
+    assert parallel[4]["error"].startswith("TypeError")
+
+
+def test_generate_many_workers_see_registered_templates():
+    """Workers use templates registered after loading the directory, and lazy mode."""
+    library = TemplateLibrary(TEMPLATES_DIR, lazy=True)
+    replaced = library.get("Software Development Complete").to_dict()
+    replaced["sections"] = [{"name": "Replaced", "position": 1, "content_template": "New {objective}"}]
+    library.register(PromptTemplate.from_dict(replaced))
+    library.register(PromptTemplate.from_dict({
+        "name": "Registered Only", "domain": "registered", "complexity_range": [1, 5],
+        "sections": [{"name": "Task", "position": 1, "content_template": "Do {objective}"}]
+    }))
+
+    requests = [
+        {"objective": "app", "domain": "software", "task": "coding", "complexity": 4,
+         "template_name": "Software Development Complete"},
+        {"objective": "thing", "domain": "registered", "task": "t", "complexity": 3},
+        {"objective": "named", "domain": "software", "task": "t", "complexity": 3,
+         "template_name": "Registered Only"},
+    ]
+    generator = PromptGenerator(library)
+    serial = generator.generate_many(requests)
+    parallel = generator.generate_many(requests, workers=2, chunksize=1)
+
+    assert parallel == serial
+    assert parallel[0]["prompt"].startswith("# Replaced\nNew app")
+    assert parallel[1]["template"] == parallel[2]["template"] == "Registered Only"
+
+
+def test_conditional_sections_merge_in_position_order():
+    """Triggered sections are merged by position without accumulating across calls."""
+    template = PromptTemplate(
+        name="conditional",
+        domain="software",
+        sections=[
+            {"name": "Last", "position": 9, "content_template": "last"},
+            {"name": "First", "position": 1, "content_template": "first"},
+        ],
+        conditional_sections=[
+            {"trigger": {"key": "db", "value": True},
+             "add_sections": [{"name": "Schema", "position": 5}]},
+            {"trigger": {"key": "tags", "value": ["a", "b"]},
+             "add_sections": [{"name": "Tagged", "position": 1}]},
+        ],
+    )
+
+    template.apply_conditional_sections({"db": True, "tags": ["a", "b"]})
+    assert [s["name"] for s in template.sections] == ["First", "Tagged", "Schema", "Last"]
+
+    template.apply_conditional_sections({"db": True})
+    assert [s["name"] for s in template.sections] == ["First", "Schema", "Last"]
+
+    template.apply_conditional_sections({"db": False})
+    assert [s["name"] for s in template.sections] == ["First", "Last"]
+
+
+def test_fragment_pool_shares_identical_sections(tmp_path):
+    """Identical section definitions and best practices are stored once."""
+    for name in ("One", "Two"):
+        (tmp_path / f"{name}.yaml").write_text(
+            f"name: \"{name}\"\n"
+            "domain: \"software\"\n"
+            "sections:\n"
+            "  - name: \"Context\"\n"
+            "    position: 1\n"
+            "    content_template: \"Build {objective}\"\n"
+            f"  - name: \"{name} Only\"\n"
+            "    position: 2\n"
+            "    content_template: \"Specific\"\n"
+            "best_practices:\n"
+            "  - \"Write tests\"\n"
+        )
+    library = TemplateLibrary(str(tmp_path))
+    one, two = library.get("One"), library.get("Two")
+
+    assert one.sections[0] is two.sections[0]
+    assert one.sections[1] is not two.sections[1]
+    assert one.best_practices[0] is two.best_practices[0]
+    assert len(library.fragments) == 4
+    assert library.fragments.get(library.fragments.fragment_id(one.sections[0])) is one.sections[0]
+
+
+def test_populate_section_inserts_values_verbatim():
+    """Placeholders are filled in one pass; braces inside values are kept."""
+    generator = PromptGenerator(TemplateLibrary())
+    section = {"content_template": "Model: {data_entities}\n{content} {missing}"}
+    populated = generator.populate_section(section, {"data_entities": "Joke: {id, text}"})
+    assert populated == "Model: Joke: {id, text}\n{content} [missing]"
+
+
+def _write_inheritance_catalog(directory):
+    """Write a parent template, a two-level child chain and two broken children."""
+    (directory / "a_grandchild.yaml").write_text(
+        "name: \"Grandchild\"\n"
+        "extends: \"Child\"\n"
+        "tags: [\"small\"]\n"
+    )
+    (directory / "b_parent.yaml").write_text(
+        "name: \"Parent\"\n"
+        "domain: \"software\"\n"
+        "complexity_range: [3, 5]\n"
+        "sections:\n"
+        "  - name: \"Task\"\n"
+        "    position: 1\n"
+        "    content_template: \"Build {objective}\"\n"
+        "  - name: \"Testing\"\n"
+        "    position: 2\n"
+        "    content_template: \"Write tests\"\n"
+        "  - name: \"Deployment\"\n"
+        "    position: 3\n"
+        "    content_template: \"Ship it\"\n"
+        "best_practices: [\"Review code\"]\n"
+    )
+    (directory / "c_child.yaml").write_text(
+        "name: \"Child\"\n"
+        "extends: \"Parent\"\n"
+        "complexity_range: [1, 2]\n"
+        "remove_sections: [\"Deployment\"]\n"
+        "sections:\n"
+        "  - name: \"Testing\"\n"
+        "    content_template: \"Write a smoke test\"\n"
+        "  - name: \"Notes\"\n"
+        "    position: 1.5\n"
+        "    content_template: \"Keep it short\"\n"
+    )
+    (directory / "d_broken.yaml").write_text(
+        "- name: \"Orphan\"\n"
+        "  extends: \"Nobody\"\n"
+        "- name: \"Loop A\"\n"
+        "  extends: \"Loop B\"\n"
+        "- name: \"Loop B\"\n"
+        "  extends: \"Loop A\"\n"
+    )
+
+
+def test_extends_flattened_at_load(tmp_path):
+    """Child templates are stored fully resolved, sharing unchanged parent sections."""
+    _write_inheritance_catalog(tmp_path)
+    library = TemplateLibrary(str(tmp_path))
+    parent, child, grandchild = (library.get(n) for n in ("Parent", "Child", "Grandchild"))
+
+    assert [s["name"] for s in child.sections] == ["Task", "Testing", "Notes"]
+    assert child.get_section_by_name("Testing") == {
+        "name": "Testing", "position": 2, "content_template": "Write a smoke test"}
+    assert child.sections[0] is parent.sections[0]
+    assert child.domain == "software"
+    assert child.complexity_range == (1, 2)
+    assert child.best_practices == ["Review code"]
+    assert grandchild.to_dict() == {**child.to_dict(), "name": "Grandchild", "tags": ["small"]}
+    assert not hasattr(child, "extends")
+
+    prompt, template = PromptGenerator(library).generate_prompt("a CLI", "software", "coding", 1)
+    assert template is child
+    assert prompt.index("# Notes") < prompt.index("# Testing\nWrite a smoke test")
+
+
+def test_extends_errors_reported(tmp_path):
+    """Unknown parents and cycles are reported without loading the template."""
+    _write_inheritance_catalog(tmp_path)
+    library = TemplateLibrary()
+    errors = library.load_templates(str(tmp_path))
+
+    messages = [message for _, message in errors]
+    assert len(messages) == 3
+    assert "unknown template 'Nobody'" in messages[0]
+    assert "cycle" in messages[1] and "cycle" in messages[2]
+    assert sorted(library.list_templates()) == ["Child", "Grandchild", "Parent"]
+
+
+def test_extends_lazy_matches_eager(tmp_path):
+    """Lazy bodies of inherited templates are flattened the same way."""
+    _write_inheritance_catalog(tmp_path)
+    eager = TemplateLibrary(str(tmp_path))
+    lazy = TemplateLibrary(str(tmp_path), lazy=True)
+
+    assert lazy.get("Grandchild").complexity_range == (1, 2)
+    assert not lazy.get("Grandchild").is_loaded
+    for name in ("Parent", "Child", "Grandchild"):
+        assert lazy.get(name).to_dict() == eager.get(name).to_dict()